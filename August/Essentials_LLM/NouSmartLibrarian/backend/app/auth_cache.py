@@ -0,0 +1,165 @@
+# backend/app/auth_cache.py
+# Cache pt rezolvarea utilizatorului din cookie-ul access_token (routers/_helpers.get_current_user_optional):
+#  - claims JWT verificate: per proces (mem_store), cheie = token-ul. Un token e imuabil, deci nu se
+#    invalidează, doar expiră – cel târziu la `exp`-ul lui.
+#  - proiecția userului (dict-ul întors de get_current_user_optional, cu preferințele): în Redis, comună
+#    tuturor workerilor; invalidate(uid) o șterge pt toți. Cât timp Redis e indisponibil, fallback în
+#    mem_store cu TTL scurt (invalidarea ajunge atunci doar la worker-ul curent, ceilalți văd modificarea
+#    după cel mult auth_cache_local_ttl secunde).
+#  - un miss citește din DB și abia apoi scrie în cache; între timp un invalidate() poate șterge intrarea,
+#    iar scrierea ar pune la loc proiecția veche. De aceea invalidate() incrementează un contor de generație
+#    per user (invalidate_all() unul global), iar umplerea e un CAS: se scrie doar dacă generațiile citite
+#    odată cu miss-ul sunt neschimbate (script Lua în Redis, mem_store.atomic în fallback).
+import json, time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+
+from . import mem_store, redis_pool
+from .config import settings
+from .db import async_engine
+from .models import Preference, User
+from .redis_pool import RedisUnavailable
+from .security import decode_token
+
+CLAIMS_NS = "auth_claims"
+USER_NS = "auth_user"
+GEN_NS = "auth_gen"
+GEN_ALL = "*"  # cheia generației globale în GEN_NS
+GEN_ALL_KEY = "auth:gen_all"
+GEN_TTL = 3600  # contorul per user trebuie să trăiască mai mult decât durează un _load_user
+
+# KEYS: user, generație user, generație globală / ARGV: proiecția, ttl, generațiile citite la miss
+FILL_LUA = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[3] then return 0 end
+if (redis.call('GET', KEYS[3]) or '') ~= ARGV[4] then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+_stats = {"claims_hits": 0, "claims_misses": 0, "user_hits": 0, "user_misses": 0, "invalidations": 0,
+          "stale_fills": 0}
+
+
+def _key(uid: str) -> str:
+    return f"auth:user:{uid}"
+
+
+def _gen_key(uid: str) -> str:
+    return f"auth:gen:{uid}"
+
+
+def claims(token: str) -> Optional[dict]:
+    """decode_token cu cache; token-urile invalide / expirate nu se țin minte."""
+    hit = mem_store.get(CLAIMS_NS, token)
+    if hit is not None:
+        _stats["claims_hits"] += 1
+        return hit
+    _stats["claims_misses"] += 1
+    data = decode_token(token)
+    if not data:
+        return None
+    ttl = settings.auth_cache_ttl
+    if data.get("exp"):
+        ttl = min(ttl, data["exp"] - time.time())
+    if ttl > 0:
+        mem_store.set(CLAIMS_NS, token, data, ttl)
+    return data
+
+
+_USER_COLS = ("id", "email", "username", "role", "first_name", "last_name")
+_GENRE_SEP = "\x1f"
+
+
+async def _load_user(uid: str) -> Optional[Dict[str, Any]]:
+    # un singur SELECT (user + preferințe agregate) pe o conexiune scurtă: fiecare execute prin aiosqlite
+    # e un drum până la thread-ul conexiunii, iar o sesiune ORM ar mai adăuga unul pt rollback la închidere
+    stmt = (select(*(getattr(User, c) for c in _USER_COLS), func.group_concat(Preference.genre, _GENRE_SEP))
+            .outerjoin(Preference, Preference.user_id == User.id).where(User.id == uid).group_by(User.id))
+    async with async_engine.connect() as conn:
+        row = (await conn.execute(stmt)).first()
+    if row is None:
+        return None
+    user = dict(zip(_USER_COLS, row[:-1]))
+    user["preferences"] = sorted(row[-1].split(_GENRE_SEP)) if row[-1] else []
+    return user
+
+
+def _read_mem(tx, uid: str):
+    return tx.get(USER_NS, uid), (tx.get(GEN_NS, uid, 0), tx.get(GEN_NS, GEN_ALL, 0))
+
+
+def _fill_mem(tx, uid: str, user: Dict[str, Any], gens) -> bool:
+    if (tx.get(GEN_NS, uid, 0), tx.get(GEN_NS, GEN_ALL, 0)) != gens:
+        return False
+    tx.set(USER_NS, uid, dict(user), settings.auth_cache_local_ttl)
+    return True
+
+
+async def get_user(uid: str) -> Optional[Dict[str, Any]]:
+    try:
+        # proiecția + generațiile într-un singur drum; generațiile contează doar dacă e miss
+        raw, *gens = await redis_pool.run(lambda r: r.mget(_key(uid), _gen_key(uid), GEN_ALL_KEY))
+        shared = True
+    except RedisUnavailable:
+        raw, gens = mem_store.atomic(lambda tx: _read_mem(tx, uid))
+        shared = False
+    if raw:
+        _stats["user_hits"] += 1
+        return json.loads(raw) if shared else dict(raw)
+
+    _stats["user_misses"] += 1
+    user = await _load_user(uid)
+    if user is None:
+        return None
+    if shared:
+        try:
+            filled = await redis_pool.run(lambda r: r.register_script(FILL_LUA)(
+                keys=[_key(uid), _gen_key(uid), GEN_ALL_KEY],
+                args=[json.dumps(user, ensure_ascii=False), max(1, int(settings.auth_cache_ttl)),
+                      gens[0] or "", gens[1] or ""]))
+        except RedisUnavailable:
+            filled = 1  # Redis a căzut după citire: generațiile locale nu sunt cunoscute, nu punem nimic în cache
+    else:
+        filled = mem_store.atomic(lambda tx: _fill_mem(tx, uid, user, gens))
+    if not int(filled):
+        _stats["stale_fills"] += 1
+    return user
+
+
+async def invalidate(uid: str):
+    """După schimbarea rolului / preferințelor sau ștergerea userului."""
+    _stats["invalidations"] += 1
+    # generația crește înainte de ștergere: un miss în curs fie a scris deja (și e șters), fie nu mai scrie
+    mem_store.incr(GEN_NS, uid, GEN_TTL, refresh_ttl=True)
+    mem_store.delete(USER_NS, uid)
+
+    async def _bump(r):
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.incr(_gen_key(uid))
+            pipe.expire(_gen_key(uid), GEN_TTL)
+            pipe.delete(_key(uid))
+            await pipe.execute()
+    try:
+        await redis_pool.run(_bump)
+    except RedisUnavailable:
+        pass
+
+
+async def invalidate_all():
+    _stats["invalidations"] += 1
+    mem_store.incr(GEN_NS, GEN_ALL, GEN_TTL, refresh_ttl=True)
+    mem_store.clear(USER_NS)
+
+    async def _clear(r):
+        await r.incr(GEN_ALL_KEY)
+        async for k in r.scan_iter("auth:user:*"):
+            await r.delete(k)
+    try:
+        await redis_pool.run(_clear)
+    except RedisUnavailable:
+        pass
+
+
+def stats() -> Dict[str, Any]:
+    return {**_stats, "ttl": settings.auth_cache_ttl, "local_ttl": settings.auth_cache_local_ttl}
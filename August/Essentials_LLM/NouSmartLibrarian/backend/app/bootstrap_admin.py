@@ -10,6 +10,7 @@ from .logging_utils import app_logger
 log = app_logger()
 
 def run():
+    """Întoarce id-ul adminului dacă rolul i-a fost schimbat (apelantul invalidează auth_cache)."""
     if not settings.admin_bootstrap_enabled:
         return
 
@@ -41,17 +42,19 @@ def run():
             return
 
         # deja există – opțional actualizăm
-        changed = False
+        changed = role_changed = False
         if settings.admin_overwrite_password:
             u.password_hash = hash_password(password)
             changed = True
         if u.role != "admin":
             u.role = "admin"
-            changed = True
+            changed = role_changed = True
 
         if changed:
             db.add(u)
             db.commit()
             log.info(f"Admin bootstrap: actualizat admin id={u.id} username={u.username}")
+            if role_changed:
+                return u.id
         else:
             log.info(f"Admin bootstrap: nimic de făcut (admin deja prezent: id={u.id})")
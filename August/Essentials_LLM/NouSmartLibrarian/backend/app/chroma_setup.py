@@ -5,13 +5,14 @@ from .config import settings
 
 # Ancorează path-ul de folderul backend, nu de CWD
 BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend/app -> parent = .../backend
-PERSIST_PATH = str(BASE_DIR / "chroma")
+PERSIST_PATH = settings.chroma_path or str(BASE_DIR / "chroma")
 
 chroma_client = PersistentClient(path=PERSIST_PATH)
 
 embedder = embedding_functions.OpenAIEmbeddingFunction(
     api_key=settings.openai_api_key,
     model_name=settings.embedding_model,
+    api_base=settings.openai_base_url or None,
 )
 
 COLLECTION = "books"
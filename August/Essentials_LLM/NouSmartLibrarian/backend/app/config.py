@@ -18,13 +18,42 @@ class Settings(BaseModel):
     admin_overwrite_password: bool = os.getenv("ADMIN_OVERWRITE_PASSWORD", "false").lower() == "true"
 
     sqlite_url: str = os.getenv("SQLITE_URL", "sqlite:///./app.db")
+    # engine async (aiosqlite) pt auth/preferințe: gol = derivat din SQLITE_URL (sqlite+aiosqlite://...)
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+    db_read_pool_size: int = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # pool-ul comun (app/redis_pool.py) + circuit breaker: după N erori consecutive toate modulele
+    # trec pe fallback in-memory; după reset_seconds se încearcă reconectarea
+    redis_timeout: float = float(os.getenv("REDIS_TIMEOUT_SECONDS", "0.3"))
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+    redis_breaker_threshold: int = int(os.getenv("REDIS_BREAKER_THRESHOLD", "3"))
+    redis_breaker_reset_seconds: float = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "5"))
+    redis_health_interval: float = float(os.getenv("REDIS_HEALTH_INTERVAL_SECONDS", "5"))
+    # logarea tokenilor: coadă limitată + thread de scriere pe batch-uri (logging_utils.JsonlWriter)
+    token_log_queue_size: int = int(os.getenv("TOKEN_LOG_QUEUE_SIZE", "10000"))
+    token_log_batch_size: int = int(os.getenv("TOKEN_LOG_BATCH_SIZE", "256"))
+    token_log_flush_seconds: float = float(os.getenv("TOKEN_LOG_FLUSH_SECONDS", "1.0"))
+    # agregări de tokeni/cost (app/usage_rollups.py): SQLite + tail incremental peste logs/
+    usage_db_path: str = os.getenv("USAGE_DB_PATH", "")  # gol = backend/cache/usage.sqlite3
+    usage_logs_dir: str = os.getenv("USAGE_LOGS_DIR", "logs")
+    usage_refresh_seconds: float = float(os.getenv("USAGE_REFRESH_SECONDS", "60"))
+    # fallback-ul in-memory comun (app/mem_store.py): plafon de intrări (LRU) + sweep periodic al celor expirate
+    mem_store_max_items: int = int(os.getenv("MEM_STORE_MAX_ITEMS", "100000"))
+    mem_store_sweep_seconds: float = float(os.getenv("MEM_STORE_SWEEP_SECONDS", "30"))
 
 
     jwt_secret: str = os.getenv("JWT_SECRET", "change_me")
     jwt_alg: str = os.getenv("JWT_ALG", "HS256")
     access_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
     refresh_days: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # bcrypt în executor dedicat (app/security.py): thread-uri + câte cereri pot aștepta; peste -> 503
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    password_hash_queue: int = int(os.getenv("PASSWORD_HASH_QUEUE", "16"))
+    # cache pt claims JWT + proiecția userului (app/auth_cache.py); local_ttl = cât timp Redis e indisponibil
+    auth_cache_ttl: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    auth_cache_local_ttl: float = float(os.getenv("AUTH_CACHE_LOCAL_TTL_SECONDS", "5"))
 
 
     smtp_host: str = os.getenv("SMTP_HOST", "")
@@ -32,11 +61,66 @@ class Settings(BaseModel):
     smtp_user: str = os.getenv("SMTP_USER", "")
     smtp_pass: str = os.getenv("SMTP_PASS", "")
     smtp_from: str = os.getenv("SMTP_FROM", "Smart Librarian <noreply@smartlib.test>")
+    smtp_starttls: bool = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    smtp_timeout: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+    # outbox email (app/email_service.py): coada dintre handler și thread-ul care ține sesiunea SMTP deschisă
+    email_queue_size: int = int(os.getenv("EMAIL_QUEUE_SIZE", "1000"))
+    email_batch_size: int = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+    email_max_retries: int = int(os.getenv("EMAIL_MAX_RETRIES", "3"))
+    email_retry_backoff: float = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "1"))
+    smtp_idle_seconds: float = float(os.getenv("SMTP_IDLE_SECONDS", "60"))  # sesiunea se închide după atâta inactivitate
 
 
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     chat_model: str = os.getenv("CHAT_MODEL", "gpt-4o-mini")
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")  # gol = api.openai.com; setat pt stub-uri locale
+
+    # client async pt chat: pool de conexiuni partajat, timeout per apel, concurență limitată
+    openai_timeout: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+    openai_max_retries: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    openai_max_connections: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+    openai_max_concurrency: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+    openai_queue_timeout: float = float(os.getenv("OPENAI_QUEUE_TIMEOUT_SECONDS", "10"))
+
+    # motorul de retrieval: "chroma" (PersistentClient) sau "numpy" (matrice .npy mmap, in-proces);
+    # numpy e căutare exactă O(n): mai rapid până la ~10k cărți, peste (ex. 100k) HNSW din Chroma câștigă
+    retrieval_backend: str = os.getenv("RETRIEVAL_BACKEND", "chroma").lower()
+    chroma_path: str = os.getenv("CHROMA_PATH", "")  # gol = backend/chroma
+    vector_index_path: str = os.getenv("VECTOR_INDEX_PATH", "")
+    # retrieval hibrid: BM25 (titlu/teme/rezumat) + vectori, fuzionate cu reciprocal-rank fusion
+    hybrid_retrieval: bool = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+    hybrid_rrf_k: int = int(os.getenv("HYBRID_RRF_K", "60"))
+    hybrid_decisive_ratio: float = float(os.getenv("HYBRID_DECISIVE_RATIO", "3.0"))
+
+    # preferințele userului (genuri = teme din catalog) restrâng retrieval-ul pt cererile vagi
+    preference_filter: bool = os.getenv("PREFERENCE_FILTER", "true").lower() == "true"
+
+    # catalogul (rezumate + metadate): director fix (gol = primul dintre candidații din patch/catalog.py)
+    # și intervalul la care watcher-ul verifică fișierele (0 = doar reload manual din /admin/catalog/reload)
+    catalog_dir: str = os.getenv("CATALOG_DIR", "")
+    catalog_watch_seconds: float = float(os.getenv("CATALOG_WATCH_SECONDS", "2"))
+
+    # "two_step": tool call + al doilea apel pt textul final; "single": un apel cu output structurat
+    # (titlu din shortlist + mesaj), rezumatul se atașează local
+    recommend_mode: str = os.getenv("RECOMMEND_MODE", "two_step").lower()
+
+    # import în masă (embedding pe batch-uri, concurență limitată)
+    ingest_batch_size: int = int(os.getenv("INGEST_BATCH_SIZE", "128"))
+    ingest_concurrency: int = int(os.getenv("INGEST_CONCURRENCY", "4"))
+    # indexul numpy se salvează pe disc (și checkpoint-ul avansează) o dată la atâtea batch-uri, nu la fiecare
+    ingest_flush_batches: int = int(os.getenv("INGEST_FLUSH_BATCHES", "16"))
+
+    # cache pt embedding-urile query-urilor (LRU in-proces + SQLite pe disc)
+    embedding_cache_size: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+    embedding_cache_disk_max: int = int(os.getenv("EMBEDDING_CACHE_DISK_MAX", "50000"))
+    embedding_cache_path: str = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+    # cache semantic pt răspunsurile /chat/recommend
+    response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    response_cache_threshold: float = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95"))
+    response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
 
 
     price_chat_input: float = float(os.getenv("PRICE_CHAT_INPUT", "0.0005"))
@@ -47,6 +131,18 @@ class Settings(BaseModel):
     otp_ttl: int = int(os.getenv("OTP_TTL_SECONDS", "600"))
     otp_cooldown: int = int(os.getenv("OTP_SEND_COOLDOWN_SECONDS", "60"))
     otp_rate_limit_hour: int = int(os.getenv("OTP_RATE_LIMIT_PER_HOUR", "5"))
+    otp_max_attempts: int = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))  # coduri greșite până se anulează codul
+
+    # limite per rută (middleware din app/rate_limit.py), fereastră glisantă: "METODĂ /cale=limită/secunde@ip|user"
+    # @user = per cont (cookie access_token), anonimii per IP
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limits: str = os.getenv("RATE_LIMITS", ", ".join([
+        "POST /auth/login=10/60@ip", "POST /auth/register=5/60@ip", "POST /auth/refresh=30/60@ip",
+        "POST /auth/send-otp=5/60@ip", "POST /auth/verify-otp=10/60@ip",
+        "POST /auth/reset/send-otp=5/60@ip", "POST /auth/reset/verify=10/60@ip", "POST /auth/reset/complete=10/60@ip",
+        "POST /chat/recommend=30/60@user", "POST /chat/recommend/stream=30/60@user",
+        "GET /admin/chroma-sample=10/60@user",
+    ]))
 
 
 settings = Settings()
\ No newline at end of file
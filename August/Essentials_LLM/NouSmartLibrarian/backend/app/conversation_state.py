@@ -1,58 +1,110 @@
 # backend/app/conversation_state.py
-import json, time
-from typing import Dict
-from redis import Redis
-from .config import settings
-
-# încercăm Redis; dacă nu merge, avem fallback in-memory cu TTL
-try:
-    redis = Redis.from_url(
-        settings.redis_url,
-        decode_responses=True,
-        socket_connect_timeout=0.3,
-        socket_timeout=0.3,
-    )
-    redis.ping()
-    _use_redis = True
-except Exception:
-    _use_redis = False
-    _mem: Dict[str, tuple[dict, int]] = {}
+import json
+from typing import Any, Dict
+from . import mem_store, redis_pool
+from .redis_pool import RedisUnavailable
 
+# Redis prin pool-ul comun; cât timp circuitul e deschis, fallback în mem_store (TTL + LRU)
 TTL = 1800  # 30 min
+VERSION_FIELD = "_v"
+CAS_RETRIES = 3
 
-
-def _now() -> int:
-    return int(time.time())
+# SET condiționat: scrie blob-ul doar dacă versiunea din Redis e cea citită la load (-1 = conflict)
+CAS_LUA = """
+local cur = redis.call('GET', KEYS[1])
+local v = 0
+if cur then
+  local ok, d = pcall(cjson.decode, cur)
+  if ok and type(d) == 'table' and d['_v'] then v = tonumber(d['_v']) end
+end
+if v ~= tonumber(ARGV[1]) then return -1 end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return v + 1
+"""
 
 
 def _key(sid: str) -> str:
     return f"ctx:{sid}"
 
 
-def get_ctx(sid: str) -> dict:
-    if _use_redis:
-        raw = redis.get(_key(sid))
-        if not raw:
-            return {}
-        try:
-            return json.loads(raw)
-        except Exception:
-            return {}
-    rec = _mem.get(sid)
-    if not rec:
+def _decode(raw) -> Dict[str, Any]:
+    if not raw:
         return {}
-    data, exp = rec
-    if _now() > exp:
-        _mem.pop(sid, None)
+    try:
+        d = json.loads(raw)
+    except Exception:
         return {}
-    return data
+    return d if isinstance(d, dict) else {}
+
+
+class ConversationContext:
+    """Contextul unei conversații pe durata unei cereri: citit o dată (la primul acces), modificat
+    local și scris o singură dată la final cu un SET condiționat de versiune. Dacă între timp a scris
+    altă cerere, recitim și reaplicăm doar câmpurile modificate aici (ultimul scriitor câștigă per câmp)."""
+
+    def __init__(self, sid: str):
+        self.sid = sid
+        self.data: Dict[str, Any] = {}
+        self.version = 0
+        self._dirty: Dict[str, Any] = {}
+        self._loaded = False
+
+    async def _read(self):
+        try:
+            d = _decode(await redis_pool.run(lambda r: r.get(_key(self.sid))))
+        except RedisUnavailable:
+            d = dict(mem_store.get("ctx", self.sid) or {})
+        self.version = int(d.pop(VERSION_FIELD, 0) or 0)
+        self.data = d
+
+    async def load(self) -> "ConversationContext":
+        if not self._loaded:
+            await self._read()
+            self._loaded = True
+        return self
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def update(self, **kwargs):
+        for k, v in kwargs.items():
+            if v is not None:
+                self.data[k] = v
+                self._dirty[k] = v
+
+    def _cas_mem(self, blob: Dict[str, Any]) -> int:
+        cur = mem_store.get("ctx", self.sid) or {}
+        if int(cur.get(VERSION_FIELD, 0) or 0) != self.version:
+            return -1
+        mem_store.set("ctx", self.sid, blob, TTL)
+        return self.version + 1
+
+    async def flush(self) -> bool:
+        if not self._dirty:
+            return True
+        for _ in range(CAS_RETRIES):
+            blob = {**self.data, VERSION_FIELD: self.version + 1}
+            try:
+                res = await redis_pool.run(lambda r: r.register_script(CAS_LUA)(
+                    keys=[_key(self.sid)], args=[self.version, json.dumps(blob, ensure_ascii=False), TTL]))
+            except RedisUnavailable:
+                res = self._cas_mem(blob)
+            if int(res) >= 0:
+                self.version = int(res)
+                self._dirty.clear()
+                return True
+            # conflict: altă cerere a scris între load și flush
+            await self._read()
+            self.data.update(self._dirty)
+        return False
+
+
+async def get_ctx(sid: str) -> dict:
+    return dict((await ConversationContext(sid).load()).data)
 
 
-def update_ctx(sid: str, **kwargs) -> dict:
-    cur = get_ctx(sid)
-    cur.update({k: v for k, v in kwargs.items() if v is not None})
-    if _use_redis:
-        redis.setex(_key(sid), TTL, json.dumps(cur, ensure_ascii=False))
-    else:
-        _mem[sid] = (cur, _now() + TTL)
-    return cur
+async def update_ctx(sid: str, **kwargs) -> dict:
+    ctx = await ConversationContext(sid).load()
+    ctx.update(**kwargs)
+    await ctx.flush()
+    return dict(ctx.data)
@@ -1,9 +1,36 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
 
 
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+# WAL: cititorii nu mai sunt blocați de scriitor (și invers); synchronous=NORMAL e sigur în WAL
+# (se pot pierde doar ultimele tranzacții la o pană de curent, nu se corupe baza)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+    "PRAGMA cache_size=-16000",  # ~16 MB per conexiune
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=134217728",
+)
+
+
+def _apply_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    for p in SQLITE_PRAGMAS:
+        cur.execute(p)
+    cur.close()
+
+
 engine = create_engine(settings.sqlite_url, connect_args={"check_same_thread": False})
+if _is_sqlite(settings.sqlite_url):
+    event.listen(engine, "connect", _apply_pragmas)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
@@ -13,4 +40,33 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- async (aiosqlite) pt rutele de auth / preferințe ---
+# SQLite are un singur scriitor: un engine de citire cu câteva conexiuni (WAL permite citiri paralele)
+# și un engine de scriere cu exact o conexiune, ca scrierile aceluiași worker să aștepte în pool-ul
+# SQLAlchemy, nu în busy_timeout-ul SQLite. Implicit aiosqlite folosește NullPool (o conexiune + un
+# thread nou la fiecare sesiune), de aceea pool-ul e setat explicit.
+ASYNC_URL = settings.async_database_url or settings.sqlite_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+if _is_sqlite(ASYNC_URL):
+    async_engine = create_async_engine(ASYNC_URL, poolclass=AsyncAdaptedQueuePool,
+                                       pool_size=settings.db_read_pool_size, max_overflow=0,
+                                       pool_timeout=settings.db_pool_timeout)
+    async_write_engine = create_async_engine(ASYNC_URL, poolclass=AsyncAdaptedQueuePool, pool_size=1,
+                                             max_overflow=0, pool_timeout=settings.db_pool_timeout)
+    for _e in (async_engine, async_write_engine):
+        event.listen(_e.sync_engine, "connect", _apply_pragmas)
+else:
+    async_engine = async_write_engine = create_async_engine(ASYNC_URL, pool_size=settings.db_read_pool_size)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, class_=AsyncSession, expire_on_commit=False,
+                                            autoflush=False)
+
+
+async def dispose_async_engines():
+    await async_engine.dispose()
+    if async_write_engine is not async_engine:
+        await async_write_engine.dispose()
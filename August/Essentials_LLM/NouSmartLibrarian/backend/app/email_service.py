@@ -1,17 +1,183 @@
-import smtplib
+# backend/app/email_service.py
+# Outbox pt emailuri: handler-ul doar pune mesajul într-o coadă limitată și răspunde; un thread de fundal
+# ține o sesiune SMTP autentificată deschisă (connect + STARTTLS + login o singură dată, nu per mesaj),
+# trimite ce s-a adunat în coadă pe aceeași sesiune și reîncearcă erorile temporare cu backoff exponențial.
+# Sesiunea se închide după smtp_idle_seconds fără trafic; dacă serverul a închis-o între timp, primul
+# mesaj se retrimite imediat pe o conexiune nouă. Coada e per proces (în memorie): la un crash se pierd
+# mesajele netrimise – pt OTP e acceptabil, userul poate cere alt cod.
+import atexit, queue, smtplib, threading, time
 from email.message import EmailMessage
+from typing import Optional
+
+from loguru import logger
+
+from . import metrics
 from .config import settings
 
 
-def send_otp_email(to_email: str, code: str):
+class OutboxFull(Exception):
+    """Coada outbox e plină (serverul SMTP nu ține pasul) -> 503, clientul reîncearcă."""
+
+
+def otp_message(to_email: str, code: str) -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = "Your Smart Librarian verification code"
     msg["From"] = settings.smtp_from
     msg["To"] = to_email
     msg.set_content(f"Your verification code is: {code}\nIt expires in {settings.otp_ttl//60} minutes.")
+    return msg
+
+
+def _permanent(e: Exception) -> bool:
+    # 5xx = adresă / expeditor respins, mesaj refuzat: o reîncercare nu schimbă nimic
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(e, smtplib.SMTPResponseException) and 500 <= e.smtp_code < 600
+
+
+class EmailOutbox:
+    def __init__(self):
+        self._q: "queue.Queue" = queue.Queue(maxsize=settings.email_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "dropped": 0, "connects": 0, "batches": 0}
+
+    def enqueue(self, msg: EmailMessage):
+        if self._thread is None:
+            self._start()
+        metrics.EMAIL_OUTBOX_DEPTH.inc()  # înainte de put: thread-ul poate scoate mesajul imediat
+        try:
+            self._q.put_nowait((time.perf_counter(), msg))
+        except queue.Full:
+            metrics.EMAIL_OUTBOX_DEPTH.dec()
+            self.stats["dropped"] += 1
+            metrics.EMAIL_TOTAL.labels("dropped").inc()
+            raise OutboxFull()
+        self.stats["queued"] += 1
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
 
-    with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
-        server.starttls()
-        if settings.smtp_user:
-            server.login(settings.smtp_user, settings.smtp_pass)
-        server.send_message(msg)
\ No newline at end of file
+    # --- sesiunea SMTP ---
+    def _session(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            s = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout)
+            try:
+                if settings.smtp_starttls:
+                    s.starttls()
+                if settings.smtp_user:
+                    s.login(settings.smtp_user, settings.smtp_pass)
+            except Exception:
+                s.close()
+                raise
+            self._smtp = s
+            self.stats["connects"] += 1
+            metrics.SMTP_CONNECTS.inc()
+        return self._smtp
+
+    def _close_session(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+    def _send(self, queued_at: float, msg: EmailMessage):
+        if not settings.smtp_host:
+            logger.warning(f"Email către {msg['To']} netrimis: SMTP_HOST nu e setat.")
+            self.stats["failed"] += 1
+            metrics.EMAIL_TOTAL.labels("failed").inc()
+            return
+        attempt = 0
+        while True:
+            reused = self._smtp is not None
+            t0 = time.perf_counter()
+            try:
+                self._session().send_message(msg)
+            except (smtplib.SMTPException, OSError) as e:
+                self._close_session()
+                if reused and isinstance(e, smtplib.SMTPServerDisconnected):
+                    continue  # sesiunea păstrată a expirat pe server: reconectare imediată, nu e o reîncercare
+                if _permanent(e) or attempt >= settings.email_max_retries or self._stop.is_set():
+                    logger.warning(f"Email către {msg['To']} eșuat după {attempt + 1} încercări: {e!r}")
+                    self.stats["failed"] += 1
+                    metrics.EMAIL_TOTAL.labels("failed").inc()
+                    return
+                self.stats["retried"] += 1
+                metrics.EMAIL_TOTAL.labels("retried").inc()
+                self._stop.wait(settings.email_retry_backoff * 2 ** attempt)
+                attempt += 1
+                continue
+            now = time.perf_counter()
+            self._last_used = now
+            self.stats["sent"] += 1
+            metrics.EMAIL_TOTAL.labels("sent").inc()
+            metrics.EMAIL_SEND_SECONDS.observe(now - t0)
+            metrics.EMAIL_DELIVERY_SECONDS.observe(now - queued_at)
+            return
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            try:
+                item = self._q.get(timeout=max(1.0, settings.smtp_idle_seconds / 4))
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+                    while len(batch) < settings.email_batch_size:
+                        item = self._q.get_nowait()
+                        if item is _STOP:
+                            stop = True
+                            break
+                        batch.append(item)
+            except queue.Empty:
+                pass
+            if batch:
+                self.stats["batches"] += 1
+                for queued_at, msg in batch:
+                    metrics.EMAIL_OUTBOX_DEPTH.dec()
+                    try:
+                        self._send(queued_at, msg)
+                    except Exception as e:  # thread-ul nu trebuie să moară pe un mesaj invalid
+                        logger.warning(f"Email outbox: eroare neașteptată: {e!r}")
+                        self.stats["failed"] += 1
+                        metrics.EMAIL_TOTAL.labels("failed").inc()
+            elif self._smtp is not None and time.perf_counter() - self._last_used > settings.smtp_idle_seconds:
+                self._close_session()
+        self._close_session()
+
+    def close(self, timeout: float = 10.0):
+        """Trimite ce a rămas în coadă (fără backoff-uri lungi) și oprește thread-ul."""
+        if self._thread is None:
+            return
+        try:
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def info(self) -> dict:
+        return {**self.stats, "depth": self._q.qsize(), "capacity": self._q.maxsize,
+                "connected": self._smtp is not None, "running": self._thread is not None}
+
+
+_STOP = object()
+outbox = EmailOutbox()
+atexit.register(outbox.close)
+
+
+def send_otp_email(to_email: str, code: str):
+    """Pune emailul cu codul OTP în outbox; ridică OutboxFull dacă coada e plină."""
+    outbox.enqueue(otp_message(to_email, code))
@@ -0,0 +1,155 @@
+# backend/app/embedding_cache.py
+# Cache pentru embedding-urile query-urilor: LRU in-proces + SQLite pe disc (supraviețuiește restartului).
+# Cheia = text normalizat + modelul de embedding; la schimbarea modelului cache-ul se golește.
+import hashlib, re, sqlite3, threading, time, unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from .config import settings
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend
+DEFAULT_PATH = BASE_DIR / "cache" / "embeddings.sqlite3"
+
+_lock = threading.Lock()
+_lru: "OrderedDict[str, List[float]]" = OrderedDict()
+_stats = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "errors": 0}
+_db: Optional[sqlite3.Connection] = None
+_db_model: Optional[str] = None
+_inserts = 0
+
+
+def normalize(text: str) -> str:
+    t = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", t.strip().lower())
+
+
+def _key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+def _open_db() -> Optional[sqlite3.Connection]:
+    global _db, _db_model
+    if _db is not None and _db_model == settings.embedding_model:
+        return _db
+    try:
+        path = Path(settings.embedding_cache_path) if settings.embedding_cache_path else DEFAULT_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = _db or sqlite3.connect(str(path), check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        row = db.execute("SELECT v FROM meta WHERE k = 'model'").fetchone()
+        if not row or row[0] != settings.embedding_model:
+            # modelul s-a schimbat -> vectorii vechi nu mai sunt comparabili
+            db.execute("DELETE FROM embeddings")
+            db.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('model', ?)", (settings.embedding_model,))
+            _lru.clear()
+        db.commit()
+        _db, _db_model = db, settings.embedding_model
+    except Exception:
+        _stats["errors"] += 1
+        _db = None
+    return _db
+
+
+def _lru_put(key: str, vec: List[float]):
+    _lru[key] = vec
+    _lru.move_to_end(key)
+    while len(_lru) > max(1, settings.embedding_cache_size):
+        _lru.popitem(last=False)
+
+
+def get(text: str) -> Optional[List[float]]:
+    key = _key(text, settings.embedding_model)
+    with _lock:
+        db = _open_db()
+        vec = _lru.get(key)
+        if vec is not None:
+            _lru.move_to_end(key)
+            _stats["hits_memory"] += 1
+            return vec
+        if db is not None:
+            try:
+                row = db.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    vec = array("f", row[0]).tolist()
+                    db.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (int(time.time()), key))
+                    db.commit()
+                    _lru_put(key, vec)
+                    _stats["hits_disk"] += 1
+                    return vec
+            except Exception:
+                _stats["errors"] += 1
+        _stats["misses"] += 1
+        return None
+
+
+def put(text: str, vec: List[float]):
+    global _inserts
+    key = _key(text, settings.embedding_model)
+    vec = [float(x) for x in vec]
+    with _lock:
+        db = _open_db()
+        _lru_put(key, vec)
+        if db is None:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vec, last_used) VALUES (?, ?, ?, ?)",
+                (key, len(vec), array("f", vec).tobytes(), int(time.time())),
+            )
+            _inserts += 1
+            if _inserts % 256 == 0:
+                _prune(db)
+            db.commit()
+        except Exception:
+            _stats["errors"] += 1
+
+
+def _prune(db: sqlite3.Connection):
+    (n,) = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    extra = n - settings.embedding_cache_disk_max
+    if extra > 0:
+        db.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (extra,),
+        )
+
+
+def get_or_embed(text: str) -> List[float]:
+    vec = get(text)
+    if vec is not None:
+        return vec
+    from .chroma_setup import embedder  # import târziu: clientul OpenAI e creat o singură dată acolo
+    vec = [float(x) for x in embedder([text])[0]]
+    put(text, vec)
+    return vec
+
+
+def invalidate():
+    with _lock:
+        _lru.clear()
+        db = _open_db()
+        if db is not None:
+            try:
+                db.execute("DELETE FROM embeddings")
+                db.commit()
+            except Exception:
+                _stats["errors"] += 1
+
+
+def stats() -> dict:
+    with _lock:
+        hits = _stats["hits_memory"] + _stats["hits_disk"]
+        total = hits + _stats["misses"]
+        return {
+            **_stats,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            "memory_size": len(_lru),
+            "memory_capacity": settings.embedding_cache_size,
+            "model": settings.embedding_model,
+        }
@@ -0,0 +1,155 @@
+# backend/app/ingest.py
+# Import în masă: consumă un generator de cărți, le embed-uiește în batch-uri de mărime fixă cu
+# concurență limitată, face upsert pe fiecare batch imediat ce e gata și salvează progresul
+# (checkpoint) ca un import întrerupt să poată fi reluat. Tokenii logați sunt cei raportați de API.
+# Cu indexul numpy batch-urile se adună în staging și se scriu o dată la ingest_flush_batches (altfel
+# fiecare batch ar copia și rescrie toată matricea -> O(n²)); checkpoint-ul conține doar ce e pe disc.
+import json, os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import settings
+from .openai_client import client
+from .tokens_logger import log_embedding
+from .rag import _use_numpy, book_document, book_id, content_hash, get_collection
+
+Book = Tuple[str, str, List[str]]
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend
+DEFAULT_CHECKPOINT = BASE_DIR / "cache" / "ingest_checkpoint.json"
+
+
+def _batches(books: Iterable[Book], size: int) -> Iterator[Tuple[int, List[Book]]]:
+    it = iter(books)
+    idx = 0
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield idx, chunk
+        idx += 1
+
+
+def _load_checkpoint(path: Optional[Path], batch_size: int, source_id: str) -> set:
+    if not path or not path.exists():
+        return set()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return set()
+    # batch-urile sunt numerotate după poziție -> checkpoint valid doar pt aceeași sursă, batch_size și model
+    if (data.get("source") != source_id or data.get("batch_size") != batch_size
+            or data.get("model") != settings.embedding_model):
+        return set()
+    return set(data.get("done", []))
+
+
+def _save_checkpoint(path: Optional[Path], batch_size: int, source_id: str, done: set):
+    if not path:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"source": source_id, "batch_size": batch_size, "model": settings.embedding_model,
+                               "done": sorted(done)}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _embed_batch(idx: int, books: List[Book]) -> Dict:
+    ids, docs, metas = [], [], []
+    for (title, summary, themes) in books:
+        doc = book_document(title, summary, themes)
+        ids.append(book_id(title))
+        docs.append(doc)
+        metas.append({"title": title, "themes": ", ".join(themes), "content_hash": content_hash(doc)})
+    resp = client.embeddings.create(model=settings.embedding_model, input=docs)
+    vectors = [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+    usage = getattr(resp, "usage", None)
+    tokens = getattr(usage, "total_tokens", None) or getattr(usage, "prompt_tokens", 0) or 0
+    return {"idx": idx, "ids": ids, "docs": docs, "metas": metas, "vectors": vectors, "tokens": tokens}
+
+
+def _upsert(batch: Dict) -> bool:
+    """True = batch-ul e deja persistat (Chroma); False = e doar în staging-ul indexului numpy."""
+    if _use_numpy():
+        from .vector_index import get_index
+        get_index().upsert(batch["ids"], batch["docs"], batch["metas"], batch["vectors"], persist=False)
+        return False
+    get_collection().upsert(ids=batch["ids"], documents=batch["docs"], metadatas=batch["metas"],
+                            embeddings=batch["vectors"])
+    return True
+
+
+def _flush():
+    if _use_numpy():
+        from .vector_index import get_index
+        get_index().flush()
+
+
+def ingest_books(
+    books: Iterable[Book],
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    checkpoint: Optional[Path] = None,
+    source_id: str = "",
+    on_progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    batch_size = batch_size or settings.ingest_batch_size
+    concurrency = max(1, concurrency or settings.ingest_concurrency)
+    done = _load_checkpoint(checkpoint, batch_size, source_id)
+    stats = {"batches": 0, "items": 0, "tokens": 0, "skipped_batches": len(done)}
+
+    pending = set()
+    staged: List[int] = []  # batch-uri upsert-ate dar încă nescrise pe disc
+    error: Optional[BaseException] = None
+    source = _batches(books, batch_size)
+
+    def _persist():
+        if not staged:
+            return
+        _flush()
+        done.update(staged)
+        staged.clear()
+        _save_checkpoint(checkpoint, batch_size, source_id, done)
+
+    def _collect(futures):
+        nonlocal error
+        for fut in futures:
+            try:
+                batch = fut.result()
+            except Exception as e:
+                error = error or e
+                continue
+            # upsert-ul și checkpoint-ul rulează pe thread-ul apelant -> scrieri seriale în store
+            persisted = _upsert(batch)
+            log_embedding(user="system", input_preview=f"ingest batch {batch['idx']}", tokens=batch["tokens"])
+            staged.append(batch["idx"])
+            if persisted or len(staged) >= max(1, settings.ingest_flush_batches):
+                _persist()
+            stats["batches"] += 1
+            stats["items"] += len(batch["ids"])
+            stats["tokens"] += batch["tokens"]
+            if on_progress:
+                on_progress(dict(stats))
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as pool:
+        for idx, chunk in source:
+            if idx in done:
+                continue
+            if error is not None:
+                break
+            pending.add(pool.submit(_embed_batch, idx, chunk))
+            if len(pending) >= concurrency:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(finished)
+        finished, pending = wait(pending)
+        _collect(finished)
+    _persist()  # și după o eroare: batch-urile reușite rămân pe disc și în checkpoint
+
+    if error is not None:
+        # checkpoint-ul păstrează batch-urile reușite; reluarea le sare
+        raise error
+    if checkpoint and checkpoint.exists():
+        checkpoint.unlink()
+    return stats
@@ -1,7 +1,10 @@
 from loguru import logger
 from datetime import datetime
 from pathlib import Path
-import json
+from typing import List, Optional
+import atexit, json, queue, threading
+
+from .config import settings
 
 
 def _log_dir(base: str) -> Path:
@@ -11,20 +14,133 @@ def _log_dir(base: str) -> Path:
     return root
 
 
+_app_sinks: set = set()  # fișierele app.log care au deja un sink (fiecare modul apelează app_logger())
+_app_sinks_lock = threading.Lock()
+
+
 def app_logger():
-    log_root = _log_dir("")
-    app_path = log_root / "app.log"
-    logger.add(app_path, rotation="10 MB", retention="14 days", enqueue=True)
+    """Loguru cu sink-ul logs/<zi>/app.log adăugat o singură dată per fișier: altfel fiecare apel ar mai
+    adăuga un sink și fiecare linie s-ar scrie de încă o dată."""
+    app_path = _log_dir("") / "app.log"
+    with _app_sinks_lock:
+        if app_path not in _app_sinks:
+            logger.add(app_path, rotation="10 MB", retention="14 days", enqueue=True)
+            _app_sinks.add(app_path)
     return logger
 
 
+class JsonlWriter:
+    """Scriere JSONL în fundal: `write()` doar pune recordul într-o coadă limitată (nu atinge discul);
+    un thread le scrie în batch-uri (la batch_size sau la flush_seconds), în logs/<zi>/<subdir>/<filename>.
+    Ziua se ia la momentul apelului; directorul se creează doar la schimbarea zilei. Dacă coada e plină
+    recordul se pierde (contorizat în `dropped`) – logarea nu blochează niciodată cererea."""
+
+    def __init__(self, subdir: str, filename: str):
+        self.subdir, self.filename = subdir, filename
+        self._q: "queue.Queue" = queue.Queue(maxsize=settings.token_log_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._day: Optional[str] = None
+        self._fh = None
+        self.stats = {"written": 0, "dropped": 0, "batches": 0}
+        _writers.append(self)
+
+    def path_for(self, day: str) -> Path:
+        return Path("logs") / day / self.subdir / self.filename
+
+    def write(self, record: dict):
+        if self._thread is None:
+            self._start()
+        try:
+            self._q.put_nowait((datetime.now().strftime('%d-%m-%Y'), record))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"jsonl-{self.filename}", daemon=True)
+                self._thread.start()
+
+    def _file(self, day: str):
+        if day != self._day:
+            if self._fh:
+                self._fh.close()
+            p = self.path_for(day)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = p.open("a", encoding="utf-8")
+            self._day = day
+        return self._fh
+
+    def _write_batch(self, batch):
+        day, lines = None, []
+        for d, rec in batch:
+            if d != day and lines:
+                self._file(day).write("".join(lines))
+                lines = []
+            day = d
+            lines.append(json.dumps(rec, ensure_ascii=False) + "\n")
+        if lines:
+            f = self._file(day)
+            f.write("".join(lines))
+            f.flush()
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            try:
+                item = self._q.get(timeout=settings.token_log_flush_seconds)
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+                    while len(batch) < settings.token_log_batch_size:
+                        item = self._q.get_nowait()
+                        if item is _STOP:
+                            stop = True
+                            break
+                        batch.append(item)
+            except queue.Empty:
+                pass
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception:
+                    self.stats["dropped"] += len(batch)
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    def close(self, timeout: float = 5.0):
+        """Golește coada și oprește thread-ul (apelat la shutdown)."""
+        if self._thread is None:
+            return
+        try:
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+
+_STOP = object()
+_writers: List[JsonlWriter] = []
+
+
+def close_writers(timeout: float = 5.0):
+    for w in list(_writers):
+        w.close(timeout)
+
+
+atexit.register(close_writers)
+
+
 class TokensLogger:
     def __init__(self):
-        self.root = _log_dir("tokens")
-        self.file = self.root / "tokens.log"
-        self.file.touch(exist_ok=True)
-
+        self._writer = JsonlWriter("", "tokens.log")
 
     def log(self, record: dict):
-        with self.file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
\ No newline at end of file
+        self._writer.write(record)
\ No newline at end of file
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from .db import Base, engine
 from .models import * # noqa: F401
@@ -6,6 +8,9 @@ from .routers import auth_routes, chat_routes, admin_routes
 from .logging_utils import app_logger
 from .config import settings
 from .bootstrap_admin import run as bootstrap_admin 
+from . import redis_pool, metrics
+from .security import HashPoolBusy
+from .email_service import OutboxFull
 
 log = app_logger()
 
@@ -13,6 +18,10 @@ Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Smart Librarian API")
 
+# înaintea CORS: CORS rămâne stratul exterior, deci și răspunsurile 429 au header-ele CORS
+if settings.rate_limit_enabled:
+    from .rate_limit import RateLimitMiddleware
+    app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.frontend_origin],
@@ -26,16 +35,81 @@ app.include_router(chat_routes.router)
 app.include_router(admin_routes.router) #fallback for admin routes - this is not a public API - used only for local development with admin secretkey
 
 
+@app.exception_handler(redis_pool.RedisUnavailable)
+async def _redis_unavailable(request: Request, exc: redis_pool.RedisUnavailable):
+    # doar operațiile fără fallback in-memory ajung aici
+    return JSONResponse(status_code=503, content={"detail": "Serviciu temporar indisponibil. Încearcă din nou."})
+
+
+@app.exception_handler(HashPoolBusy)
+async def _hash_pool_busy(request: Request, exc: HashPoolBusy):
+    # executorul bcrypt e saturat: clientul reîncearcă, event loop-ul rămâne liber pt restul cererilor
+    return JSONResponse(status_code=503, content={"detail": "Serviciu aglomerat. Încearcă din nou."},
+                        headers={"Retry-After": "1"})
+
+
+@app.exception_handler(OutboxFull)
+async def _outbox_full(request: Request, exc: OutboxFull):
+    # serverul SMTP nu ține pasul: nu marcăm codul ca trimis, clientul poate cere din nou
+    return JSONResponse(status_code=503, content={"detail": "Serviciu aglomerat. Încearcă din nou."},
+                        headers={"Retry-After": "5"})
+
+
 @app.get("/")
 async def root():
     return {"status": "ok", "service": "smart-librarian"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
 from .rag import count_books
 @app.on_event("startup")
 async def _log_counts():
     try:
         c = count_books()
         log.info(f"Chroma books count: {c}")
-        bootstrap_admin()
+        promoted = await run_in_threadpool(bootstrap_admin)  # hash bcrypt + SQLite, nu pe event loop
+        if promoted:
+            from .auth_cache import invalidate
+            await invalidate(promoted)
     except Exception:
-        log.warning("Could not count Chroma collection.")
\ No newline at end of file
+        log.warning("Could not count Chroma collection.")
+
+
+@app.on_event("startup")
+async def _init_redis():
+    await redis_pool.init()
+    from .mem_store import start_sweeper
+    start_sweeper()
+    from .usage_rollups import start_refresher
+    start_refresher()
+
+
+@app.on_event("startup")
+async def _watch_catalog():
+    from .patch.catalog import start_watcher
+    start_watcher(settings.catalog_watch_seconds)
+
+
+@app.on_event("shutdown")
+async def _close_clients():
+    from .patch.catalog import stop_watcher
+    stop_watcher()
+    from .mem_store import stop_sweeper
+    stop_sweeper()
+    from .usage_rollups import stop_refresher
+    stop_refresher()
+    from .openai_client import aclose
+    await aclose()
+    await redis_pool.aclose()
+    from .db import dispose_async_engines
+    await dispose_async_engines()
+    from .security import shutdown_hash_pool
+    shutdown_hash_pool()
+    from .email_service import outbox
+    outbox.close()  # trimite ce a rămas în coadă
+    from .logging_utils import close_writers
+    close_writers()  # golește cozile de log (tokeni) înainte de ieșire
\ No newline at end of file
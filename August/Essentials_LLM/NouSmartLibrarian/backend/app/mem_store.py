@@ -0,0 +1,167 @@
+# backend/app/mem_store.py
+# Store in-memory comun pt fallback-urile folosite cât timp Redis e indisponibil (rate limit,
+# context conversație, OTP). Fiecare intrare are TTL; numărul total de intrări e plafonat și la
+# depășire se evacuează cele mai vechi folosite (LRU). Un thread de fundal șterge periodic
+# intrările expirate, ca memoria să scadă și fără citiri. Cheile sunt (namespace, cheie).
+import threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from .config import settings
+
+Key = Tuple[str, Hashable]
+T = TypeVar("T")
+
+SWEEP_BATCH = 1000
+
+
+class MemStore:
+    def __init__(self, max_items: int):
+        self.max_items = max(1, max_items)
+        self._data: "OrderedDict[Key, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+
+    def _live(self, k: Key, now: float):
+        rec = self._data.get(k)
+        if rec is None:
+            return None
+        if rec[1] <= now:
+            del self._data[k]
+            self._stats["expired"] += 1
+            return None
+        self._data.move_to_end(k)
+        return rec
+
+    def _put(self, k: Key, value: Any, exp: float):
+        self._data[k] = (value, exp)
+        self._data.move_to_end(k)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, ns: str, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            rec = self._live((ns, key), time.time())
+            self._stats["hits" if rec else "misses"] += 1
+            return rec[0] if rec else default
+
+    def set(self, ns: str, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._put((ns, key), value, time.time() + ttl)
+            self._stats["sets"] += 1
+
+    def exists(self, ns: str, key: Hashable) -> bool:
+        with self._lock:
+            return self._live((ns, key), time.time()) is not None
+
+    def incr(self, ns: str, key: Hashable, ttl: float, amount: int = 1, refresh_ttl: bool = False) -> int:
+        """Ca INCR (+ EXPIRE la creare, sau la fiecare apel cu refresh_ttl=True). Atomic per proces."""
+        now = time.time()
+        with self._lock:
+            rec = self._live((ns, key), now)
+            value = (int(rec[0]) if rec else 0) + amount
+            exp = now + ttl if (rec is None or refresh_ttl) else rec[1]
+            self._put((ns, key), value, exp)
+            self._stats["sets"] += 1
+            return value
+
+    def delete(self, ns: str, key: Hashable):
+        with self._lock:
+            self._data.pop((ns, key), None)
+
+    def atomic(self, fn: "Callable[[Tx], T]") -> T:
+        """Rulează fn(tx) cu lock-ul luat: mai multe citiri/scrieri ca o singură operație, echivalentul
+        unui script Lua în Redis (atomic per proces)."""
+        with self._lock:
+            return fn(Tx(self, time.time()))
+
+    def clear(self, ns: Optional[str] = None):
+        with self._lock:
+            if ns is None:
+                self._data.clear()
+                return
+            for k in [k for k in self._data if k[0] == ns]:
+                del self._data[k]
+
+    def sweep(self) -> int:
+        """Șterge intrările expirate, în bucăți mici ca lock-ul să nu fie ținut mult."""
+        removed = 0
+        with self._lock:
+            keys = list(self._data.keys())
+        for i in range(0, len(keys), SWEEP_BATCH):
+            now = time.time()
+            with self._lock:
+                n = 0
+                for k in keys[i:i + SWEEP_BATCH]:
+                    rec = self._data.get(k)
+                    if rec is not None and rec[1] <= now:
+                        del self._data[k]
+                        n += 1
+                self._stats["expired"] += n
+            removed += n
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_ns: Dict[str, int] = {}
+            for ns, _ in self._data:
+                per_ns[ns] = per_ns.get(ns, 0) + 1
+            return {**self._stats, "size": len(self._data), "max_items": self.max_items, "namespaces": per_ns}
+
+
+class Tx:
+    """Operațiile din MemStore.atomic – fără lock propriu, îl ține deja apelantul."""
+
+    def __init__(self, store: MemStore, now: float):
+        self._s, self.now = store, now
+
+    def get(self, ns: str, key: Hashable, default: Any = None) -> Any:
+        rec = self._s._live((ns, key), self.now)
+        return rec[0] if rec else default
+
+    def exists(self, ns: str, key: Hashable) -> bool:
+        return self._s._live((ns, key), self.now) is not None
+
+    def set(self, ns: str, key: Hashable, value: Any, ttl: float):
+        self._s._put((ns, key), value, self.now + ttl)
+        self._s._stats["sets"] += 1
+
+    def incr(self, ns: str, key: Hashable, ttl: float) -> int:
+        rec = self._s._live((ns, key), self.now)
+        value = (int(rec[0]) if rec else 0) + 1
+        self._s._put((ns, key), value, rec[1] if rec else self.now + ttl)
+        self._s._stats["sets"] += 1
+        return value
+
+    def delete(self, ns: str, key: Hashable):
+        self._s._data.pop((ns, key), None)
+
+
+STORE = MemStore(settings.mem_store_max_items)
+
+_sweeper: Optional[threading.Thread] = None
+_sweeper_stop = threading.Event()
+
+
+def _sweep_loop(interval: float):
+    while not _sweeper_stop.wait(interval):
+        STORE.sweep()
+
+
+def start_sweeper(interval: Optional[float] = None):
+    global _sweeper
+    interval = settings.mem_store_sweep_seconds if interval is None else interval
+    if interval <= 0 or (_sweeper and _sweeper.is_alive()):
+        return
+    _sweeper_stop.clear()
+    _sweeper = threading.Thread(target=_sweep_loop, args=(interval,), name="mem-store-sweeper", daemon=True)
+    _sweeper.start()
+
+
+def stop_sweeper():
+    _sweeper_stop.set()
+
+
+get, set, exists, incr, delete, clear, stats, atomic = (STORE.get, STORE.set, STORE.exists, STORE.incr, STORE.delete,
+                                                       STORE.clear, STORE.stats, STORE.atomic)
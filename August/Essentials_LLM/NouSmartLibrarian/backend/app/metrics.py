@@ -0,0 +1,124 @@
+# backend/app/metrics.py
+# Metrici Prometheus (servite pe /metrics) + Server-Timing pt /chat/recommend.
+# Fiecare etapă a pipeline-ului se măsoară cu `with stage("retrieve"):` – un perf_counter la intrare
+# și un observe() la ieșire (~µs). Durata ajunge în histogramă și, dacă cererea are un StageTimer
+# activ, și în header-ul Server-Timing al răspunsului.
+import os, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+STAGE_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+OUTCOMES = ("blocked", "offensive", "out_of_scope", "no_results", "need_title", "success", "error")
+
+RECOMMEND_STAGE_SECONDS = Histogram(
+    "librarian_recommend_stage_seconds", "Durata fiecărei etape din /chat/recommend",
+    ["stage"], buckets=STAGE_BUCKETS,
+)
+RECOMMEND_SECONDS = Histogram(
+    "librarian_recommend_seconds", "Durata totală /chat/recommend, pe endpoint și rezultat",
+    ["endpoint", "outcome"], buckets=STAGE_BUCKETS,
+)
+RECOMMEND_TOTAL = Counter(
+    "librarian_recommend_total", "Cereri /chat/recommend, pe endpoint și rezultat",
+    ["endpoint", "outcome"],
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "librarian_password_hash_wait_seconds", "Așteptarea în coada executorului bcrypt", ["op"], buckets=STAGE_BUCKETS,
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "librarian_password_hash_seconds", "Durata hash/verify bcrypt", ["op"], buckets=STAGE_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "librarian_password_hash_rejected_total", "Operații bcrypt respinse (executor saturat -> 503)", ["op"],
+)
+EMAIL_OUTBOX_DEPTH = Gauge(
+    "librarian_email_outbox_depth", "Emailuri în coada outbox, încă netrimise", multiprocess_mode="livesum",
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "librarian_email_send_seconds", "Durata trimiterii SMTP a unui email (fără așteptarea în coadă)",
+    buckets=STAGE_BUCKETS,
+)
+EMAIL_DELIVERY_SECONDS = Histogram(
+    "librarian_email_delivery_seconds", "De la punerea în coadă până la acceptarea de serverul SMTP",
+    buckets=STAGE_BUCKETS,
+)
+EMAIL_TOTAL = Counter(
+    "librarian_email_total", "Emailuri din outbox, pe rezultat (sent / retried / failed / dropped)", ["outcome"],
+)
+RATE_LIMIT_REJECTED = Counter(
+    "librarian_rate_limit_rejected_total", "Cereri respinse cu 429 de middleware-ul de rate limit", ["route"],
+)
+SMTP_CONNECTS = Counter("librarian_smtp_connects_total", "Sesiuni SMTP deschise (connect + STARTTLS + login)")
+
+
+class StageTimer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.outcome = "error"  # suprascris cu ChatResponse.status; rămâne "error" la excepții
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def server_timing(self) -> str:
+        parts = [f"{k};dur={v * 1000:.1f}" for k, v in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_timer: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+
+
+def start_timer() -> StageTimer:
+    t = StageTimer()
+    _timer.set(t)
+    return t
+
+
+def bind(timer: StageTimer):
+    _timer.set(timer)
+
+
+_stage_children: Dict[str, Histogram] = {}
+
+
+def observe(name: str, seconds: float, timer: Optional[StageTimer] = None):
+    child = _stage_children.get(name)
+    if child is None:  # .labels() face lock + lookup la fiecare apel; copilul se poate refolosi
+        child = _stage_children[name] = RECOMMEND_STAGE_SECONDS.labels(name)
+    child.observe(seconds)
+    t = timer or _timer.get()
+    if t is not None:
+        t.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str, timer: Optional[StageTimer] = None):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, timer)
+
+
+def record_outcome(endpoint: str, timer: StageTimer):
+    outcome = timer.outcome if timer.outcome in OUTCOMES else "error"
+    RECOMMEND_TOTAL.labels(endpoint, outcome).inc()
+    RECOMMEND_SECONDS.labels(endpoint, outcome).observe(timer.elapsed())
+
+
+def render() -> tuple:
+    """(payload, content_type) pt /metrics. Cu mai mulți workeri uvicorn, setează
+    PROMETHEUS_MULTIPROC_DIR ca valorile să fie agregate peste procese."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
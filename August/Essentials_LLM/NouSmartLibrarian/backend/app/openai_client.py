@@ -1,5 +1,58 @@
-from openai import OpenAI
+import asyncio
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from .config import settings
 
 
-client = OpenAI(api_key=settings.openai_api_key)
\ No newline at end of file
+client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url or None)
+
+# client async pt calea de chat: nu blochează event loop-ul uvicorn cât așteptăm modelul
+async_client = AsyncOpenAI(
+    api_key=settings.openai_api_key,
+    base_url=settings.openai_base_url or None,
+    timeout=settings.openai_timeout,
+    max_retries=settings.openai_max_retries,
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_connections,
+        ),
+        timeout=settings.openai_timeout,
+    ),
+)
+
+# limită de apeluri simultane per worker; peste ea cererile așteaptă cel mult openai_queue_timeout
+_slots = asyncio.Semaphore(settings.openai_max_concurrency)
+
+
+class LLMBusy(Exception):
+    pass
+
+
+async def chat_completion(**kwargs):
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=settings.openai_queue_timeout)
+    except asyncio.TimeoutError:
+        raise LLMBusy("Prea multe apeluri simultane către model.")
+    try:
+        return await async_client.chat.completions.create(timeout=settings.openai_timeout, **kwargs)
+    finally:
+        _slots.release()
+
+
+async def chat_completion_stream(**kwargs):
+    # slotul rămâne ocupat cât timp se consumă stream-ul, nu doar până la primul byte
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=settings.openai_queue_timeout)
+    except asyncio.TimeoutError:
+        raise LLMBusy("Prea multe apeluri simultane către model.")
+    try:
+        stream = await async_client.chat.completions.create(stream=True, timeout=settings.openai_timeout, **kwargs)
+        async for chunk in stream:
+            yield chunk
+    finally:
+        _slots.release()
+
+
+async def aclose():
+    await async_client.close()
@@ -1,29 +1,18 @@
-import secrets, time
+import secrets
 from datetime import datetime
-from redis import Redis
+from typing import List, Optional
+from . import mem_store, redis_pool
+from .redis_pool import RedisUnavailable
 from .config import settings
 
 
-try:
-    redis = Redis.from_url(
-        settings.redis_url,
-        decode_responses=True,
-        socket_connect_timeout=0.3,
-        socket_timeout=0.3,
-    )
-    redis.ping()
-    _use_redis = True
-except Exception:
-    _use_redis = False
-    # store local: email -> (code, exp_ts) / "reset:email" -> (code, exp_ts)
-    _store = {}
-    # cooldown: email -> exp_ts      / "reset:email" -> exp_ts
-    _last_sent = {}
-    # ratelimit orar: "email:YYYYMMDDHH" -> (count, exp_ts)
-    _hour_count = {}
-
-def _now() -> int:
-    return int(time.time())
+# Fiecare operație OTP = un singur drum până la Redis: un script Lua care face verificarea și scrierea
+# împreună, deci două cereri simultane nu mai pot trece amândouă de cooldown. Codul se generează în
+# Python (secrets, nu math.random din Lua) și se scrie doar dacă scriptul permite trimiterea.
+# Cât timp circuitul Redis e deschis, aceleași operații rulează atomic în mem_store (per proces), pt
+# ambele namespace-uri (signup și reset):
+#   <ns>: email -> code / <ns>_last_sent: email -> 1 / <ns>_hour: "email:YYYYMMDDHH" -> count /
+#   <ns>_attempts: email -> încercări greșite
 
 OTP_KEY = "otp:{email}"
 OTP_LAST_SENT = "otp:last_sent:{email}"
@@ -36,88 +25,106 @@ RESET_OTP_LAST_SENT = "otp_reset:last_sent:{email}"
 RESET_OTP_HOURLY_COUNT = "otp_reset:hour:{email}:{hour}"
 
 
-def generate_and_store_otp(email: str) -> str:
-    code = str(secrets.randbelow(900000) + 100000) # 6 cifre
-    redis.setex(OTP_KEY.format(email=email), settings.otp_ttl, code)
-    return code
-
-
-def verify_otp(email: str, code: str) -> bool:
-    stored = redis.get(OTP_KEY.format(email=email))
-    return stored is not None and stored == code
-
-
-def can_send_otp(email: str) -> bool:
-    # cooldown
-    if redis.exists(OTP_LAST_SENT.format(email=email)):
+# KEYS: code, last_sent, hour, attempts / ARGV: code, ttl, cooldown, limita orară -> 1 = cod emis, 0 = refuzat
+ISSUE_LUA = """
+if redis.call('EXISTS', KEYS[2]) == 1 then return 0 end
+local n = redis.call('INCR', KEYS[3])
+if n == 1 then redis.call('EXPIRE', KEYS[3], 3600) end
+if n > tonumber(ARGV[4]) then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+redis.call('DEL', KEYS[4])
+return 1
+"""
+
+# KEYS: code, attempts / ARGV: code, încercări maxime, ttl -> 1 = corect, 0 = greșit / expirat
+# după prea multe încercări greșite codul se șterge (un cod de 6 cifre nu poate fi ghicit prin forță brută)
+VERIFY_LUA = """
+local stored = redis.call('GET', KEYS[1])
+if not stored then return 0 end
+if stored == ARGV[1] then return 1 end
+local n = redis.call('INCR', KEYS[2])
+if n == 1 then redis.call('EXPIRE', KEYS[2], ARGV[3]) end
+if n >= tonumber(ARGV[2]) then redis.call('DEL', KEYS[1], KEYS[2]) end
+return 0
+"""
+
+
+class OtpNamespace:
+    def __init__(self, ns: str, code_key: str, last_sent_key: str, hourly_key: str):
+        self.ns = ns
+        self.code_key, self.last_sent_key, self.hourly_key = code_key, last_sent_key, hourly_key
+
+    def _keys(self, email: str, hour: str = "") -> List[str]:
+        return [self.code_key.format(email=email), self.last_sent_key.format(email=email),
+                self.hourly_key.format(email=email, hour=hour), f"{self.ns}:attempts:{email}"]
+
+    # --- fallback in-memory: aceeași logică, sub lock-ul din mem_store ---
+    def _issue_mem(self, tx, email: str, hour_key: str, code: str) -> bool:
+        if tx.exists(f"{self.ns}_last_sent", email):
+            return False
+        if tx.incr(f"{self.ns}_hour", hour_key, 3600) > settings.otp_rate_limit_hour:
+            return False
+        tx.set(self.ns, email, code, settings.otp_ttl)
+        tx.set(f"{self.ns}_last_sent", email, 1, settings.otp_cooldown)
+        tx.delete(f"{self.ns}_attempts", email)
+        return True
+
+    def _verify_mem(self, tx, email: str, code: str) -> bool:
+        stored = tx.get(self.ns, email)
+        if stored is None:
+            return False
+        if secrets.compare_digest(str(stored).encode(), code.encode()):
+            return True
+        if tx.incr(f"{self.ns}_attempts", email, settings.otp_ttl) >= settings.otp_max_attempts:
+            tx.delete(self.ns, email)
+            tx.delete(f"{self.ns}_attempts", email)
         return False
-    # rate limit orar
-    hour = datetime.utcnow().strftime('%Y%m%d%H')
-    key = OTP_HOURLY_COUNT.format(email=email, hour=hour)
-    count = redis.incr(key)
-    if count == 1:
-        redis.expire(key, 3600)
-    return count <= settings.otp_rate_limit_hour
-
-
-def mark_otp_sent(email: str):
-    redis.setex(OTP_LAST_SENT.format(email=email), settings.otp_cooldown, "1")
 
+    async def issue(self, email: str) -> Optional[str]:
+        """Cooldown + limita orară + cod nou + marcarea trimiterii, atomic. None = prea multe cereri."""
+        code = str(secrets.randbelow(900000) + 100000)  # 6 cifre
+        hour = datetime.utcnow().strftime('%Y%m%d%H')
+        keys = self._keys(email, hour)
+        try:
+            ok = await redis_pool.run(lambda r: r.register_script(ISSUE_LUA)(
+                keys=keys, args=[code, settings.otp_ttl, settings.otp_cooldown, settings.otp_rate_limit_hour]))
+        except RedisUnavailable:
+            ok = mem_store.atomic(lambda tx: self._issue_mem(tx, email, f"{email}:{hour}", code))
+        return code if int(ok) else None
+
+    async def verify(self, email: str, code: str) -> bool:
+        # codurile emise sunt mereu cifre ASCII; orice altceva (ex. cifre full-width) nu poate fi corect
+        if not (code.isascii() and code.isdigit()):
+            return False
+        keys = self._keys(email)
+        try:
+            ok = await redis_pool.run(lambda r: r.register_script(VERIFY_LUA)(
+                keys=[keys[0], keys[3]], args=[code, settings.otp_max_attempts, settings.otp_ttl]))
+        except RedisUnavailable:
+            ok = mem_store.atomic(lambda tx: self._verify_mem(tx, email, code))
+        return bool(int(ok))
+
+    async def cancel(self, email: str):
+        """Emailul nu a putut fi pus în coadă: codul și cooldown-ul dispar, userul poate cere imediat altul."""
+        keys = self._keys(email)
+        try:
+            await redis_pool.run(lambda r: r.delete(keys[0], keys[1]))
+        except RedisUnavailable:
+            mem_store.atomic(lambda tx: (tx.delete(self.ns, email), tx.delete(f"{self.ns}_last_sent", email)))
 
-def generate_and_store_otp_reset(email: str) -> str:
-    code = str(secrets.randbelow(900000) + 100000)
-    if _use_redis:
-        redis.setex(RESET_OTP_KEY.format(email=email), settings.otp_ttl, code)
-    else:
-        _store["reset:"+email] = (code, _now() + settings.otp_ttl)
-    return code
-
+    async def invalidate(self, email: str):
+        keys = self._keys(email)
+        try:
+            await redis_pool.run(lambda r: r.delete(keys[0], keys[3]))
+        except RedisUnavailable:
+            pass
+        mem_store.atomic(lambda tx: (tx.delete(self.ns, email), tx.delete(f"{self.ns}_attempts", email)))
 
-def verify_otp_reset(email: str, code: str) -> bool:
-    if _use_redis:
-        val = redis.get(RESET_OTP_KEY.format(email=email))
-        return val is not None and val == code
-    tup = _store.get("reset:"+email)
-    return bool(tup) and tup[0] == code and _now() <= tup[1]
 
+SIGNUP = OtpNamespace("otp", OTP_KEY, OTP_LAST_SENT, OTP_HOURLY_COUNT)
+RESET = OtpNamespace("otp_reset", RESET_OTP_KEY, RESET_OTP_LAST_SENT, RESET_OTP_HOURLY_COUNT)
 
-def can_send_otp_reset(email: str) -> bool:
-    if _use_redis:
-        if redis.exists(RESET_OTP_LAST_SENT.format(email=email)):
-            return False
-        from datetime import datetime
-        hour = datetime.utcnow().strftime('%Y%m%d%H')
-        key = RESET_OTP_HOURLY_COUNT.format(email=email, hour=hour)
-        count = redis.incr(key)
-        if count == 1:
-            redis.expire(key, 3600)
-        return count <= settings.otp_rate_limit_hour
-    now = _now()
-    if _last_sent.get("reset:"+email, 0) > now:
-        return False
-    from datetime import datetime
-    hour = datetime.utcnow().strftime('%Y%m%d%H')
-    k = f"reset:{email}:{hour}"
-    cnt, exp = _hour_count.get(k, (0, now + 3600))
-    if now > exp:
-        cnt, exp = 0, now + 3600
-    cnt += 1
-    _hour_count[k] = (cnt, exp)
-    return cnt <= settings.otp_rate_limit_hour
-
-
-def mark_otp_sent_reset(email: str):
-    if _use_redis:
-        redis.setex(RESET_OTP_LAST_SENT.format(email=email), settings.otp_cooldown, "1")
-    else:
-        _last_sent["reset:"+email] = _now() + settings.otp_cooldown
-
-
-def invalidate_otp_reset(email: str):
-    if _use_redis:
-        try:
-            redis.delete(RESET_OTP_KEY.format(email=email))
-        except Exception:
-            pass
-    else:
-        _store.pop("reset:"+email, None)
\ No newline at end of file
+issue_otp, verify_otp, cancel_otp = SIGNUP.issue, SIGNUP.verify, SIGNUP.cancel
+issue_otp_reset, verify_otp_reset, cancel_otp_reset, invalidate_otp_reset = (RESET.issue, RESET.verify, RESET.cancel,
+                                                                              RESET.invalidate)
@@ -1,38 +1,19 @@
-
 from __future__ import annotations
-from pathlib import Path
-from typing import Optional, Dict, Any
-import json
-
-from .data_loader import TITLE_KEYS
-from .title_match import match_title_key
+from typing import Optional
 
-# Optional metadata store
-CANDIDATE_PATHS = [
-    Path(__file__).resolve().parents[2] / "data" / "book_metadata.json",
-    Path(__file__).resolve().parents[3] / "data" / "book_metadata.json",
-    Path(__file__).resolve().parents[1] / "data" / "book_metadata.json",
-    Path.cwd() / "backend" / "app" / "data" / "book_metadata.json",
-    Path.cwd() / "backend" / "data" / "book_metadata.json",
-    Path.cwd() / "data" / "book_metadata.json",
-]
+from .catalog import current
 
-def _load_meta() -> Dict[str, Any]:
-    for p in CANDIDATE_PATHS:
-        if p.exists():
-            try:
-                return json.loads(p.read_text(encoding="utf-8"))
-            except Exception:
-                return {}
-    return {}
+# Metadatele opționale (book_metadata.json) fac parte din snapshot-ul de catalog.
 
-META = _load_meta()
+def __getattr__(name: str):
+    if name == "META":
+        return current().meta
+    if name == "META_INDEX":
+        return current().meta_index
+    raise AttributeError(name)
 
 def _get_field(title: str, field: str):
-    k = match_title_key(title, list(META.keys()) or TITLE_KEYS)
-    if not k: return None
-    v = META.get(k, {}).get(field)
-    return v
+    return current().meta_field(title, field)
 
 def get_pages(title: str) -> Optional[int]:
     v = _get_field(title, "pages")
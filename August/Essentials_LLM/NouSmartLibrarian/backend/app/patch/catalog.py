@@ -0,0 +1,229 @@
+from __future__ import annotations
+# Catalogul de cărți ca un singur obiect imutabil și versionat: rezumate (json + md), metadate,
+# lista de titluri (și cea sortată), indexurile de titluri / lexical / teme și schema tool-ului, construite
+# o singură dată per versiune. O versiune nouă se construiește complet pe lângă cea curentă și apoi
+# se înlocuiește dintr-o atribuire (watcher pe fișiere sau POST /admin/catalog/reload), fără restart.
+# Cererile iau un snapshot cu `current()` și lucrează pe el până la final.
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import hashlib, json, re, threading, time
+
+from loguru import logger as log
+
+from ..config import settings
+from .title_match import TitleIndex, match_title_key
+from .lexical_index import LexicalIndex, _split_themes
+from ..theme_index import ThemeIndex
+
+SEARCH_CANDIDATES = [
+    Path(__file__).resolve().parents[2] / "data",
+    Path(__file__).resolve().parents[3] / "data",
+    Path(__file__).resolve().parents[1] / "data",
+    Path.cwd() / "backend" / "app" / "data",
+    Path.cwd() / "backend" / "data",
+    Path.cwd() / "data",
+]
+FILES = ("book_summaries.json", "book_summaries.md", "book_metadata.json")
+NO_SUMMARY = "Rezumat indisponibil pentru acest titlu."
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def _read_json(p: Path, strict: bool = False) -> Dict[str, Any]:
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        if strict:
+            raise
+        return {}
+
+
+def _read_md(p: Path) -> Dict[str, str]:
+    try:
+        txt = p.read_text(encoding="utf-8")
+    except Exception:
+        return {}
+    out = {}
+    items = re.split(r'^##\s*Title:\s*', txt, flags=re.M)
+    for chunk in items:
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        lines = chunk.splitlines()
+        title = lines[0].strip()
+        summary = "\n".join(lines[1:]).strip()
+        if title:
+            out[title] = summary
+    return out
+
+
+def data_dir() -> Optional[Path]:
+    if settings.catalog_dir:
+        return Path(settings.catalog_dir)
+    for base in SEARCH_CANDIDATES:
+        if (base / "book_summaries.json").exists() or (base / "book_summaries.md").exists():
+            return base
+    return None
+
+
+def file_signature(base: Optional[Path]) -> Signature:
+    # (nume, mtime, mărime) pt fiecare fișier de date – ieftin de verificat periodic
+    if base is None:
+        return ()
+    sig = []
+    for name in FILES:
+        try:
+            st = (base / name).stat()
+            sig.append((name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append((name, 0, -1))
+    return tuple(sig)
+
+
+def build_tools_schema(sorted_titles: List[str]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "get_summary_by_title",
+                "description": "Returnează rezumatul complet pentru un titlu din inventarul local.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "title": {
+                            "type": "string",
+                            "enum": sorted_titles,
+                            "description": "Alege exact un titlu din lista disponibilă."
+                        }
+                    },
+                    "required": ["title"],
+                    "additionalProperties": False
+                }
+            }
+        }
+    ]
+
+
+class Catalog:
+    """Un snapshot al datelor. Nu se modifică după construcție – o actualizare produce alt obiect."""
+
+    def __init__(self, book_json: Mapping[str, str], book_md: Mapping[str, str], meta: Mapping[str, Any],
+                 version: str, source: Optional[Path] = None, signature: Signature = ()):
+        self.book_json: Mapping[str, str] = MappingProxyType(dict(book_json))
+        self.book_md: Mapping[str, str] = MappingProxyType(dict(book_md))
+        self.meta: Mapping[str, Any] = MappingProxyType(dict(meta))
+        self.titles: Tuple[str, ...] = tuple(list(book_json) + [k for k in book_md if k not in book_json])
+        self.sorted_titles: Tuple[str, ...] = tuple(sorted(self.titles, key=lambda s: s.lower()))
+        self.title_index = TitleIndex(self.titles)
+        self.meta_index = TitleIndex(self.meta.keys()) if self.meta else self.title_index
+        self.lexical = LexicalIndex(self.book_json, self.book_md, list(self.titles))
+        self.themes = ThemeIndex([(t, _split_themes(self.book_md.get(t, ""))[1]) for t in self.titles])
+        self.tools_schema = build_tools_schema(list(self.sorted_titles))
+        self.version = version
+        self.source = source
+        self.signature = signature
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def summary(self, title: str) -> str:
+        k = match_title_key(title, self.title_index)
+        if k is None:
+            return NO_SUMMARY
+        s = self.book_json.get(k) if k in self.book_json else self.book_md.get(k)
+        return s if (s or "").strip() else NO_SUMMARY
+
+    def meta_field(self, title: str, field: str):
+        k = match_title_key(title, self.meta_index)
+        if not k:
+            return None
+        return (self.meta.get(k) or {}).get(field)
+
+    def info(self) -> Dict[str, Any]:
+        return {"version": self.version, "titles": len(self.titles), "with_meta": len(self.meta),
+                "themes": len(self.themes.postings), "loaded_at": self.loaded_at}
+
+
+def load_catalog(base: Optional[Path] = None, strict: bool = False) -> Catalog:
+    """strict=True: un JSON invalid (ex. scris pe jumătate) ridică excepție în loc să devină catalog gol."""
+    base = base or data_dir()
+    signature = file_signature(base)
+    h = hashlib.sha1()
+    js, md, meta = {}, {}, {}
+    if base is not None:
+        for name in FILES:
+            p = base / name
+            try:
+                h.update(name.encode() + b"\x00" + p.read_bytes() + b"\x00")
+            except FileNotFoundError:
+                continue
+        js = _read_json(base / "book_summaries.json", strict)
+        md = _read_md(base / "book_summaries.md")
+        meta = _read_json(base / "book_metadata.json", strict)
+    return Catalog(js, md, meta, version=h.hexdigest()[:12], source=base, signature=signature)
+
+
+_current: Catalog = load_catalog()
+_reload_lock = threading.Lock()
+_failed_signature: Signature = ()  # fișierele care au eșuat deja la încărcare -> nu reîncercăm / logăm în buclă
+
+
+def current() -> Catalog:
+    return _current
+
+
+def reload(force: bool = False) -> Dict[str, Any]:
+    """Reîncarcă dacă fișierele s-au schimbat (sau forțat). Versiunea = hash pe conținut, deci un
+    simplu `touch` nu invalidează nimic."""
+    global _current, _failed_signature
+    with _reload_lock:
+        old = _current
+        base = data_dir()
+        sig = file_signature(base)
+        if not force and base == old.source and sig in (old.signature, _failed_signature):
+            return {"changed": False, **old.info()}
+        try:
+            new = load_catalog(base, strict=True)
+        except Exception as e:
+            _failed_signature = sig
+            log.warning(f"Reîncărcarea catalogului a eșuat, rămâne versiunea {old.version}: {e}")
+            raise
+        if new.version == old.version:
+            _current = new  # doar semnătura de fișiere e nouă; conținut identic
+            return {"changed": False, **new.info()}
+        if not new.titles and old.titles:
+            # fișier scris pe jumătate / șters temporar – nu înlocuim un catalog bun cu unul gol
+            log.warning("Catalogul nou e gol; păstrez versiunea curentă.")
+            return {"changed": False, **old.info()}
+        _current = new
+    log.info(f"Catalog {old.version} -> {new.version} ({len(new)} titluri)")
+    return {"changed": True, "previous": old.version, **new.info()}
+
+
+_watcher: Optional[threading.Thread] = None
+_watcher_stop = threading.Event()
+
+
+def _watch(interval: float):
+    while not _watcher_stop.wait(interval):
+        try:
+            reload()
+        except Exception:
+            pass
+
+
+def start_watcher(interval: float):
+    global _watcher
+    if interval <= 0 or (_watcher and _watcher.is_alive()):
+        return
+    _watcher_stop.clear()
+    _watcher = threading.Thread(target=_watch, args=(interval,), name="catalog-watcher", daemon=True)
+    _watcher.start()
+
+
+def stop_watcher():
+    _watcher_stop.set()
@@ -1,70 +1,27 @@
-
 from __future__ import annotations
-from pathlib import Path
 from typing import Dict, List, Tuple
-import re, json, os
-
-from .title_match import match_title_key
 
-SEARCH_CANDIDATES = [
-    Path(__file__).resolve().parents[2] / "data",
-    Path(__file__).resolve().parents[3] / "data",
-    Path(__file__).resolve().parents[1] / "data",
-    Path.cwd() / "backend" / "app" / "data",
-    Path.cwd() / "backend" / "data",
-    Path.cwd() / "data",
-]
+from .catalog import SEARCH_CANDIDATES, current  # noqa: F401
 
-def _read_json(p: Path) -> Dict[str, str]:
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-def _read_md(p: Path) -> Dict[str, str]:
-    try:
-        txt = p.read_text(encoding="utf-8")
-    except Exception:
-        return {}
-    out = {}
-    items = re.split(r'^##\s*Title:\s*', txt, flags=re.M)
-    for chunk in items:
-        chunk = chunk.strip()
-        if not chunk:
-            continue
-        lines = chunk.splitlines()
-        title = lines[0].strip()
-        summary = "\n".join(lines[1:]).strip()
-        if title:
-            out[title] = summary
-    return out
+# Datele vin din snapshot-ul curent al catalogului (patch/catalog.py). Numele vechi rămân disponibile
+# ca atribute dinamice, dar un `from .data_loader import TITLE_KEYS` păstrează versiunea de la import –
+# codul nou folosește `current()`.
 
 def load_summaries() -> Tuple[Dict[str, str], Dict[str, str], List[str]]:
-    js, md = {}, {}
-    for base in SEARCH_CANDIDATES:
-        if not base.exists():
-            continue
-        pj = base / "book_summaries.json"
-        pm = base / "book_summaries.md"
-        if not js and pj.exists():
-            js = _read_json(pj)
-        if not md and pm.exists():
-            md = _read_md(pm)
-        if js or md:
-            break
-    keys = list(js.keys()) + [k for k in md.keys() if k not in js]
-    return js, md, keys
-
-BOOK_JSON, BOOK_MD, TITLE_KEYS = load_summaries()
+    cat = current()
+    return dict(cat.book_json), dict(cat.book_md), list(cat.titles)
+
+def __getattr__(name: str):
+    cat = current()
+    if name == "BOOK_JSON":
+        return cat.book_json
+    if name == "BOOK_MD":
+        return cat.book_md
+    if name == "TITLE_KEYS":
+        return list(cat.titles)
+    if name == "TITLE_INDEX":
+        return cat.title_index
+    raise AttributeError(name)
 
 def get_summary_by_title(title: str) -> str:
-    k = match_title_key(title, TITLE_KEYS)
-    if k is None:
-        return "Rezumat indisponibil pentru acest titlu."
-    if k in BOOK_JSON:
-        s = BOOK_JSON.get(k) or ""
-        return s if s.strip() else "Rezumat indisponibil pentru acest titlu."
-    if k in BOOK_MD:
-        s = BOOK_MD.get(k) or ""
-        return s if s.strip() else "Rezumat indisponibil pentru acest titlu."
-    return "Rezumat indisponibil pentru acest titlu."
+    return current().summary(title)
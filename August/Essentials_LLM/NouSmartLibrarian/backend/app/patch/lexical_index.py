@@ -0,0 +1,163 @@
+
+from __future__ import annotations
+from collections import Counter, defaultdict
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+import math, re, unicodedata
+
+from .title_match import clean_title_for_match
+
+# BM25 peste titlu + teme + rezumat, fuzionat cu rezultatele vectoriale prin reciprocal-rank fusion.
+# Dacă potrivirea lexicală e decisivă (titlu exact în query / termeni unici din rezumat), nu mai
+# facem nici embedding, nici căutare vectorială. Indexul face parte din snapshot-ul de catalog.
+
+K1, B = 1.5, 0.75
+TITLE_BOOST = 3
+MAX_TITLE_WORDS = 8
+# potrivire decisivă fără titlu exact: scor BM25 minim + câți termeni distincți din query are documentul
+# (un singur termen rar, ex. „război” în „dragoste și război”, nu e suficient)
+DECISIVE_MIN_SCORE = 4.0
+DECISIVE_MIN_TERMS = 2
+
+STOPWORDS = {
+    "si", "in", "din", "de", "la", "cu", "o", "un", "una", "unei", "unui", "despre", "ce", "care", "pe",
+    "sa", "se", "mi", "imi", "ma", "te", "rog", "vreau", "as", "vrea", "ceva", "este", "e", "a", "al",
+    "ale", "ai", "sau", "fie", "mai", "foarte", "carte", "carti", "cartea", "roman", "recomanda",
+    "recomandare", "recomandari", "poti", "da", "nu", "the", "of", "and", "an", "to", "for", "book",
+}
+
+
+def _fold(s: str) -> str:
+    s = unicodedata.normalize("NFKD", (s or "").lower())
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+
+def tokenize(s: str) -> List[str]:
+    return [t for t in re.findall(r"\w+", _fold(s)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _phrase(s: str) -> str:
+    return " ".join(re.findall(r"\w+", _fold(s)))
+
+
+def _split_themes(md_text: str) -> Tuple[str, str]:
+    summary, themes = [], ""
+    for line in (md_text or "").splitlines():
+        if line.strip().lower().startswith("teme:"):
+            themes = line.split(":", 1)[1]
+        else:
+            summary.append(line)
+    return " ".join(summary), themes
+
+
+class LexicalIndex:
+    def __init__(self, book_json: Dict[str, str], book_md: Dict[str, str], titles: List[str]):
+        self.titles = list(titles)
+        self.pos = {t: i for i, t in enumerate(self.titles)}
+        self.docs: List[str] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_len: List[int] = []
+        self.doc_terms: List[frozenset] = []
+        self.title_phrases: Dict[str, str] = {}
+        for i, t in enumerate(self.titles):
+            md_summary, themes = _split_themes(book_md.get(t, ""))
+            summary = book_json.get(t) or md_summary
+            self.docs.append(f"Title: {t}\nThemes: {themes.strip()}\nSummary: {summary.strip()}")
+            toks = tokenize(t) * TITLE_BOOST + tokenize(themes) + tokenize(summary)
+            self.doc_len.append(len(toks))
+            self.doc_terms.append(frozenset(toks))
+            for term, tf in Counter(toks).items():
+                self.postings[term].append((i, tf))
+            for variant in (t, clean_title_for_match(t)):
+                p = _phrase(variant)
+                if len(p) >= 4:
+                    self.title_phrases.setdefault(p, t)
+        n = max(1, len(self.titles))
+        self.avgdl = (sum(self.doc_len) / n) if self.doc_len else 0.0
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    def search(self, query: str, k: int = 10, allowed: Optional[Collection[str]] = None) -> List[Tuple[str, float]]:
+        rows = None if allowed is None else {self.pos[t] for t in allowed if t in self.pos}
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                if rows is not None and i not in rows:
+                    continue
+                norm = K1 * (1 - B + B * self.doc_len[i] / (self.avgdl or 1))
+                scores[i] += idf * tf * (K1 + 1) / (tf + norm)
+        top = sorted(scores.items(), key=lambda x: -x[1])[:k]
+        return [(self.titles[i], s) for i, s in top]
+
+    def exact_title(self, query: str) -> Optional[str]:
+        # cel mai lung titlu care apare ca frază întreagă în query (lookup pe n-grame de cuvinte, nu scanare)
+        words = _phrase(query).split()
+        for n in range(min(MAX_TITLE_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                t = self.title_phrases.get(" ".join(words[i:i + n]))
+                if t:
+                    return t
+        return None
+
+    def matched_terms(self, title: str, query: str) -> int:
+        i = self.pos.get(title)
+        return len(set(tokenize(query)) & self.doc_terms[i]) if i is not None else 0
+
+    def document(self, title: str) -> str:
+        i = self.pos.get(title)
+        return self.docs[i] if i is not None else ""
+
+
+def _current_index() -> LexicalIndex:
+    from .catalog import current  # import târziu: catalog.py importă LexicalIndex de aici
+    return current().lexical
+
+
+def decisive_title(query: str, lex: Optional[List[Tuple[str, float]]] = None, ratio: float = 3.0,
+                   index: Optional[LexicalIndex] = None) -> Optional[str]:
+    index = index or _current_index()
+    t = index.exact_title(query)
+    if t:
+        return t
+    lex = lex if lex is not None else index.search(query, k=2)
+    # termeni rari citați din rezumat: scor absolut suficient, mai mulți termeni potriviți și primul scor
+    # îl domină clar pe al doilea (dacă există)
+    if not lex or lex[0][1] < DECISIVE_MIN_SCORE or index.matched_terms(lex[0][0], query) < DECISIVE_MIN_TERMS:
+        return None
+    if len(lex) == 1 or lex[0][1] >= ratio * lex[1][1]:
+        return lex[0][0]
+    return None
+
+
+def rrf(rankings: List[List[str]], k: int = 60) -> List[str]:
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for pos, t in enumerate(ranking):
+            scores[t] += 1.0 / (k + pos + 1)
+    return [t for t, _ in sorted(scores.items(), key=lambda x: -x[1])]
+
+
+def hybrid_retrieve(query: str, k: int, vector_retrieve: Callable[..., List[Dict]],
+                    rrf_k: int = 60, ratio: float = 3.0, index: Optional[LexicalIndex] = None,
+                    allowed_titles: Optional[Collection[str]] = None) -> List[Dict]:
+    """allowed_titles restrânge ambele căutări înainte de scoring (vector_retrieve îl primește ca argument)."""
+    index = index or _current_index()
+    depth = max(k * 2, 10)
+    lex = index.search(query, k=depth, allowed=allowed_titles)
+    lex_titles = [t for t, _ in lex]
+    fast = decisive_title(query, lex, ratio, index)
+    if fast and (allowed_titles is None or fast in allowed_titles):
+        ranked = [fast] + [t for t in lex_titles if t != fast]
+        return [{"chunk": index.document(t), "title": t} for t in ranked[:k]]
+
+    try:
+        if allowed_titles is None:
+            vec = vector_retrieve(query, k=depth) or []
+        else:
+            vec = vector_retrieve(query, k=depth, allowed_titles=list(allowed_titles)) or []
+    except Exception:
+        vec = []
+    chunks = {r.get("title"): r.get("chunk", "") for r in vec if r.get("title")}
+    fused = rrf([lex_titles, [r.get("title") for r in vec if r.get("title")]], k=rrf_k)
+    return [{"chunk": chunks.get(t) or index.document(t), "title": t} for t in fused[:k]]
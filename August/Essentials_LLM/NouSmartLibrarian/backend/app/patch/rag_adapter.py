@@ -7,12 +7,13 @@ def retrieve_filtered(query: str, allowed_titles: List[str], k: int = 5) -> List
     try:
         rag = importlib.import_module("app.rag")
         retrieve = getattr(rag, "retrieve")
-        res = retrieve(query, k=k) or []
+        # filtrul se aplică în index, înainte de top-k (nu mai pierdem locuri pe titluri aruncate mai jos)
+        res = retrieve(query, k=k, allowed_titles=allowed_titles or None) or []
     except Exception:
         try:
             rag = importlib.import_module("..rag", package=__package__)
             retrieve = getattr(rag, "retrieve")
-            res = retrieve(query, k=k) or []
+            res = retrieve(query, k=k, allowed_titles=allowed_titles or None) or []
         except Exception:
             res = []
 
@@ -1,37 +1,12 @@
-from redis import Redis, exceptions
-from ..config import settings
+from .. import rate_limit as _shared
 
-ANON_USED = "anon:used:{sid}"
+# aceeași stare (Redis prin pool-ul comun / fallback) ca app/rate_limit.py, doar limita anonimă diferă
+ANON_USED = _shared.ANON_USED
 ANON_LIMIT = 3
-ANON_TTL = 86400  # 24h
+ANON_TTL = _shared.ANON_TTL
 
-try:
-    redis = Redis.from_url(settings.redis_url, decode_responses=True,
-                           socket_connect_timeout=0.3, socket_timeout=0.3)
-    redis.ping()
-    _redis_ok = True
-except Exception:
-    _redis_ok = False
-    _mem = {}
+async def anon_used_count(sid: str) -> int:
+    return await _shared.anon_used_count(sid)
 
-def anon_used_count(sid: str) -> int:
-    if _redis_ok:
-        try:
-            val = redis.get(ANON_USED.format(sid=sid))
-            return int(val or "0")
-        except Exception:
-            return 0
-    return int(_mem.get(sid, 0))
-
-def mark_anon_used(sid: str):
-    if _redis_ok:
-        try:
-            key = ANON_USED.format(sid=sid)
-            pipe = redis.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, ANON_TTL)
-            pipe.execute()
-        except Exception:
-            pass
-    else:
-        _mem[sid] = str(min(ANON_LIMIT, int(_mem.get(sid, "0")) + 1))
+async def mark_anon_used(sid: str):
+    await _shared.mark_anon_used(sid)
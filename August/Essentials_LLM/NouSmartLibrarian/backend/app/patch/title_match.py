@@ -1,6 +1,7 @@
 
 import re
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Union
 
 def _norm(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip().lower())
@@ -12,7 +13,64 @@ def clean_title_for_match(t: str) -> str:
     x = re.sub(r"\s+de\s+.+$", "", x, flags=re.I)
     return x
 
-def match_title_key(title: str, keys: List[str]) -> Optional[str]:
+def norm_title(t: str) -> str:
+    return _norm(clean_title_for_match(t))
+
+
+GRAM = 3
+
+
+class TitleIndex:
+    """Chei normalizate o singură dată (la încărcarea catalogului): lookup exact O(1) prin dict,
+    lookup de subșir prin postings de trigrame. Rezultatele sunt identice cu scanarea liniară:
+    prima cheie (în ordinea listei) egală, apoi prima cheie care conține titlul."""
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys: List[str] = list(keys)
+        self.key_set = set(self.keys)
+        self.norms: List[str] = [norm_title(k) for k in self.keys]
+        self.exact: Dict[str, str] = {}
+        self.grams: Dict[str, List[int]] = defaultdict(list)
+        for i, n in enumerate(self.norms):
+            self.exact.setdefault(n, self.keys[i])
+            for g in {n[j:j + GRAM] for j in range(len(n) - GRAM + 1)}:
+                self.grams[g].append(i)  # pozițiile rămân sortate crescător
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_set
+
+    def lookup(self, title: str) -> Optional[str]:
+        if not title:
+            return None
+        t = norm_title(title)
+        k = self.exact.get(t)
+        if k is not None:
+            return k
+        if not t:
+            return None
+        if len(t) < GRAM:
+            for i, n in enumerate(self.norms):
+                if t in n:
+                    return self.keys[i]
+            return None
+        grams = {t[j:j + GRAM] for j in range(len(t) - GRAM + 1)}
+        lists = []
+        for g in grams:
+            p = self.grams.get(g)
+            if not p:
+                return None
+            lists.append(p)
+        # candidații = cea mai scurtă listă de postings, verificați în ordine -> primul match e cel liniar
+        for i in min(lists, key=len):
+            if t in self.norms[i]:
+                return self.keys[i]
+        return None
+
+
+def _match_linear(title: str, keys: List[str]) -> Optional[str]:
     if not title:
         return None
     t = _norm(clean_title_for_match(title))
@@ -23,3 +81,8 @@ def match_title_key(title: str, keys: List[str]) -> Optional[str]:
         if t and t in _norm(clean_title_for_match(k)):
             return k
     return None
+
+def match_title_key(title: str, keys: Union[TitleIndex, List[str]]) -> Optional[str]:
+    if isinstance(keys, TitleIndex):
+        return keys.lookup(title)
+    return _match_linear(title, keys)
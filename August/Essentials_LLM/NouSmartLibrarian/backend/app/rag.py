@@ -1,21 +1,33 @@
-from typing import List, Tuple, Any
+from typing import Dict, List, Tuple, Any
+import hashlib
 from .chroma_setup import get_collection
-from .tokens_logger import log_embedding
+from .config import settings
+from . import embedding_cache
+
+GET_PAGE = 5000
+
+
+def _use_numpy() -> bool:
+    return settings.retrieval_backend == "numpy"
+
+
+def book_id(title: str) -> str:
+    return f"book_{title}"
+
+
+def book_document(title: str, summary: str, themes: List[str]) -> str:
+    return f"Title: {title}\nThemes: {', '.join(themes)}\nSummary: {summary}"
+
+
+def content_hash(doc: str) -> str:
+    # hash-ul include modelul: dacă se schimbă modelul de embedding, totul trebuie re-embed-uit
+    return hashlib.sha256(f"{settings.embedding_model}\x00{doc}".encode("utf-8")).hexdigest()
+
 
 def add_books(items: List[Tuple[str, str, List[str]]]):
-    coll = get_collection()
-    ids, docs, metadatas = [], [], []
-    for (title, summary, themes) in items:
-        ids.append(f"book_{title}")
-        docs.append(f"Title: {title}\nThemes: {', '.join(themes)}\nSummary: {summary}")
-        metadatas.append({
-            "title": title,
-            "themes": ", ".join(themes)
-        })
-    # estimare pt log de embedding (Chroma face embeddings intern)
-    est_tokens = sum(int(len(d.split()) * 1.3) for d in docs)
-    log_embedding(user="system", input_preview="init_books", tokens=est_tokens)
-    coll.upsert(ids=ids, documents=docs, metadatas=metadatas)
+    # embedding-urile se calculează explicit, pe batch-uri, ca să logăm tokenii reali raportați de API
+    from .ingest import ingest_books
+    return ingest_books(items)
 
 def _themes_to_list(v: Any):
     if isinstance(v, list):
@@ -24,9 +36,38 @@ def _themes_to_list(v: Any):
         return [t.strip() for t in v.split(",") if t.strip()]
     return []
 
-def retrieve(query, k=3):
+def _retrieve_numpy(query, k, themes=None, allowed_titles=None):
+    from .vector_index import get_index
+    hits = get_index().query(embedding_cache.get_or_embed(query), k=k, themes=themes, titles=allowed_titles)
+    return [{"chunk": h["document"], "title": (h.get("metadata") or {}).get("title", "")} for h in hits]
+
+def _chroma_where(themes=None, allowed_titles=None):
+    # Chroma nu poate căuta într-un câmp "a, b, c": temele devin titluri prin indexul de teme al
+    # catalogului (aceeași sursă ca seed-ul), iar filtrul se aplică în query, înainte de top-k
+    if themes is None and allowed_titles is None:
+        return None, None
+    from .patch.catalog import current
+    index = current().themes
+    rows = index.rows(themes, allowed_titles)
+    if rows is None:
+        return None, None
+    titles = index.titles_for(rows)
+    return titles, ({"title": titles[0]} if len(titles) == 1 else {"title": {"$in": titles}})
+
+def retrieve(query, k=3, themes=None, allowed_titles=None):
+    """Top-k din indexul vectorial. `themes` (OR) și `allowed_titles` restrâng căutarea înainte de scoring."""
+    if _use_numpy():
+        return _retrieve_numpy(query, k, themes, allowed_titles)
+    titles, where = _chroma_where(themes, allowed_titles)
+    if titles is not None and not titles:
+        return []
     coll = get_collection()
-    results = coll.query(query_texts=[query], n_results=k, include=["metadatas", "documents"])
+    try:
+        # embedding-ul vine din cache (LRU / disc); la miss e calculat o dată și salvat
+        emb = embedding_cache.get_or_embed(query)
+        results = coll.query(query_embeddings=[emb], n_results=k, where=where, include=["metadatas", "documents"])
+    except Exception:
+        results = coll.query(query_texts=[query], n_results=k, where=where, include=["metadatas", "documents"])
     contexts = []
     for doc, meta in zip(results.get("documents", [[]])[0], results.get("metadatas", [[]])[0]):
         contexts.append({
@@ -37,8 +78,50 @@ def retrieve(query, k=3):
 
 
 def count_books() -> int:
+    if _use_numpy():
+        from .vector_index import get_index
+        return get_index().count()
     coll = get_collection()
     try:
         return coll.count()
     except Exception:
-        return 0
\ No newline at end of file
+        return 0
+
+
+def get_book_hashes() -> Dict[str, str]:
+    """id -> content_hash pt toate cărțile deja indexate ("" dacă intrarea e dinainte de hash-uri)."""
+    if _use_numpy():
+        from .vector_index import get_index
+        return {it["id"]: (it.get("metadata") or {}).get("content_hash", "") for it in get_index().get()}
+    coll = get_collection()
+    out: Dict[str, str] = {}
+    offset = 0
+    while True:
+        page = coll.get(include=["metadatas"], limit=GET_PAGE, offset=offset)
+        ids = page.get("ids") or []
+        for i, meta in zip(ids, page.get("metadatas") or []):
+            out[i] = (meta or {}).get("content_hash", "")
+        if len(ids) < GET_PAGE:
+            return out
+        offset += GET_PAGE
+
+
+def delete_books(ids: List[str]):
+    if not ids:
+        return
+    if _use_numpy():
+        from .vector_index import get_index
+        get_index().delete(ids)
+        return
+    coll = get_collection()
+    for i in range(0, len(ids), GET_PAGE):
+        coll.delete(ids=ids[i:i + GET_PAGE])
+
+
+def reset_books():
+    if _use_numpy():
+        from .vector_index import get_index
+        get_index().reset()
+        return
+    from .chroma_setup import reset_collection
+    reset_collection()
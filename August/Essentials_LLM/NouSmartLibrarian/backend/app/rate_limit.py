@@ -1,37 +1,153 @@
-from redis import Redis, exceptions
+import math, time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from . import auth_cache, mem_store, metrics, redis_pool
 from .config import settings
+from .redis_pool import RedisUnavailable
 
 ANON_USED = "anon:used:{sid}"
 ANON_LIMIT = 300
 ANON_TTL = 86400  # 24h
 
-try:
-    redis = Redis.from_url(settings.redis_url, decode_responses=True,
-                           socket_connect_timeout=0.3, socket_timeout=0.3)
-    redis.ping()
-    _redis_ok = True
-except Exception:
-    _redis_ok = False
-    _mem = {}
-
-def anon_used_count(sid: str) -> int:
-    if _redis_ok:
-        try:
-            val = redis.get(ANON_USED.format(sid=sid))
-            return int(val or "0")
-        except Exception:
-            return 0
-    return int(_mem.get(sid, 0))
-
-def mark_anon_used(sid: str):
-    if _redis_ok:
-        try:
-            key = ANON_USED.format(sid=sid)
-            pipe = redis.pipeline()
+async def anon_used_count(sid: str) -> int:
+    try:
+        val = await redis_pool.run(lambda r: r.get(ANON_USED.format(sid=sid)))
+        return int(val or "0")
+    except RedisUnavailable:
+        return int(mem_store.get("anon_used", sid, 0))
+
+async def mark_anon_used(sid: str):
+    async def _incr(r):
+        key = ANON_USED.format(sid=sid)
+        async with r.pipeline(transaction=False) as pipe:
             pipe.incr(key)
             pipe.expire(key, ANON_TTL)
-            pipe.execute()
-        except Exception:
-            pass
-    else:
-        _mem[sid] = str(min(ANON_LIMIT, int(_mem.get(sid, "0")) + 1))
+            await pipe.execute()
+    try:
+        await redis_pool.run(_incr)
+    except RedisUnavailable:
+        # fallback: același INCR + EXPIRE, în store-ul comun plafonat
+        mem_store.incr("anon_used", sid, ANON_TTL, refresh_ttl=True)
+
+
+# --- limite per rută și identitate (RateLimitMiddleware), settings.rate_limits ---
+# Fereastră glisantă aproximată din două contoare fixe: cererile din fereastra anterioară se ponderează
+# cu cât din ea se mai suprapune peste ultimele `window` secunde. Memorie O(1) per identitate (nu un log
+# de timestamp-uri), iar verificarea + incrementul sunt un singur script Lua (un drum până la Redis, fără
+# cursa GET-apoi-INCR). Cât timp Redis e indisponibil, aceeași logică rulează atomic în mem_store (per proces).
+# KEYS: contorul ferestrei curente, al celei anterioare / ARGV: limită, fereastră ms, ms scurse din fereastra
+# curentă -> {1, 0} = permis, {0, ms până la următoarea cerere permisă} = respins
+SLIDING_WINDOW_LUA = """
+local cur = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit, w, e = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+if prev * (w - e) / w + cur + 1 > limit then
+  local wait
+  if cur + 1 > limit then
+    -- fereastra curentă e plină: după ce se încheie, contorul ei devine cel anterior și trebuie să scadă și el
+    wait = (w - e) + w - (limit - 1) * w / cur
+  else
+    wait = (w - e) - (limit - 1 - cur) * w / prev
+  end
+  return {0, math.max(1, math.ceil(wait))}
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], 2 * w)
+return {1, 0}
+"""
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str  # "POST /auth/login" – și eticheta `route` din metrici
+    limit: int
+    window: float
+    per: str  # "ip" | "user"
+
+
+def parse_rules(spec: str) -> Dict[Tuple[str, str], Rule]:
+    """ "POST /auth/login=10/60@ip, ..." -> {(metodă, cale): Rule}"""
+    rules = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        route, _, limits = item.strip().partition("=")
+        method, _, path = route.strip().partition(" ")
+        rate, _, per = limits.partition("@")
+        limit, _, window = rate.partition("/")
+        rules[(method.upper(), path.strip())] = Rule(f"{method.upper()} {path.strip()}", int(limit),
+                                                     float(window or 60), per.strip() or "ip")
+    return rules
+
+
+def _sliding_mem(tx, rule: Rule, ident: str, idx: int, elapsed_ms: float) -> Tuple[int, float]:
+    w = rule.window * 1000
+    cur = int(tx.get("ratelimit", (rule.name, ident, idx), 0))
+    prev = int(tx.get("ratelimit", (rule.name, ident, idx - 1), 0))
+    if prev * (w - elapsed_ms) / w + cur + 1 > rule.limit:
+        if cur + 1 > rule.limit:
+            wait = (w - elapsed_ms) + w - (rule.limit - 1) * w / cur
+        else:
+            wait = (w - elapsed_ms) - (rule.limit - 1 - cur) * w / prev
+        return 0, max(1.0, wait)
+    tx.incr("ratelimit", (rule.name, ident, idx), 2 * rule.window)
+    return 1, 0.0
+
+
+async def hit(rule: Rule, ident: str) -> Tuple[bool, float]:
+    """Înregistrează o cerere; (permisă, secunde până la următoarea permisă)."""
+    w = rule.window * 1000
+    now = time.time() * 1000
+    idx = int(now // w)
+    elapsed = now - idx * w
+    key = f"rl:{rule.name}:{ident}:"
+    try:
+        ok, wait = await redis_pool.run(lambda r: r.register_script(SLIDING_WINDOW_LUA)(
+            keys=[f"{key}{idx}", f"{key}{idx - 1}"], args=[rule.limit, int(w), int(elapsed)]))
+    except RedisUnavailable:
+        ok, wait = mem_store.atomic(lambda tx: _sliding_mem(tx, rule, ident, idx, elapsed))
+    return bool(int(ok)), float(wait) / 1000
+
+
+def _cookie(scope, name: str) -> Optional[str]:
+    for k, v in scope.get("headers") or ():
+        if k == b"cookie":
+            for part in v.decode("latin-1").split(";"):
+                key, _, val = part.strip().partition("=")
+                if key == name:
+                    return val
+    return None
+
+
+def _identity(scope, per: str) -> str:
+    if per == "user":
+        token = _cookie(scope, "access_token")
+        data = auth_cache.claims(token) if token else None  # claims verificate, din cache-ul per proces
+        if data and data.get("type") == "access":
+            return f"u:{data['sub']}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else '-'}"
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI (nu BaseHTTPMiddleware: nu atinge body-ul / stream-ul SSE). Rutele fără regulă trec
+    direct, după un singur lookup în dict; peste limită -> 429 cu Retry-After, contorizat pe rută."""
+
+    def __init__(self, app, rules: Optional[str] = None):
+        self.app = app
+        self.rules = parse_rules(settings.rate_limits if rules is None else rules)
+
+    async def __call__(self, scope, receive, send):
+        rule = self.rules.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if rule is None:
+            return await self.app(scope, receive, send)
+        ok, wait = await hit(rule, _identity(scope, rule.per))
+        if ok:
+            return await self.app(scope, receive, send)
+        metrics.RATE_LIMIT_REJECTED.labels(rule.name).inc()
+        response = JSONResponse(status_code=429, content={"detail": "Too many requests. Try later."},
+                                headers={"Retry-After": str(max(1, math.ceil(wait)))})
+        await response(scope, receive, send)
@@ -0,0 +1,159 @@
+# backend/app/redis_pool.py
+# Un singur pool Redis async per worker, folosit de toate modulele cu stare (rate limit, context,
+# OTP, admin). Un circuit breaker comun decide dacă Redis e „disponibil”: după N erori consecutive
+# se deschide și toate modulele trec pe fallback-ul lor in-memory în același timp; după cooldown
+# o singură cerere de probă (half-open) verifică reconectarea, fără restart.
+import asyncio, time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from loguru import logger as log
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError, TimeoutError as RedisTimeoutError
+
+from .config import settings
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class RedisUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = max(1, threshold)
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_after:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True  # o singură cerere trece ca probă, restul rămân pe fallback
+            return True
+        return False
+
+    def success(self):
+        if self.state != CLOSED:
+            log.info("Redis disponibil din nou – circuit închis.")
+        self.state, self.failures, self._probing = CLOSED, 0, False
+
+    def release(self):
+        """Proba s-a încheiat fără verdict despre conexiune (anulată, eroare în op): următoarea cerere probează."""
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.trip()
+
+    def trip(self):
+        if self.state != OPEN:
+            self.trips += 1
+            log.warning(f"Redis indisponibil – circuit deschis pt {self.reset_after:.0f}s (fallback in-memory).")
+        self.state, self.opened_at, self._probing = OPEN, time.monotonic(), False
+
+
+breaker = CircuitBreaker(settings.redis_breaker_threshold, settings.redis_breaker_reset_seconds)
+_pool: Optional[ConnectionPool] = None
+_client: Optional[Redis] = None
+_stats = {"calls": 0, "errors": 0, "rejected": 0}
+
+
+def client() -> Redis:
+    global _pool, _client
+    if _client is None:
+        _pool = ConnectionPool.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            max_connections=settings.redis_max_connections,
+            socket_connect_timeout=settings.redis_timeout,
+            socket_timeout=settings.redis_timeout,
+            health_check_interval=30,
+        )
+        _client = Redis(connection_pool=_pool)
+    return _client
+
+
+def available() -> bool:
+    """Fără efecte: True dacă circuitul nu e deschis (sau cooldown-ul a expirat)."""
+    return breaker.state == CLOSED or time.monotonic() - breaker.opened_at >= breaker.reset_after
+
+
+async def run(op: Callable[[Redis], Awaitable[T]]) -> T:
+    """Execută op(redis) prin circuit breaker. Ridică RedisUnavailable dacă circuitul e deschis sau
+    apelul eșuează – apelantul trece atunci pe fallback."""
+    if not breaker.allow():
+        _stats["rejected"] += 1
+        raise RedisUnavailable("circuit deschis")
+    _stats["calls"] += 1
+    try:
+        result = await op(client())
+    except (RedisConnectionError, RedisTimeoutError, TimeoutError) as e:
+        # doar erorile de conexiune înseamnă Redis indisponibil
+        _stats["errors"] += 1
+        breaker.failure()
+        raise RedisUnavailable(str(e)) from e
+    except RedisError:
+        breaker.success()  # Redis a răspuns (ex. ResponseError dintr-un script): eroarea e a apelantului
+        raise
+    except BaseException:
+        breaker.release()  # CancelledError (client deconectat, shutdown) sau bug în op: proba nu rămâne blocată
+        raise
+    breaker.success()
+    return result
+
+
+async def ping() -> bool:
+    try:
+        return bool(await run(lambda r: r.ping()))
+    except RedisUnavailable:
+        return False
+
+
+async def _health_loop(interval: float):
+    # cât timp circuitul e deschis, reîncercăm periodic în fundal; reconectarea nu așteaptă o cerere
+    while True:
+        await asyncio.sleep(interval)
+        if breaker.state != CLOSED and available():
+            await ping()
+
+
+_health_task: Optional[asyncio.Task] = None
+
+
+async def init():
+    global _health_task
+    if not await ping():
+        # nu mai așteptăm alte N timeout-uri pe cereri reale: deschidem circuitul direct
+        breaker.trip()
+        log.warning("Redis nu răspunde la pornire – se folosesc fallback-urile in-memory până revine.")
+    if _health_task is None and settings.redis_health_interval > 0:
+        _health_task = asyncio.create_task(_health_loop(settings.redis_health_interval))
+
+
+async def aclose():
+    global _client, _pool, _health_task
+    if _health_task is not None:
+        _health_task.cancel()
+        _health_task = None
+    if _client is not None:
+        await _client.aclose()
+        await _pool.aclose()
+        _client = _pool = None
+
+
+def stats() -> dict:
+    in_use = len(getattr(_pool, "_in_use_connections", ())) if _pool else 0
+    idle = len(getattr(_pool, "_available_connections", ())) if _pool else 0
+    return {**_stats, "state": breaker.state, "failures": breaker.failures, "trips": breaker.trips,
+            "connections_in_use": in_use, "connections_idle": idle}
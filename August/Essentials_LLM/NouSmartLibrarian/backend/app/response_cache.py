@@ -0,0 +1,122 @@
+# backend/app/response_cache.py
+# Cache semantic pt /chat/recommend: cheia e embedding-ul query-ului, hit = similaritate cosinus >= prag.
+# Intrările expiră după TTL, numărul lor e plafonat (LRU) și sunt ignorate dacă s-a schimbat catalogul.
+import threading, time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from .config import settings
+
+_lock = threading.Lock()
+_entries: "OrderedDict[int, dict]" = OrderedDict()
+_matrix: Optional[np.ndarray] = None
+_matrix_ids: List[int] = []
+_next_id = 0
+_version_bump = 0
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+
+def catalog_version() -> str:
+    # versiunea snapshot-ului de catalog (hash pe conținut) + bump-uri la re-seed / reset
+    from .patch.catalog import current
+    return f"{current().version}:{_version_bump}"
+
+
+def bump_catalog_version():
+    # apelat când se re-seed-uiește / resetează colecția -> toate intrările devin invalide
+    global _version_bump
+    with _lock:
+        _version_bump += 1
+        _drop_all()
+
+
+def _unit(vec) -> np.ndarray:
+    v = np.asarray(vec, dtype=np.float32)
+    n = float(np.linalg.norm(v))
+    return v / n if n else v
+
+
+def _drop_all():
+    global _matrix
+    _entries.clear()
+    _matrix = None
+
+
+def _drop(entry_id: int):
+    global _matrix
+    _entries.pop(entry_id, None)
+    _matrix = None
+
+
+def _rebuild_matrix():
+    global _matrix, _matrix_ids
+    _matrix_ids = list(_entries.keys())
+    _matrix = np.stack([_entries[i]["vec"] for i in _matrix_ids]) if _matrix_ids else None
+
+
+def lookup(vec) -> Optional[dict]:
+    if not settings.response_cache_enabled:
+        return None
+    q = _unit(vec)
+    now = time.time()
+    version = catalog_version()
+    with _lock:
+        for eid, e in list(_entries.items()):
+            if e["version"] != version or now - e["ts"] > settings.response_cache_ttl:
+                _drop(eid); _stats["expired"] += 1
+        if not _entries:
+            _stats["misses"] += 1
+            return None
+        if _matrix is None:
+            _rebuild_matrix()
+        if _matrix.shape[1] != q.shape[0]:
+            _stats["misses"] += 1
+            return None
+        sims = _matrix @ q
+        best = int(np.argmax(sims))
+        if float(sims[best]) < settings.response_cache_threshold:
+            _stats["misses"] += 1
+            return None
+        eid = _matrix_ids[best]
+        _entries.move_to_end(eid)
+        _stats["hits"] += 1
+        return dict(_entries[eid]["payload"], similarity=float(sims[best]))
+
+
+def store(vec, recommended_title: Optional[str], message: str, summary: Optional[str], shortlist: List[str]):
+    global _next_id, _matrix
+    if not settings.response_cache_enabled:
+        return
+    entry = {
+        "vec": _unit(vec),
+        "payload": {
+            "recommended_title": recommended_title,
+            "message": message,
+            "summary": summary,
+            "shortlist": list(shortlist),
+        },
+        "ts": time.time(),
+        "version": catalog_version(),
+    }
+    with _lock:
+        _next_id += 1
+        _entries[_next_id] = entry
+        while len(_entries) > max(1, settings.response_cache_size):
+            eid = next(iter(_entries))
+            _drop(eid); _stats["evictions"] += 1
+        # matricea se reconstruiește leneș la următorul lookup
+        _matrix = None
+        _stats["stores"] += 1
+
+
+def clear():
+    with _lock:
+        _drop_all()
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "size": len(_entries), "capacity": settings.response_cache_size,
+                "threshold": settings.response_cache_threshold, "catalog_version": catalog_version()}
@@ -1,9 +1,7 @@
 from fastapi import Request, Response, HTTPException, Depends
 
 from ..config import settings
-from ..security import decode_token
-from ..models import User
-from ..db import get_db
+from .. import auth_cache
 
 
 def set_auth_cookies(response, access: str, refresh: str):
@@ -22,21 +20,18 @@ def clear_auth_cookies(response):
     response.delete_cookie("refresh_token")
 
 
-def get_current_user_optional(request: Request, db = Depends(get_db)):
+async def get_current_user_optional(request: Request):
     token = request.cookies.get("access_token")
-    data = decode_token(token) if token else None
+    data = auth_cache.claims(token) if token else None
     if not data or data.get("type") != "access":
         return None
-    uid = data["sub"]  # UUID string
-    u = db.get(User, uid)
-    if not u:
-        return None
-    return {"id": u.id, "email": u.email, "username": u.username, "role": u.role, "first_name": u.first_name, "last_name": u.last_name}
+    # din cache (Redis, comun workerilor); DB doar la miss sau după invalidare
+    return await auth_cache.get_user(data["sub"])  # sub = UUID string
 
 
 def require_roles(*roles):
-    def _dep(u: User | None = Depends(get_current_user_optional)):
-        if not u or u.role not in roles:
+    def _dep(u: dict | None = Depends(get_current_user_optional)):
+        if not u or u.get("role") not in roles:
             raise HTTPException(status_code=403, detail="Forbidden")
         return u
     return _dep
\ No newline at end of file
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from redis import Redis
 from ..config import settings
 from ..db import get_db
 from ..models import User, Preference
-from ..chroma_setup import reset_collection
 from ._helpers import require_roles
-from ..rag import count_books, retrieve
+from ..rag import count_books, retrieve, reset_books
+from .. import auth_cache, email_service, embedding_cache, mem_store, redis_pool, response_cache, security, usage_rollups
+from ..redis_pool import RedisUnavailable
+from ..patch import catalog
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -29,13 +31,22 @@ async def clear_all(
         db.query(Preference).delete(); cleared.append("preferences")
     if any(t in target for t in ("sqlite", "all", "users", "preferences")):
         db.commit()
+        await auth_cache.invalidate_all()
     if target in ("redis", "all"):
-        r = Redis.from_url(settings.redis_url, decode_responses=True)
-        for pat in ["anon:used:*","otp:*","otp:last_sent:*","otp:hour:*","otp_reset:*","otp_reset:last_sent:*","otp_reset:hour:*"]:
-            for k in r.scan_iter(pat): r.delete(k)
-        cleared.append("redis")
+        async def _clear(r):
+            for pat in ["anon:used:*","otp:*","otp:last_sent:*","otp:hour:*","otp_reset:*","otp_reset:last_sent:*","otp_reset:hour:*"]:
+                async for k in r.scan_iter(pat): await r.delete(k)
+        try:
+            await redis_pool.run(_clear); cleared.append("redis")
+        except RedisUnavailable:
+            pass
     if target in ("chroma", "all"):
-        reset_collection(); cleared.append("chroma")
+        reset_books(); cleared.append("chroma")
+        response_cache.bump_catalog_version()
+    if target in ("embeddings", "all"):
+        embedding_cache.invalidate(); cleared.append("embeddings")
+    if target in ("responses", "all"):
+        response_cache.clear(); cleared.append("responses")
     return {"status": "ok", "cleared": cleared or [target]}
 
 @router.get("/chroma-stats")
@@ -44,4 +55,64 @@ def chroma_stats():
 
 @router.get("/chroma-sample")
 def chroma_sample(q: str = "prietenie și magie", k: int = 2):
-    return {"sample": retrieve(q, k)}
\ No newline at end of file
+    return {"sample": retrieve(q, k)}
+
+@router.get("/embedding-cache")
+def embedding_cache_stats(_: dict = Depends(require_roles("admin"))):
+    return embedding_cache.stats()
+
+@router.get("/response-cache")
+def response_cache_stats(_: dict = Depends(require_roles("admin"))):
+    return response_cache.stats()
+
+@router.get("/redis")
+def redis_stats(_: dict = Depends(require_roles("admin"))):
+    return redis_pool.stats()
+
+@router.get("/auth-cache")
+def auth_cache_stats(_: dict = Depends(require_roles("admin"))):
+    return auth_cache.stats()
+
+@router.get("/hash-pool")
+def hash_pool_stats(_: dict = Depends(require_roles("admin"))):
+    return security.hash_pool_stats()
+
+@router.get("/email-outbox")
+def email_outbox_stats(_: dict = Depends(require_roles("admin"))):
+    return email_service.outbox.info()
+
+@router.get("/mem-store")
+def mem_store_stats(_: dict = Depends(require_roles("admin"))):
+    return mem_store.stats()
+
+@router.get("/catalog")
+def catalog_info(_: dict = Depends(require_roles("admin"))):
+    return catalog.current().info()
+
+@router.post("/catalog/reload")
+def catalog_reload(force: bool = False, _: dict = Depends(require_roles("admin"))):
+    # reîncarcă fișierele de date fără restart; cererile în curs termină pe snapshot-ul vechi
+    try:
+        return catalog.reload(force=force)
+    except Exception as e:
+        raise HTTPException(422, f"Catalog invalid, versiunea curentă a rămas activă: {e}")
+
+@router.get("/usage")
+async def usage(
+    group_by: str = "day",
+    day_from: str | None = None,
+    day_to: str | None = None,
+    user: str | None = None,
+    model: str | None = None,
+    limit: int = 100,
+    _: dict = Depends(require_roles("admin")),
+):
+    """Tokeni și cost din rollups, ex. group_by=user,day sau group_by=model&day_from=2025-09-01.
+    Înainte de răspuns se citesc doar liniile noi din loguri (de la offset-ul salvat)."""
+    groups = [g.strip() for g in group_by.split(",") if g.strip()]
+    bad = [g for g in groups if g not in usage_rollups.GROUPS]
+    if bad:
+        raise HTTPException(400, f"group_by necunoscut: {', '.join(bad)} (permis: {', '.join(usage_rollups.GROUPS)})")
+    await run_in_threadpool(usage_rollups.refresh)
+    rows = await run_in_threadpool(usage_rollups.query, groups, day_from, day_to, user, model, limit)
+    return {"group_by": groups, "rows": rows}
@@ -1,19 +1,20 @@
 from email_validator import validate_email, EmailNotValidError
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, or_, select
+from sqlalchemy.exc import IntegrityError
 from email_validator import validate_email, EmailNotValidError
 from ._helpers import set_auth_cookies, clear_auth_cookies, get_current_user_optional
 from ..schemas import RegisterStep2, LoginRequest, PrefsUpdate
 from ..models import User, Preference
-from ..db import get_db
-from ..security import hash_password, verify_password, create_token, create_access_token, create_refresh_token
+from ..db import AsyncSessionLocal, AsyncWriteSessionLocal
+from ..security import hash_password_async, verify_password_async, create_token, create_access_token, create_refresh_token
 from ..otp import (
-    generate_and_store_otp, verify_otp, can_send_otp, mark_otp_sent,
-    generate_and_store_otp_reset, verify_otp_reset, can_send_otp_reset, mark_otp_sent_reset, invalidate_otp_reset
+    issue_otp, verify_otp, cancel_otp, issue_otp_reset, verify_otp_reset, cancel_otp_reset, invalidate_otp_reset
 )
 from ..config import settings
-from ..email_service import send_otp_email
+from ..email_service import OutboxFull, send_otp_email
+from .. import auth_cache
 import re
 
 
@@ -26,50 +27,65 @@ async def send_otp(email: str):
         validate_email(email)
     except EmailNotValidError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    if not can_send_otp(email):
+    code = await issue_otp(email)  # cooldown + limită + cod, atomic
+    if code is None:
         raise HTTPException(status_code=429, detail="Too many requests. Try later.")
-    code = generate_and_store_otp(email)
-    send_otp_email(email, code)
-    mark_otp_sent(email)
+    try:
+        send_otp_email(email, code)  # doar pune mesajul în outbox; trimiterea SMTP e în thread-ul de fundal
+    except OutboxFull:
+        await cancel_otp(email)
+        raise
     return {"status": "ok"}
 
 
 @router.post("/verify-otp")
 async def verify(email: str, code: str):
-    if verify_otp(email, code):
+    if await verify_otp(email, code):
         return {"status": "ok"}
     raise HTTPException(status_code=400, detail="Invalid code")
 
 
+def _by_identifier(identifier: str):
+    return select(User).where(or_(User.email == identifier, User.username == identifier))
+
+
+# sesiuni scurte (async with), nu Depends: conexiunea revine în pool înainte de bcrypt / alte await-uri;
+# scrierile trec prin AsyncWriteSessionLocal (o singură conexiune de scriere per worker)
 @router.post("/register")
-async def register(payload: RegisterStep2, db: Session = Depends(get_db)):
+async def register(payload: RegisterStep2):
     # minimă validare parolă: 8+ caractere, o literă, o cifră
     import re
     if not re.search(r"[A-Za-z]", payload.password) or not re.search(r"\d", payload.password):
         raise HTTPException(status_code=400, detail="Parolă slabă: trebuie litere și cifre.")
 
-    if db.query(User).filter((User.email == payload.email) | (User.username == payload.username)).first():
+    async with AsyncSessionLocal() as db:
+        taken = (await db.execute(select(User.id).where(
+            (User.email == payload.email) | (User.username == payload.username)).limit(1))).first()
+    if taken:
         raise HTTPException(status_code=400, detail="Email sau username deja folosit.")
-
+    password_hash = await hash_password_async(payload.password)
 
     user = User(
         email=payload.email,
         username=payload.username,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         first_name=payload.first_name,
         last_name=payload.last_name,
         role="user"  # implicit rolul este user
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        async with AsyncWriteSessionLocal() as db, db.begin():
+            db.add(user)
+    except IntegrityError:  # înregistrare concurentă cu același email / username
+        raise HTTPException(status_code=400, detail="Email sau username deja folosit.")
     return {"status": "ok"}
 
 
 @router.post("/login")
-async def login(payload: LoginRequest, response: Response, db: Session = Depends(get_db)):
-    u = db.query(User).filter((User.email == payload.identifier) | (User.username == payload.identifier)).first()
-    if not u or not verify_password(payload.password, u.password_hash):
+async def login(payload: LoginRequest, response: Response):
+    async with AsyncSessionLocal() as db:
+        u = (await db.execute(_by_identifier(payload.identifier).limit(1))).scalars().first()
+    if not u or not await verify_password_async(payload.password, u.password_hash):
         raise HTTPException(status_code=401, detail="Credențiale invalide")
 
     access = create_access_token(u.id, u.role)
@@ -80,7 +96,7 @@ async def login(payload: LoginRequest, response: Response, db: Session = Depends
 
 
 @router.post("/refresh")
-async def refresh_token(request: Request, response: Response, db: Session = Depends(get_db)):
+async def refresh_token(request: Request, response: Response):
     from ..security import decode_token
     refresh = request.cookies.get("refresh_token")
     if not refresh:
@@ -89,7 +105,8 @@ async def refresh_token(request: Request, response: Response, db: Session = Depe
     if not data or data.get("type") != "refresh":
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    u = db.get(User, data["sub"])  # sub = UUID
+    async with AsyncSessionLocal() as db:
+        u = await db.get(User, data["sub"])  # sub = UUID
     if not u:
         raise HTTPException(status_code=401, detail="User not found")
 
@@ -110,13 +127,13 @@ async def me(user = Depends(get_current_user_optional)):
 
 
 @router.post("/preferences")
-async def set_prefs(payload: PrefsUpdate, user = Depends(get_current_user_optional), db: Session = Depends(get_db)):
+async def set_prefs(payload: PrefsUpdate, user = Depends(get_current_user_optional)):
     if not user:
         raise HTTPException(status_code=401, detail="Auth required")
-    db.query(Preference).filter(Preference.user_id == user["id"]).delete()
-    for g in set(payload.genres):
-        db.add(Preference(user_id=user["id"], genre=g))
-    db.commit()
+    async with AsyncWriteSessionLocal() as db, db.begin():
+        await db.execute(delete(Preference).where(Preference.user_id == user["id"]))
+        db.add_all([Preference(user_id=user["id"], genre=g) for g in set(payload.genres)])
+    await auth_cache.invalidate(user["id"])
     return {"status": "ok"}
 
 @router.post("/reset/send-otp")
@@ -126,17 +143,20 @@ async def reset_send_otp(email: str):
         validate_email(email)
     except EmailNotValidError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    if not can_send_otp_reset(email):
+    code = await issue_otp_reset(email)
+    if code is None:
         raise HTTPException(status_code=429, detail="Too many requests. Try later.")
-    code = generate_and_store_otp_reset(email)
-    send_otp_email(email, code) # subiect generic din email_service
-    mark_otp_sent_reset(email)
+    try:
+        send_otp_email(email, code) # subiect generic din email_service
+    except OutboxFull:
+        await cancel_otp_reset(email)
+        raise
     return {"status": "ok"}
 
 
 @router.post("/reset/verify")
 async def reset_verify(email: str, code: str):
-    if verify_otp_reset(email, code):
+    if await verify_otp_reset(email, code):
         return {"status": "ok"}
     raise HTTPException(status_code=400, detail="Invalid code")
 
@@ -148,9 +168,9 @@ class ResetCompletePayload(BaseModel):
 
 
 @router.post("/reset/complete")
-async def reset_complete(payload: ResetCompletePayload, db: Session = Depends(get_db)):
+async def reset_complete(payload: ResetCompletePayload):
     # 1) Verifică OTP (fără a divulga dacă userul există)
-    if not verify_otp_reset(payload.email, payload.code):
+    if not await verify_otp_reset(payload.email, payload.code):
         raise HTTPException(status_code=400, detail="Invalid or expired code")
 
     # 2) Validate password strength (8+, o majusculă, o cifră, un caracter special)
@@ -159,12 +179,13 @@ async def reset_complete(payload: ResetCompletePayload, db: Session = Depends(ge
         raise HTTPException(status_code=400, detail="Parola trebuie să aibă min 8 caractere, o literă mare, o cifră și un caracter special.")
 
 
-    # 3) Update user dacă există (răspunsul rămâne generic)
-    u = db.query(User).filter(User.email == payload.email).first()
-    if u:
-        u.password_hash = hash_password(pw)
-        db.add(u)
-        db.commit()
+    # 3) Update user dacă există (răspunsul rămâne generic); hash-ul se calculează oricum, înainte de
+    #    a lua o conexiune din pool – și durata răspunsului nu mai depinde de existența contului
+    password_hash = await hash_password_async(pw)
+    async with AsyncWriteSessionLocal() as db, db.begin():
+        u = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
+        if u:
+            u.password_hash = password_hash
     # 4) Invalidează OTP
-    invalidate_otp_reset(payload.email)
+    await invalidate_otp_reset(payload.email)
     return {"status": "ok"}
@@ -1,23 +1,29 @@
 
 from fastapi import APIRouter, Depends, Request, Response, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
-import json, re
+import json, re, time
 
 from ..patch.profanity import is_offensive
 from ..patch.rate_limit import anon_used_count, mark_anon_used, ANON_LIMIT
 from ..patch.logging_utils import app_logger
 from ..patch.tokens_logger import log_request, log_response
-from ..patch.conversation_state import get_ctx, update_ctx
+from ..conversation_state import ConversationContext
 
 try:
     from ..rag import retrieve
-    def retrieve_candidates(q: str, k: int):
-        return retrieve(q, k=k) or []
+    from ..patch.lexical_index import hybrid_retrieve
+    def retrieve_candidates(q: str, k: int, cat=None, allowed=None):
+        if getattr(settings, "hybrid_retrieval", False):
+            return hybrid_retrieve(q, k, retrieve, rrf_k=settings.hybrid_rrf_k,
+                                   ratio=settings.hybrid_decisive_ratio,
+                                   index=(cat or current()).lexical, allowed_titles=allowed) or []
+        return retrieve(q, k=k, allowed_titles=None if allowed is None else list(allowed)) or []
 except Exception:
     from ..patch.rag_adapter import retrieve_filtered
-    from ..patch.data_loader import TITLE_KEYS
-    def retrieve_candidates(q: str, k: int):
-        return retrieve_filtered(q, allowed_titles=TITLE_KEYS, k=k)
+    def retrieve_candidates(q: str, k: int, cat=None, allowed=None):
+        return retrieve_filtered(q, allowed_titles=list(allowed if allowed is not None else (cat or current()).titles), k=k)
 
 try:
     from ..routers._helpers import get_current_user_optional
@@ -32,32 +38,39 @@ except Exception:
     settings=_S()
 
 try:
-    from ..openai_client import client
+    from ..openai_client import chat_completion, chat_completion_stream
 except Exception:
-    raise RuntimeError("openai_client.client indisponibil – păstrează clientul existent din proiect.")
+    raise RuntimeError("openai_client.chat_completion indisponibil – păstrează clientul existent din proiect.")
 
 from ..schemas import ChatRequest, ChatResponse
 
-from ..patch.data_loader import BOOK_JSON, BOOK_MD, TITLE_KEYS, get_summary_by_title
+from ..patch.catalog import Catalog, current
 from ..patch.intent import classify
 from ..patch.book_kb import get_pages, get_author, get_year
 from ..patch.title_match import match_title_key
+from ..patch.lexical_index import decisive_title
+from .. import embedding_cache, response_cache, metrics
+from ..metrics import stage
 log = app_logger()
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-def allowed_titles() -> List[str]:
-    return sorted(TITLE_KEYS, key=lambda s: s.lower())
-
-
-def shortlist_from_rag(query: str, k: int = 5) -> List[str]:
-    res = retrieve_candidates(query, k=k)
+def shortlist_from_rag(query: str, k: int = 5, cat: Optional[Catalog] = None,
+                       themes: Optional[List[str]] = None) -> List[str]:
+    cat = cat or current()
+    res = []
+    if themes:
+        # pre-filtru pe temele preferate (index temă -> cărți), aplicat înainte de scoring
+        allowed = set(cat.themes.titles_for(cat.themes.rows(themes)))
+        res = retrieve_candidates(query, k=k, cat=cat, allowed=allowed) if allowed else []
+    if not res:
+        res = retrieve_candidates(query, k=k, cat=cat)
     titles, seen = [], set()
     for r in res:
         t = (r.get("title") or "").strip()
         if not t: continue
         if t in seen: continue
-        if t in TITLE_KEYS:
+        if t in cat.title_index:
             seen.add(t);
             titles.append(t)
     return titles
@@ -73,6 +86,34 @@ SYSTEM_PROMPT = (
 )
 
 
+SINGLE_PROMPT = (
+    "Ești Smart Librarian. Recomandă O SINGURĂ carte **doar din candidații dați**.\n"
+    "Răspunde strict în formatul cerut: `title` = titlul EXACT ales, `message` = textul pentru utilizator "
+    "(2-4 fraze, în română, de ce se potrivește cartea). Nu include rezumatul complet, îl atașăm noi.\n"
+    "Ești restricționat la subiecte despre cărți din inventarul local. Pentru solicitări în afara domeniului, "
+    "răspunde politicos că nu e în aria ta."
+)
+
+
+def build_single_schema(shortlist: List[str]) -> Dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "recommendation",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string", "enum": list(shortlist)},
+                    "message": {"type": "string"},
+                },
+                "required": ["title", "message"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
 def ensure_anon_cookie(request: Request, response: Response) -> str:
     sid = request.cookies.get("anon_session_id")
     if not sid:
@@ -82,30 +123,6 @@ def ensure_anon_cookie(request: Request, response: Response) -> str:
     return sid
 
 
-def build_tools_schema() -> List[Dict[str, Any]]:
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "get_summary_by_title",
-                "description": "Returnează rezumatul complet pentru un titlu din inventarul local.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "title": {
-                            "type": "string",
-                            "enum": allowed_titles(),
-                            "description": "Alege exact un titlu din lista disponibilă."
-                        }
-                    },
-                    "required": ["title"],
-                    "additionalProperties": False
-                }
-            }
-        }
-    ]
-
-
 def detect_ordinal_ref(text: str) -> Optional[int]:
     s = (text or "").lower()
     if "prima" in s or "primă" in s: return 1
@@ -118,7 +135,7 @@ def detect_ordinal_ref(text: str) -> Optional[int]:
 @router.get("/anon-status")
 async def anon_status(request: Request, response: Response):
     sid = ensure_anon_cookie(request, response)
-    used = anon_used_count(sid)
+    used = await anon_used_count(sid)
     remaining = max(0, ANON_LIMIT - used)
     if remaining == 0:
         msg = "Neautentificat: Nu mai ai autentificari gratuite. Creează cont pentru acces nelimitat."
@@ -130,24 +147,59 @@ async def anon_status(request: Request, response: Response):
 
 
 
-@router.post("/recommend", response_model=ChatResponse)
-async def recommend(payload: ChatRequest, request: Request, response: Response,
-                    user=Depends(get_current_user_optional)):
-    q = (payload.query or "").strip()
-    if not q:
-        raise HTTPException(400, "Mesajul este gol.")
-    current_user = user
+class _Plan:
+    """Starea unei recomandări după primul apel LLM (tool-ul rezolvat), înainte de răspunsul final."""
+    def __init__(self, ctx: ConversationContext, current_user, user_label: str, shortlist: List[str], messages: List[Dict[str, Any]],
+                 recommended_title: Optional[str], summary_text: Optional[str], q_emb, catalog: Catalog):
+        self.ctx = ctx
+        self.current_user = current_user
+        self.user_label = user_label
+        self.shortlist = shortlist
+        self.messages = messages
+        self.recommended_title = recommended_title
+        self.summary_text = summary_text
+        self.q_emb = q_emb
+        self.catalog = catalog
+        # setat doar în modul "single": textul final vine din același apel
+        self.final_text: Optional[str] = None
+        # recomandarea gratuită (anonim) a fost deja consumată – stream-ul o consumă înainte de `title`
+        self.anon_charged = False
+
+
+def _preference_themes(q: str, current_user, cat: Catalog) -> Optional[List[str]]:
+    """Temele din preferințele userului care există în catalog – doar pt cereri vagi: dacă query-ul
+    numește un titlu sau o temă, are prioritate față de preferințe."""
+    if not settings.preference_filter or not current_user:
+        return None
+    themes = cat.themes.known(current_user.get("preferences") or [])
+    if not themes or cat.lexical.exact_title(q) or cat.themes.mentioned(q):
+        return None
+    return themes
+
+
+def _ctx_id(request: Request, current_user) -> str:
+    return f"user:{current_user['id']}" if current_user else f"anon:{request.cookies.get('anon_session_id')}"
+
+
+async def _prepare(q: str, request: Request, response: Response, current_user, ctx: ConversationContext):
+    """Gărzile, follow-up-urile, cache-ul și primul apel LLM. Întoarce fie un ChatResponse final, fie un _Plan.
+    Modificările de context rămân în `ctx`; apelantul face un singur flush la final."""
+    cat = current()  # un singur snapshot de catalog pe toată cererea, chiar dacă între timp se face reload
     if not current_user:
         sid = ensure_anon_cookie(request, response)
-        if anon_used_count(sid) >= ANON_LIMIT:
+        with stage("anon_quota"):
+            used = await anon_used_count(sid)
+        if used >= ANON_LIMIT:
             return ChatResponse(status="blocked",
                                 message="Limita gratuită a fost atinsă. Creează cont pentru acces nelimitat.")
 
-    if is_offensive(q):
+    with stage("classify"):
+        offensive = is_offensive(q)
+        # Intent routing (server-side guardrails)
+        intent = None if offensive else classify(q)
+    if offensive:
         return ChatResponse(status="offensive", message="Mesajul conține limbaj nepotrivit. Reformulează te rog.")
 
-    # Intent routing (server-side guardrails)
-    intent = classify(q)
     if intent == "out_of_scope":
         return ChatResponse(
             status="out_of_scope",
@@ -155,8 +207,8 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
         )
     # Ordinal handled below via detect_ordinal_ref
     if intent == "book_followup":
-        ctx_id = f"user:{current_user['id']}" if current_user else f"anon:{request.cookies.get('anon_session_id')}"
-        ctx = get_ctx(ctx_id)
+        with stage("ctx_load"):
+            await ctx.load()
         last_title = ctx.get("last_selected_title") or ctx.get("last_recommended_title")
         if not last_title:
             return ChatResponse(status="need_title",
@@ -191,46 +243,83 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
                                     message=f"Nu am local anul apariției pentru „{last_title}”. Pot să-ți ofer rezumatul sau alte recomandări.",
                                     recommended_title=last_title, summary=None)
         # Default follow-up about the selected book: provide summary again (safe and useful)
-        summary_text = get_summary_by_title(last_title)
+        summary_text = cat.summary(last_title)
         return ChatResponse(status="success", message=f"Despre „{last_title}”: iată rezumatul pe scurt.",
                             recommended_title=last_title, summary=summary_text)
-        return ChatResponse(status="offensive", message="Mesajul conține limbaj nepotrivit. Reformulează te rog.")
 
-    ctx_id = f"user:{current_user['id']}" if current_user else f"anon:{request.cookies.get('anon_session_id')}"
-    ctx = get_ctx(ctx_id)
+    with stage("ctx_load"):
+        await ctx.load()
     last_options: List[str] = ctx.get("last_shortlist") or []
 
     ord_idx = detect_ordinal_ref(q)
     if ord_idx and 1 <= ord_idx <= len(last_options):
         chosen_title = last_options[ord_idx - 1]
-        summary = get_summary_by_title(chosen_title)
+        summary = cat.summary(chosen_title)
         msg = f"Cartea aleasă este „{chosen_title}”. Iată rezumatul detaliat:"
         if not current_user:
-            mark_anon_used(request.cookies.get("anon_session_id"))
+            await mark_anon_used(request.cookies.get("anon_session_id"))
         return ChatResponse(status="success", message=msg, recommended_title=chosen_title, summary=summary)
 
-    shortlist = shortlist_from_rag(q, k=5)
+    # cache semantic: doar pt recomandări "curate" (fără follow-up / referințe ordinale);
+    # dacă titlul e deja clar lexical, nu plătim nici embedding-ul pt cache
+    q_emb = None
+    lexical_fast = settings.hybrid_retrieval and decisive_title(q, ratio=settings.hybrid_decisive_ratio,
+                                                                index=cat.lexical)
+    # cu preferințe aplicate răspunsul e personal -> nu intră în (și nu vine din) cache-ul comun
+    themes = _preference_themes(q, current_user, cat)
+    if (settings.response_cache_enabled and intent == "recommendation" and not ord_idx and not lexical_fast
+            and not themes):
+        with stage("response_cache"):
+            try:
+                q_emb = await run_in_threadpool(embedding_cache.get_or_embed, q)
+                hit = response_cache.lookup(q_emb)
+            except Exception as e:
+                log.warning(f"Response cache indisponibil: {e}")
+                hit = None
+        if hit:
+            cached_title = hit["recommended_title"]
+            ctx.update(last_shortlist=hit["shortlist"], last_selected_title=cached_title,
+                       last_recommended_title=cached_title)
+            if not current_user:
+                sid = request.cookies.get("anon_session_id")
+                if sid and (cached_title or hit["message"]):
+                    await mark_anon_used(sid)
+            return ChatResponse(
+                status="success",
+                message=hit["message"],
+                recommended_title=cached_title,
+                summary=hit["summary"],
+            )
+
+    # retrieval-ul (Chroma / embedding) e sincron -> în threadpool, nu pe event loop
+    with stage("retrieve"):
+        shortlist = await run_in_threadpool(shortlist_from_rag, q, 5, cat, themes)
     if not shortlist:
         return ChatResponse(status="no_results", message="Nu am găsit cărți potrivite în inventarul local.")
-    update_ctx(ctx_id, last_shortlist=shortlist)
+    ctx.update(last_shortlist=shortlist)
 
     candidate_text = "Candidați disponibili: " + ", ".join(shortlist)
+    user_label = (current_user["email"] if current_user else request.cookies.get("anon_session_id", "anon"))
+    if settings.recommend_mode == "single":
+        return await _single_round_trip(q, ctx, current_user, user_label, shortlist, candidate_text, q_emb, cat)
+
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": q},
         {"role": "assistant", "content": f"{candidate_text}\nAlege doar din acești candidați și apoi apelează tool-ul."}
     ]
 
-    tools = build_tools_schema()
+    tools = cat.tools_schema  # construit o dată per versiune de catalog
 
     try:
-        comp = client.chat.completions.create(
-            model=settings.chat_model,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-            temperature=0.2,
-        )
+        with stage("llm_tool"):
+            comp = await chat_completion(
+                model=settings.chat_model,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto",
+                temperature=0.2,
+            )
     except Exception as e:
         log.exception(f"OpenAI err: {e}")
         return ChatResponse(status="error", message="A apărut o eroare la model.")
@@ -240,7 +329,6 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
     in_tok = getattr(usage, "prompt_tokens", 0) if usage else 0
     out_tok = getattr(usage, "completion_tokens", 0) if usage else 0
 
-    user_label = (current_user["email"] if current_user else request.cookies.get("anon_session_id", "anon"))
     log_request(user_label, q, settings.chat_model, in_tok, out_tok)
 
     tool_calls = ch.message.tool_calls or []
@@ -265,11 +353,11 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
             except Exception:
                 args = {}
             raw = args.get("title") or ""
-            key = match_title_key(raw, TITLE_KEYS)
+            key = match_title_key(raw, cat.title_index)
             if key:
                 recommended_title = key
-                summary_text = get_summary_by_title(key)
-                update_ctx(ctx_id, last_selected_title=recommended_title, last_recommended_title=recommended_title)
+                summary_text = cat.summary(key)
+                ctx.update(last_selected_title=recommended_title, last_recommended_title=recommended_title)
                 tool_msgs.append({
                     "role": "tool",
                     "tool_call_id": tc.id,
@@ -279,8 +367,8 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
 
     if not tool_calls:
         recommended_title = shortlist[0]
-        summary_text = get_summary_by_title(recommended_title)
-        update_ctx(ctx_id, last_selected_title=recommended_title, last_recommended_title=recommended_title)
+        summary_text = cat.summary(recommended_title)
+        ctx.update(last_selected_title=recommended_title, last_recommended_title=recommended_title)
         tool_msgs.append({
             "role": "tool",
             "tool_call_id": "manual",
@@ -289,44 +377,84 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
         })
 
     messages.extend(tool_msgs)
+    return _Plan(ctx, current_user, user_label, shortlist, messages, recommended_title, summary_text, q_emb, cat)
 
+
+async def _single_round_trip(q: str, ctx: ConversationContext, current_user, user_label: str, shortlist: List[str],
+                             candidate_text: str, q_emb, cat: Catalog):
+    messages = [
+        {"role": "system", "content": SINGLE_PROMPT},
+        {"role": "user", "content": q},
+        {"role": "assistant", "content": candidate_text},
+    ]
     try:
-        comp2 = client.chat.completions.create(
-            model=settings.chat_model,
-            messages=messages,
-            temperature=0.2,
-        )
+        with stage("llm_single"):
+            comp = await chat_completion(
+                model=settings.chat_model,
+                messages=messages,
+                response_format=build_single_schema(shortlist),
+                temperature=0.2,
+            )
     except Exception as e:
-        log.exception(f"OpenAI err(2): {e}")
-        return ChatResponse(status="error", message="Eroare la generarea răspunsului final.")
+        log.exception(f"OpenAI err: {e}")
+        return ChatResponse(status="error", message="A apărut o eroare la model.")
 
-    ch2 = comp2.choices[0]
-    usage2 = comp2.usage or None
-    in_tok2 = getattr(usage2, "prompt_tokens", 0) if usage2 else 0
-    out_tok2 = getattr(usage2, "completion_tokens", 0) if usage2 else 0
-    log_response(user_label, ch2.message.content or "", settings.chat_model, in_tok2, out_tok2)
+    usage = comp.usage or None
+    in_tok = getattr(usage, "prompt_tokens", 0) if usage else 0
+    out_tok = getattr(usage, "completion_tokens", 0) if usage else 0
+    content = comp.choices[0].message.content or ""
+    log_request(user_label, q, settings.chat_model, in_tok, out_tok)
+    log_response(user_label, content, settings.chat_model, 0, 0)
+
+    try:
+        data = json.loads(content or "{}")
+    except Exception:
+        data = {}
+    # enum-ul din schemă garantează titlul; verificăm oricum (stub-uri, modele fără strict mode)
+    title = match_title_key(data.get("title") or "", shortlist) or shortlist[0]
+    ctx.update(last_selected_title=title, last_recommended_title=title)
+    plan = _Plan(ctx, current_user, user_label, shortlist, messages, title, cat.summary(title), q_emb, cat)
+    plan.final_text = (data.get("message") or "").strip() or f"Îți recomand „{title}”."
+    return plan
+
+
+async def _charge_anon(plan: _Plan, request: Request):
+    """Consumă o recomandare gratuită pt anonim, cel mult o dată per plan."""
+    if plan.current_user or plan.anon_charged:
+        return
+    sid = request.cookies.get("anon_session_id")
+    if sid:
+        await mark_anon_used(sid)
+    plan.anon_charged = True
 
-    final_text = ch2.message.content or ""
+
+async def _finish(plan: _Plan, request: Request, final_text: str) -> ChatResponse:
+    """Bookkeeping-ul de după răspunsul final – identic pt /recommend și /recommend/stream."""
+    recommended_title = plan.recommended_title
+    summary_text = plan.summary_text
+    ctx, shortlist = plan.ctx, plan.shortlist
 
     if not recommended_title:
         low = final_text.lower()
-        for t in TITLE_KEYS:
+        for t in plan.catalog.titles:
             if t.lower() in low:
                 recommended_title = t
                 break
 
     if (not recommended_title) and shortlist:
         recommended_title = shortlist[0]
-        update_ctx(ctx_id, last_selected_title=recommended_title, last_recommended_title=recommended_title)
+        ctx.update(last_selected_title=recommended_title, last_recommended_title=recommended_title)
 
     if recommended_title and not summary_text:
-        summary_text = get_summary_by_title(recommended_title)
-    update_ctx(ctx_id, last_selected_title=recommended_title, last_recommended_title=recommended_title)
+        summary_text = plan.catalog.summary(recommended_title)
+    ctx.update(last_selected_title=recommended_title, last_recommended_title=recommended_title)
 
-    if not current_user:
-        sid = request.cookies.get("anon_session_id")
-        if sid and (recommended_title or final_text):
-            mark_anon_used(sid)
+    with stage("finish"):
+        if recommended_title or final_text:
+            await _charge_anon(plan, request)
+
+        if plan.q_emb is not None and final_text:
+            response_cache.store(plan.q_emb, recommended_title, final_text, summary_text, shortlist)
 
     return ChatResponse(
         status="success",
@@ -334,3 +462,144 @@ async def recommend(payload: ChatRequest, request: Request, response: Response,
         recommended_title=recommended_title,
         summary=summary_text,
     )
+
+
+@router.post("/recommend", response_model=ChatResponse)
+async def recommend(payload: ChatRequest, request: Request, response: Response,
+                    user=Depends(get_current_user_optional)):
+    q = (payload.query or "").strip()
+    if not q:
+        raise HTTPException(400, "Mesajul este gol.")
+    ctx = ConversationContext(_ctx_id(request, user))
+    timer = metrics.start_timer()
+    try:
+        res = await _recommend(q, request, response, user, ctx)
+        timer.outcome = res.status
+        return res
+    finally:
+        with stage("ctx_flush"):
+            await ctx.flush()  # un singur SET condiționat (versiune) pt toată cererea
+        metrics.record_outcome("recommend", timer)
+        response.headers["Server-Timing"] = timer.server_timing()
+
+
+async def _recommend(q: str, request: Request, response: Response, user, ctx: ConversationContext) -> ChatResponse:
+    plan = await _prepare(q, request, response, user, ctx)
+    if isinstance(plan, ChatResponse):
+        return plan
+    if plan.final_text is not None:
+        return await _finish(plan, request, plan.final_text)
+
+    try:
+        with stage("llm_final"):
+            comp2 = await chat_completion(
+                model=settings.chat_model,
+                messages=plan.messages,
+                temperature=0.2,
+            )
+    except Exception as e:
+        log.exception(f"OpenAI err(2): {e}")
+        return ChatResponse(status="error", message="Eroare la generarea răspunsului final.")
+
+    ch2 = comp2.choices[0]
+    usage2 = comp2.usage or None
+    in_tok2 = getattr(usage2, "prompt_tokens", 0) if usage2 else 0
+    out_tok2 = getattr(usage2, "completion_tokens", 0) if usage2 else 0
+    log_response(plan.user_label, ch2.message.content or "", settings.chat_model, in_tok2, out_tok2)
+
+    return await _finish(plan, request, ch2.message.content or "")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/recommend/stream")
+async def recommend_stream(payload: ChatRequest, request: Request, response: Response,
+                           user=Depends(get_current_user_optional)):
+    """Server-sent events: `shortlist` + `title` imediat după tool call, apoi `token` pt fiecare fragment
+    din al doilea răspuns și la final `done` cu câmpurile ChatResponse."""
+    q = (payload.query or "").strip()
+    if not q:
+        raise HTTPException(400, "Mesajul este gol.")
+    ctx = ConversationContext(_ctx_id(request, user))
+    timer = metrics.start_timer()
+    try:
+        plan = await _prepare(q, request, response, user, ctx)
+    except Exception:
+        metrics.record_outcome("recommend_stream", timer)
+        raise
+    if isinstance(plan, ChatResponse):
+        with stage("ctx_flush"):
+            await ctx.flush()
+    # header-ele pleacă înaintea corpului: Server-Timing acoperă doar etapele de până la primul eveniment
+    server_timing = timer.server_timing()
+
+    async def events():
+        metrics.bind(timer)  # generatorul poate rula în alt context decât endpoint-ul
+        try:
+            async for ev in _stream_events(plan, request, timer):
+                yield ev
+        finally:
+            with stage("ctx_flush"):
+                await ctx.flush()
+            metrics.record_outcome("recommend_stream", timer)
+
+    stream = StreamingResponse(events(), media_type="text/event-stream",
+                               headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no",
+                                        "Server-Timing": server_timing})
+    # cookie-ul anonim setat de ensure_anon_cookie pe `response` trebuie copiat pe răspunsul returnat direct
+    for name, value in response.raw_headers:
+        if name == b"set-cookie":
+            stream.raw_headers.append((name, value))
+    return stream
+
+
+async def _stream_events(plan, request: Request, timer: metrics.StageTimer):
+    if isinstance(plan, ChatResponse):
+        timer.outcome = plan.status
+        yield _sse("done", plan.model_dump())
+        return
+    # titlul + rezumatul sunt deja recomandarea: cota se consumă înainte de a le trimite, altfel un client
+    # care se deconectează după `title` ar primi recomandări fără să fie numărat
+    await _charge_anon(plan, request)
+    yield _sse("shortlist", {"shortlist": plan.shortlist})
+    yield _sse("title", {"recommended_title": plan.recommended_title, "summary": plan.summary_text})
+
+    if plan.final_text is not None:
+        yield _sse("token", {"delta": plan.final_text})
+        res = await _finish(plan, request, plan.final_text)
+        timer.outcome = res.status
+        yield _sse("done", res.model_dump())
+        return
+
+    parts: List[str] = []
+    in_tok2 = out_tok2 = 0
+    t0 = time.perf_counter()
+    try:
+        async for chunk in chat_completion_stream(
+            model=settings.chat_model,
+            messages=plan.messages,
+            temperature=0.2,
+            stream_options={"include_usage": True},
+        ):
+            if chunk.usage:
+                in_tok2 = chunk.usage.prompt_tokens or 0
+                out_tok2 = chunk.usage.completion_tokens or 0
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+    except Exception as e:
+        log.exception(f"OpenAI err(2, stream): {e}")
+        yield _sse("done", ChatResponse(status="error", message="Eroare la generarea răspunsului final.").model_dump())
+        return
+    finally:
+        # include și așteptarea după client (backpressure): e durata întregului stream, nu doar a modelului
+        metrics.observe("llm_final", time.perf_counter() - t0, timer)
+
+    final_text = "".join(parts)
+    log_response(plan.user_label, final_text, settings.chat_model, in_tok2, out_tok2)
+    res = await _finish(plan, request, final_text)
+    timer.outcome = res.status
+    yield _sse("done", res.model_dump())
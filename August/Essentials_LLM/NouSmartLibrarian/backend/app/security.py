@@ -1,12 +1,16 @@
+import asyncio, threading, time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from .config import settings
+from .metrics import PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS, PASSWORD_HASH_WAIT_SECONDS
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
 
 
 def hash_password(password: str) -> str:
@@ -17,6 +21,69 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+# bcrypt durează ~100-300 ms de CPU: pe event loop ar opri toate cererile worker-ului (inclusiv chat-ul).
+# Rulează într-un executor separat (nu în threadpool-ul comun al FastAPI), cu coadă limitată:
+# peste workers + queue operații în curs, cererea e respinsă imediat cu 503 în loc să aștepte la nesfârșit.
+class HashPoolBusy(Exception):
+    pass
+
+
+_hash_pool = ThreadPoolExecutor(max_workers=max(1, settings.password_hash_workers), thread_name_prefix="bcrypt")
+# operații trimise și încă neterminate în executor; scade când job-ul se termină (callback pe future-ul
+# executorului), nu când coroutine-ul e anulat – un client deconectat nu eliberează un thread ocupat
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _release(_fut):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+async def _run_hash(op: str, fn: Callable[..., T], *args) -> T:
+    global _pending
+    with _pending_lock:
+        busy = _pending >= max(1, settings.password_hash_workers) + settings.password_hash_queue
+        if not busy:
+            _pending += 1
+    if busy:
+        PASSWORD_HASH_REJECTED.labels(op).inc()
+        raise HashPoolBusy("Prea multe autentificări simultane.")
+    queued = time.perf_counter()
+
+    def _timed():
+        started = time.perf_counter()
+        PASSWORD_HASH_WAIT_SECONDS.labels(op).observe(started - queued)
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.labels(op).observe(time.perf_counter() - started)
+    try:
+        fut = _hash_pool.submit(_timed)
+    except BaseException:
+        _release(None)
+        raise
+    fut.add_done_callback(_release)  # și la anulare: un job încă în coadă se anulează, cel pornit termină
+    return await asyncio.wrap_future(fut)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run_hash("verify", verify_password, password, hashed)
+
+
+def hash_pool_stats() -> dict:
+    return {"workers": _hash_pool._max_workers, "queue": settings.password_hash_queue, "pending": _pending}
+
+
+def shutdown_hash_pool():
+    _hash_pool.shutdown(wait=False, cancel_futures=True)
+
+
 def create_token(
     subject: str,
     token_type: str,
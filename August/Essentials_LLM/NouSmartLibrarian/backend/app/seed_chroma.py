@@ -1,6 +1,7 @@
 from pathlib import Path
 import re, json
-from .rag import add_books
+from .rag import add_books, book_id, book_document, content_hash, get_book_hashes, delete_books
+from .ingest import ingest_books, DEFAULT_CHECKPOINT
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
@@ -26,12 +27,63 @@ def _from_md(md_text: str):
         items.append((title.strip(), summary, themes))
     return items
 
-def run():
+def run(full: bool = False):
     md = (DATA_DIR / "book_summaries.md").read_text(encoding="utf-8")
-    items = _from_md(md)
+    # ultimul bloc cu același titlu câștigă (același id book_{title} în Chroma)
+    items = {book_id(t): (t, summ, th) for (t, summ, th) in _from_md(md)}
     # dacă ai și JSON-ul cu rezumate complete, nu schimbă RAG; tool-ul îl folosește separat
-    add_books(items)
-    print(f"Seeded {len(items)} items into Chroma.")
+
+    # incremental: re-embed doar ce e nou sau s-a schimbat (hash pe conținut), șterge ce a dispărut din sursă;
+    # full re-embed-uiește tot, dar tot citește id-urile existente ca să șteargă cărțile scoase din sursă
+    existing = get_book_hashes()
+    added, updated, unchanged = [], [], 0
+    for bid, item in items.items():
+        h = content_hash(book_document(*item))
+        if bid not in existing:
+            added.append(item)
+        elif full or existing[bid] != h:
+            updated.append(item)
+        else:
+            unchanged += 1
+    removed = [bid for bid in existing if bid not in items]
+
+    add_books(added + updated)
+    delete_books(removed)
+    print(f"Seed: {len(added)} added, {len(updated)} updated, {unchanged} unchanged, {len(removed)} deleted "
+          f"({len(items)} items in source).")
+    return {"added": len(added), "updated": len(updated), "unchanged": unchanged, "deleted": len(removed)}
+
+def _iter_jsonl(path: Path):
+    # o carte pe linie: {"title": ..., "summary": ..., "themes": [...]} – citită leneș, fără a ține tot în RAM
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            o = json.loads(line)
+            themes = o.get("themes") or []
+            if isinstance(themes, str):
+                themes = [t.strip() for t in themes.split(",") if t.strip()]
+            yield (o["title"].strip(), (o.get("summary") or "").strip(), themes)
+
+def import_jsonl(path: Path, batch_size: int | None = None, concurrency: int | None = None):
+    path = Path(path).resolve()
+    st = path.stat()
+    stats = ingest_books(
+        _iter_jsonl(path),
+        batch_size=batch_size,
+        concurrency=concurrency,
+        checkpoint=DEFAULT_CHECKPOINT,
+        source_id=f"{path}:{st.st_size}:{int(st.st_mtime)}",
+        on_progress=lambda p: print(f"  {p['items']} items, {p['batches']} batches, {p['tokens']} tokens"),
+    )
+    print(f"Imported {stats['items']} items in {stats['batches']} batches "
+          f"({stats['skipped_batches']} batches resumed from checkpoint, {stats['tokens']} embedding tokens).")
+    return stats
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    import sys
+    if "--jsonl" in sys.argv:
+        import_jsonl(Path(sys.argv[sys.argv.index("--jsonl") + 1]))
+    else:
+        run(full="--full" in sys.argv)
\ No newline at end of file
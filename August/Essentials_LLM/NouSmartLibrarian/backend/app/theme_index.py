@@ -0,0 +1,76 @@
+# backend/app/theme_index.py
+# Index temă -> cărți: pt fiecare temă, pozițiile (rândurile) cărților care o au, ca array int32 sortat.
+# Se construiește din metadatele `themes` scrise de add_books ("a, b, c") sau din liniile „Teme:” ale
+# catalogului. Preferințele userului și lista de titluri permise devin o selecție de rânduri aplicată
+# ÎNAINTE de scoring (mască pe matricea numpy / `where` în Chroma), deci o căutare filtrată nu face
+# mai multă muncă decât una nefiltrată și nu pierde locuri din top-k pe rezultate aruncate ulterior.
+import re, unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def fold(s: str) -> str:
+    s = unicodedata.normalize("NFKD", (s or "").lower())
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"\w+", s))
+
+
+def split_themes(v: Any) -> List[str]:
+    if isinstance(v, (list, tuple)):
+        return [str(t).strip() for t in v if str(t).strip()]
+    if isinstance(v, str):
+        return [t.strip() for t in v.split(",") if t.strip()]
+    return []
+
+
+class ThemeIndex:
+    def __init__(self, entries: Sequence[Tuple[str, Any]]):
+        """entries = (titlu, teme) în ordinea rândurilor din indexul vectorial / catalog."""
+        self.n = len(entries)
+        self.titles: List[str] = [t for t, _ in entries]
+        self.row: Dict[str, int] = {t: i for i, t in enumerate(self.titles)}
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, (_, themes) in enumerate(entries):
+            for key in {fold(t) for t in split_themes(themes)}:
+                if key:
+                    postings[key].append(i)
+        self.postings: Dict[str, np.ndarray] = {k: np.asarray(v, dtype=np.int32) for k, v in postings.items()}
+
+    def __len__(self):
+        return self.n
+
+    def themes(self) -> List[str]:
+        return sorted(self.postings)
+
+    def known(self, themes: Iterable[str]) -> List[str]:
+        """Temele (normalizate) care există în index, fără duplicate."""
+        out = []
+        for t in themes or []:
+            k = fold(t)
+            if k in self.postings and k not in out:
+                out.append(k)
+        return out
+
+    def mentioned(self, text: str) -> List[str]:
+        # teme citate ca frază întreagă în text (ex. „o carte despre dragoni”)
+        padded = f" {fold(text)} "
+        return [k for k in self.postings if f" {k} " in padded]
+
+    def rows(self, themes: Optional[Iterable[str]] = None,
+             titles: Optional[Iterable[str]] = None) -> Optional[np.ndarray]:
+        """Rândurile permise (sortate): OR pe teme, AND cu titlurile. None = fără restricție."""
+        sel: Optional[np.ndarray] = None
+        if themes is not None:
+            parts = [self.postings[k] for k in self.known(themes)]
+            sel = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int32)
+        if titles is not None:
+            by_title = np.unique(np.fromiter((self.row[t] for t in titles if t in self.row), dtype=np.int32))
+            if sel is None and len(by_title) == self.n:
+                return None  # toate titlurile sunt permise: căutarea rămâne nefiltrată
+            sel = by_title if sel is None else np.intersect1d(sel, by_title, assume_unique=True)
+        return sel
+
+    def titles_for(self, rows: np.ndarray) -> List[str]:
+        return [self.titles[i] for i in rows]
@@ -0,0 +1,203 @@
+# backend/app/usage_rollups.py
+# Agregări incrementale de tokeni / cost din logurile de tokeni, ținute în SQLite. Fiecare fișier
+# de log e citit de la ultimul offset salvat (doar liniile complete), iar liniile noi sunt adunate
+# în rânduri (zi, user, model, direcție). Interogările /admin/usage citesc doar aceste rânduri.
+# Costul nu se ia din log (patch/tokens_logger are prețuri doar pt câteva modele și scrie 0 pt restul):
+# rollup-urile țin doar tokeni, iar costul se calculează la interogare cu prețurile din settings
+# (price_chat_input / price_chat_output, price_embedding pt direcția "embedding").
+#   logs/<zi>/tokens.log          – app/tokens_logger (ts, direction, user, model, input/output_tokens, usd_cost)
+#   logs/<zi>/tokens/tokens.log   – patch/tokens_logger ({"type", "data": [user, text, cost, ts], ...})
+import json, sqlite3, threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend
+DEFAULT_PATH = BASE_DIR / "cache" / "usage.sqlite3"
+LOG_PATTERNS = ("*/tokens.log", "*/tokens/tokens.log")
+READ_CHUNK = 4 * 1024 * 1024
+GROUPS = ("day", "user", "model", "direction")
+
+Key = Tuple[str, str, str, str]
+
+_lock = threading.Lock()
+_db: Optional[sqlite3.Connection] = None
+
+
+def _open_db() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        path = Path(settings.usage_db_path) if settings.usage_db_path else DEFAULT_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit: tranzacțiile sunt explicite (BEGIN IMMEDIATE în _ingest_chunk)
+        db = sqlite3.connect(str(path), check_same_thread=False, timeout=10, isolation_level=None)
+        if "cost" in {r[1] for r in db.execute("PRAGMA table_info(rollups)")}:
+            # baze cu costul din log: sunt date derivate, se reconstruiesc din loguri de la zero
+            db.execute("DROP TABLE rollups")
+            db.execute("DROP TABLE IF EXISTS offsets")
+        db.execute("CREATE TABLE IF NOT EXISTS offsets (path TEXT PRIMARY KEY, offset INTEGER NOT NULL, ino INTEGER)")
+        if "ino" not in {r[1] for r in db.execute("PRAGMA table_info(offsets)")}:  # baze create înainte de ino
+            db.execute("ALTER TABLE offsets ADD COLUMN ino INTEGER")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            "day TEXT NOT NULL, user TEXT NOT NULL, model TEXT NOT NULL, direction TEXT NOT NULL, "
+            "calls INTEGER NOT NULL, input_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL, "
+            "PRIMARY KEY (day, user, model, direction))"
+        )
+        _db = db
+    return _db
+
+
+def parse_line(line: str) -> Optional[Tuple[Key, int, int]]:
+    try:
+        rec = json.loads(line)
+    except Exception:
+        return None
+    if not isinstance(rec, dict):
+        return None
+    if "data" in rec:  # format patch/tokens_logger
+        data = rec.get("data") or []
+        if len(data) < 4:
+            return None
+        user, ts = data[0], data[3]
+        model, direction = rec.get("model") or "unknown", rec.get("type") or "unknown"
+        tin, tout = rec.get("input_tokens") or 0, rec.get("output_tokens") or 0
+    else:
+        user, ts = rec.get("user"), rec.get("ts")
+        model, direction = rec.get("model") or "unknown", rec.get("direction") or "unknown"
+        tin, tout = rec.get("input_tokens") or 0, rec.get("output_tokens") or 0
+    try:
+        return (str(ts)[:10], str(user or "anon"), str(model), str(direction)), int(tin), int(tout)
+    except (TypeError, ValueError):
+        return None
+
+
+def _tail(path: Path, offset: int, size: int) -> Tuple[List[str], int]:
+    """Liniile complete din [offset, size); întoarce și offset-ul de după ultima linie completă. Nu citește
+    peste `size` (dimensiunea văzută la începutul refresh-ului): ce se adaugă între timp intră la următorul."""
+    with path.open("rb") as f:
+        f.seek(offset)
+        buf = f.read(min(READ_CHUNK, size - offset))
+    end = buf.rfind(b"\n")
+    if end < 0:
+        return [], offset
+    return buf[:end].decode("utf-8", errors="replace").splitlines(), offset + end + 1
+
+
+def _ingest_chunk(db: sqlite3.Connection, path: Path, key: str, size: int, ino: int,
+                  stats: Dict[str, int]) -> bool:
+    """Un pas de tail într-o tranzacție IMMEDIATE: offset-ul e recitit sub lock-ul de scriere, deci mai
+    mulți workeri care fac refresh simultan nu numără aceleași linii de două ori. False = gata (până la size)."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute("SELECT offset, ino FROM offsets WHERE path = ?", (key,)).fetchone()
+        offset = row[0] if row else 0
+        # alt inode = fișier înlocuit (rotație / recreare); mai mic decât offset-ul salvat = trunchiat pe loc.
+        # Offset-ul nu depășește niciodată o dimensiune deja văzută, deci size < offset nu apare altfel.
+        if row and ((row[1] is not None and row[1] != ino) or size < offset):
+            offset = 0
+        lines, new_offset = _tail(path, offset, size) if offset < size else ([], offset)
+        if new_offset == offset:
+            if row and row[1] != ino:  # doar inode-ul s-a schimbat (fișier nou, încă fără linii complete)
+                db.execute("UPDATE offsets SET offset = ?, ino = ? WHERE path = ?", (offset, ino, key))
+                db.execute("COMMIT")
+            else:
+                db.execute("ROLLBACK")
+            return False
+        agg: Dict[Key, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for line in lines:
+            if not line.strip():
+                continue
+            parsed = parse_line(line)
+            if parsed is None:
+                stats["bad_lines"] += 1
+                continue
+            k, tin, tout = parsed
+            a = agg[k]
+            a[0] += 1; a[1] += tin; a[2] += tout
+            stats["lines"] += 1
+        db.executemany(
+            "INSERT INTO rollups (day, user, model, direction, calls, input_tokens, output_tokens) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (day, user, model, direction) DO UPDATE SET "
+            "calls = calls + excluded.calls, input_tokens = input_tokens + excluded.input_tokens, "
+            "output_tokens = output_tokens + excluded.output_tokens",
+            [(*k, *v) for k, v in agg.items()],
+        )
+        db.execute("INSERT OR REPLACE INTO offsets (path, offset, ino) VALUES (?, ?, ?)", (key, new_offset, ino))
+        db.execute("COMMIT")
+        return new_offset < size
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def refresh(logs_dir: Optional[Path] = None) -> Dict[str, int]:
+    """Citește doar octeții noi din fiecare log și îi adună în rollups (sume + offset în aceeași tranzacție)."""
+    root = Path(logs_dir or settings.usage_logs_dir)
+    stats = {"files": 0, "lines": 0, "bad_lines": 0}
+    with _lock:
+        db = _open_db()
+        for pattern in LOG_PATTERNS:
+            for path in sorted(root.glob(pattern)):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                key = str(path.resolve())
+                while _ingest_chunk(db, path, key, st.st_size, st.st_ino, stats):
+                    pass
+                stats["files"] += 1
+    return stats
+
+
+def query(group_by: List[str], day_from: Optional[str] = None, day_to: Optional[str] = None,
+          user: Optional[str] = None, model: Optional[str] = None, limit: int = 100) -> List[Dict]:
+    cols = [g for g in group_by if g in GROUPS] or ["day"]
+    where, args = [], []
+    for col, op, val in (("day", ">=", day_from), ("day", "<=", day_to), ("user", "=", user), ("model", "=", model)):
+        if val:
+            where.append(f"{col} {op} ?")
+            args.append(val)
+    # prețurile sunt per 1000 de tokeni, ca în app/tokens_logger
+    cost = ("SUM(CASE WHEN direction = 'embedding' THEN input_tokens * ? "
+            "ELSE input_tokens * ? + output_tokens * ? END) / 1000.0")
+    prices = (settings.price_embedding, settings.price_chat_input, settings.price_chat_output)
+    sql = (f"SELECT {', '.join(cols)}, SUM(calls), SUM(input_tokens), SUM(output_tokens), {cost} AS cost FROM rollups"
+           + (f" WHERE {' AND '.join(where)}" if where else "")
+           + f" GROUP BY {', '.join(cols)} ORDER BY cost DESC, {', '.join(cols)} LIMIT ?")
+    with _lock:
+        rows = _open_db().execute(sql, (*prices, *args, max(1, limit))).fetchall()
+    out = []
+    for r in rows:
+        d = dict(zip(cols, r[:len(cols)]))
+        d.update(calls=r[-4], input_tokens=r[-3], output_tokens=r[-2], cost=round(r[-1] or 0.0, 6))
+        out.append(d)
+    return out
+
+
+_refresher: Optional[threading.Thread] = None
+_refresher_stop = threading.Event()
+
+
+def _refresh_loop(interval: float):
+    while not _refresher_stop.wait(interval):
+        try:
+            refresh()
+        except Exception:
+            pass
+
+
+def start_refresher():
+    global _refresher
+    interval = settings.usage_refresh_seconds
+    if interval <= 0 or (_refresher and _refresher.is_alive()):
+        return
+    _refresher_stop.clear()
+    _refresher = threading.Thread(target=_refresh_loop, args=(interval,), name="usage-rollups", daemon=True)
+    _refresher.start()
+
+
+def stop_refresher():
+    _refresher_stop.set()
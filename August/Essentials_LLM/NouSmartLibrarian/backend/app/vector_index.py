@@ -0,0 +1,218 @@
+# backend/app/vector_index.py
+# Index vectorial in-proces: toate embedding-urile într-o matrice float32 contiguă salvată ca .npy
+# și încărcată cu mmap la pornire. Top-k = un singur produs scalar vectorizat + argpartition.
+# Pe disc: fiecare salvare scrie o versiune nouă, <path>/v-<id>/{embeddings.npy, items.json}, iar
+# fișierul CURRENT (numele versiunii active) se înlocuiește cu un singur os.replace – matricea și
+# items-urile se schimbă mereu împreună, iar un crash în timpul scrierii lasă activă versiunea veche.
+import json, os, shutil, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from .config import settings
+from .theme_index import ThemeIndex
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend
+DEFAULT_PATH = BASE_DIR / "vector_index"
+
+
+def _unit_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (m / norms).astype(np.float32, copy=False)
+
+
+class VectorIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.current_file = self.path / "CURRENT"
+        self._lock = threading.Lock()
+        # (matrice, items, id -> poziție, teme -> rânduri) – înlocuit dintr-o bucată, ca query-urile să vadă
+        # o versiune coerentă
+        self._state: Tuple[Optional[np.ndarray], List[Dict], Dict[str, int], ThemeIndex] = (
+            None, [], {}, ThemeIndex([]))
+        self._pending: Dict[str, Tuple[np.ndarray, Dict]] = {}  # upsert(persist=False), scris la flush()
+        self._load()
+
+    def _version_dir(self) -> Optional[Path]:
+        try:
+            name = self.current_file.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            name = ""
+        if name:
+            return self.path / name
+        # format vechi (fișierele direct în path), până la prima salvare
+        return self.path if (self.path / "embeddings.npy").exists() else None
+
+    def _load(self):
+        d = self._version_dir()
+        matrix, items = None, []
+        if d is not None:
+            try:
+                matrix = np.load(d / "embeddings.npy", mmap_mode="r")
+                items = json.loads((d / "items.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Index vectorial ilizibil în {d}: {e!r} – pornesc cu indexul gol.")
+                matrix, items = None, []
+            if matrix is not None and (matrix.ndim != 2 or matrix.shape[0] != len(items)):
+                logger.warning(f"Index vectorial inconsistent în {d}: {matrix.shape[0]} rânduri, {len(items)} "
+                               f"items – pornesc cu indexul gol (rulează din nou seed-ul).")
+                matrix, items = None, []
+        self._set_state(matrix, items)
+
+    def _set_state(self, matrix: Optional[np.ndarray], items: List[Dict]):
+        themes = ThemeIndex([((it.get("metadata") or {}).get("title", ""), (it.get("metadata") or {}).get("themes"))
+                             for it in items])
+        self._state = (matrix, items, {it["id"]: i for i, it in enumerate(items)}, themes)
+
+    def _save(self, matrix: np.ndarray, items: List[Dict]):
+        # versiune nouă scrisă complet (și fsync), apoi CURRENT schimbat printr-un singur os.replace
+        self.path.mkdir(parents=True, exist_ok=True)
+        name = f"v-{time.time_ns():x}-{os.getpid()}"
+        d = self.path / name
+        d.mkdir()
+        with (d / "embeddings.npy").open("wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+            f.flush(); os.fsync(f.fileno())
+        with (d / "items.json").open("w", encoding="utf-8") as f:
+            f.write(json.dumps(items, ensure_ascii=False))
+            f.flush(); os.fsync(f.fileno())
+        tmp = self.path / "CURRENT.tmp"
+        tmp.write_text(name, encoding="utf-8")
+        os.replace(tmp, self.current_file)
+        # items-urile sunt deja în memorie: doar matricea se re-mmap-ează, JSON-ul nu se mai parsează
+        self._set_state(np.load(d / "embeddings.npy", mmap_mode="r"), items)
+        self._remove_versions(keep=name)
+
+    def _remove_versions(self, keep: Optional[str] = None):
+        # versiunile vechi (și fișierele din formatul vechi); pe Linux un mmap deschis rămâne valid după unlink
+        for p in self.path.glob("v-*"):
+            if p.name != keep:
+                shutil.rmtree(p, ignore_errors=True)
+        for f in ("embeddings.npy", "items.json"):
+            try:
+                (self.path / f).unlink()
+            except FileNotFoundError:
+                pass
+
+    def count(self) -> int:
+        return len(self._state[1])
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict],
+               embeddings: Sequence[Sequence[float]], persist: bool = True):
+        """persist=False doar adaugă rândurile în zona de staging (import în masă): matricea se copiază și
+        se scrie pe disc o singură dată, la flush(), nu la fiecare batch. Până atunci query-urile nu le văd."""
+        if not ids:
+            return
+        new = _unit_rows(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            for row, (i, doc, meta) in enumerate(zip(ids, documents, metadatas)):
+                self._pending[i] = (new[row], {"id": i, "document": doc, "metadata": meta or {}})
+            if persist:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        matrix, items, pos, _ = self._state
+        new = np.stack([v for v, _ in self._pending.values()])
+        if matrix is not None and matrix.shape[0] and matrix.shape[1] != new.shape[1]:
+            self._pending.clear()
+            raise ValueError(f"Dimensiune embedding diferită: {new.shape[1]} != {matrix.shape[1]}")
+        items = list(items)
+        base = np.array(matrix) if matrix is not None else np.empty((0, new.shape[1]), np.float32)
+        appended = []
+        for row, (i, item) in enumerate((i, it) for i, (_, it) in self._pending.items()):
+            if i in pos:
+                base[pos[i]] = new[row]
+                items[pos[i]] = item
+            else:
+                items.append(item)
+                appended.append(row)
+        if appended:
+            base = np.vstack([base, new[appended]])
+        self._save(base, items)
+        self._pending.clear()
+
+    def delete(self, ids: Sequence[str]):
+        drop = set(ids)
+        with self._lock:
+            # și din staging: un flush() ulterior nu trebuie să readucă un id tocmai șters
+            for i in drop:
+                self._pending.pop(i, None)
+            matrix, items, _, _ = self._state
+            keep = [i for i, it in enumerate(items) if it["id"] not in drop]
+            if len(keep) == len(items):
+                return
+            if not keep:
+                self._reset_files()
+                return
+            self._save(np.asarray(matrix)[keep], [items[i] for i in keep])
+
+    def _reset_files(self):
+        try:
+            self.current_file.unlink()
+        except FileNotFoundError:
+            pass
+        if self.path.exists():
+            self._remove_versions()
+        self._set_state(None, [])
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._reset_files()
+
+    def get(self, ids: Optional[Sequence[str]] = None) -> List[Dict]:
+        _, items, pos, _ = self._state
+        if ids is None:
+            return list(items)
+        return [items[pos[i]] for i in ids if i in pos]
+
+    def theme_index(self) -> ThemeIndex:
+        return self._state[3]
+
+    def query(self, embedding: Sequence[float], k: int = 3, themes: Optional[Sequence[str]] = None,
+              titles: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Top-k; cu themes / titles se scorează doar rândurile permise (selecția din ThemeIndex)."""
+        m, items, _, theme_index = self._state
+        if m is None or not items:
+            return []
+        rows = theme_index.rows(themes, titles) if (themes is not None or titles is not None) else None
+        if rows is not None and not len(rows):
+            return []
+        q = np.asarray(embedding, dtype=np.float32)
+        n = float(np.linalg.norm(q))
+        if n:
+            q = q / n
+        scores = (m[rows] if rows is not None else m) @ q
+        k = max(1, min(k, scores.shape[0]))
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top])]
+        at = rows if rows is not None else np.arange(len(items))
+        return [dict(items[at[i]], score=float(scores[i])) for i in top]
+
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> VectorIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VectorIndex(Path(settings.vector_index_path) if settings.vector_index_path else DEFAULT_PATH)
+    return _index
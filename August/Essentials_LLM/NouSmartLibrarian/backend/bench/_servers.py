@@ -0,0 +1,107 @@
+# backend/bench/_servers.py
+# Utilitare comune pt benchmark-uri: pornește stub-ul OpenAI și aplicația (uvicorn, subprocess)
+# într-un director temporar izolat (SQLite, index vectorial, cache-uri, loguri).
+import os, socket, subprocess, sys, time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 60.0):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} nu a pornit în {timeout}s")
+
+
+# cont admin creat la pornire (app/bootstrap_admin.py), pt bench-urile care citesc /admin/*:
+#   app_env(work, stub_port, **ADMIN_ENV) ... admin_cookies(base)
+ADMIN_ENV = {"ADMIN_BOOTSTRAP_ENABLED": "true", "ADMIN_USERNAME": "benchadmin",
+             "ADMIN_EMAIL": "benchadmin@example.com", "ADMIN_PASSWORD": "BenchAdmin123!"}
+
+
+def app_env(workdir: Path, stub_port: int, **overrides) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": str(BACKEND),
+        "OPENAI_API_KEY": "sk-stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+        "RETRIEVAL_BACKEND": "numpy",
+        "VECTOR_INDEX_PATH": str(workdir / "vector_index"),
+        "CHROMA_PATH": str(workdir / "chroma"),
+        "EMBEDDING_CACHE_PATH": str(workdir / "embeddings.sqlite3"),
+        "SQLITE_URL": f"sqlite:///{workdir / 'app.db'}",
+        "REDIS_URL": "redis://127.0.0.1:1/0",  # indisponibil -> fallback in-memory
+        "ADMIN_BOOTSTRAP_ENABLED": "false",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",  # toate cererile vin de pe 127.0.0.1; bench-urile își setează limitele
+        "JWT_SECRET": "bench-secret",
+    })
+    env.update({k: str(v) for k, v in overrides.items()})
+    return env
+
+
+def _spawn(args, env, cwd, log: Path):
+    f = log.open("w")
+    return subprocess.Popen([sys.executable, "-m", *args], env=env, cwd=str(cwd), stdout=f, stderr=subprocess.STDOUT)
+
+
+@contextmanager
+def stub_server(workdir: Path, latency_ms: float = 300, **env_overrides):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=str(BACKEND), STUB_LATENCY_MS=str(latency_ms),
+               **{k: str(v) for k, v in env_overrides.items()})
+    p = _spawn(["uvicorn", "bench.stub_openai:app", "--port", str(port), "--log-level", "warning"],
+               env, BACKEND, workdir / "stub.log")
+    try:
+        wait_ready(f"http://127.0.0.1:{port}/stats")
+        yield port
+    finally:
+        p.terminate(); p.wait(10)
+
+
+def seed(env: dict, workdir: Path):
+    subprocess.run([sys.executable, "-m", "app.seed_chroma"], env=env, cwd=str(workdir), check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+@contextmanager
+def app_server(workdir: Path, env: dict, workers: int = 1):
+    port = free_port()
+    p = _spawn(["uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+               env, workdir, workdir / "app.log")
+    try:
+        wait_ready(f"http://127.0.0.1:{port}/")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        p.terminate(); p.wait(10)
+
+
+def login_cookies(base: str, username: str = "bench", password: str = "BenchPass123!") -> dict:
+    # /auth/register nu cere OTP -> cont de test direct; cererile autentificate nu au limită anonimă
+    httpx.post(f"{base}/auth/register", json={"email": f"{username}@example.com", "username": username,
+               "password": password, "first_name": "Bench", "last_name": "User"}, timeout=30)
+    r = httpx.post(f"{base}/auth/login", json={"identifier": username, "password": password}, timeout=30)
+    r.raise_for_status()
+    return dict(r.cookies)
+
+
+def admin_cookies(base: str) -> dict:
+    r = httpx.post(f"{base}/auth/login", json={"identifier": ADMIN_ENV["ADMIN_USERNAME"],
+                                               "password": ADMIN_ENV["ADMIN_PASSWORD"]}, timeout=30)
+    r.raise_for_status()
+    return dict(r.cookies)
@@ -0,0 +1,159 @@
+# backend/bench/bench_ctx_roundtrips.py
+# Numără round trip-urile Redis per cerere /chat/recommend. Aplicația rulează in-proces (ASGI) cu un
+# Redis fals care contorizează fiecare comandă / pipeline / script; OpenAI = stub-ul local.
+#   cd backend && python -m bench.bench_ctx_roundtrips --requests 20
+import argparse, asyncio, json, os, sys, tempfile
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+from ._servers import app_env, seed, stub_server
+from .load_chat import QUERIES
+
+
+class CountingRedis:
+    """Subset de redis.asyncio.Redis ținut în memorie; fiecare apel await-uit = un round trip."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = Counter()
+
+    def _hit(self, name: str):
+        self.calls[name] += 1
+
+    async def get(self, key):
+        self._hit("GET")
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._hit("SET")
+        self.data[key] = str(value)
+        return True
+
+    async def setex(self, key, ttl, value):
+        self._hit("SETEX")
+        self.data[key] = str(value)
+        return True
+
+    async def exists(self, key):
+        self._hit("EXISTS")
+        return int(key in self.data)
+
+    async def incr(self, key):
+        self._hit("INCR")
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def expire(self, key, ttl):
+        self._hit("EXPIRE")
+        return True
+
+    async def delete(self, *keys):
+        self._hit("DEL")
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    async def ping(self):
+        self._hit("PING")
+        return True
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def register_script(self, lua: str):
+        # scripturile sunt emulate în Python de modulul care le înregistrează (vezi FAKE_SCRIPTS)
+        impl = FAKE_SCRIPTS[lua]
+
+        async def call(keys=(), args=(), client=None):
+            self._hit("EVALSHA")
+            return impl(self.data, list(keys), list(args))
+        return call
+
+
+class _Pipeline:
+    def __init__(self, r: CountingRedis):
+        self.r, self.ops = r, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*a, **kw):
+            self.ops.append((name, a, kw))
+            return self
+        return queue
+
+    async def execute(self):
+        self.r._hit("PIPELINE")
+        out = []
+        for name, a, kw in self.ops:
+            calls = self.r.calls.copy()
+            out.append(await getattr(self.r, name)(*a, **kw))
+            self.r.calls = calls  # comenzile din pipeline nu sunt round trip-uri separate
+        return out
+
+
+FAKE_SCRIPTS = {}
+
+
+def _ctx_cas(data, keys, args):
+    # echivalentul Python al conversation_state.CAS_LUA
+    cur = json.loads(data[keys[0]]) if keys[0] in data else {}
+    v = int(cur.get("_v", 0) or 0)
+    if v != int(args[0]):
+        return -1
+    data[keys[0]] = args[1]
+    return v + 1
+
+
+async def _run(n: int, anon: bool) -> dict:
+    from app import redis_pool
+    from app.main import app
+    try:
+        from app.conversation_state import CAS_LUA
+        FAKE_SCRIPTS[CAS_LUA] = _ctx_cas
+    except ImportError:
+        pass  # versiune fără flush condiționat
+    fake = CountingRedis()
+    redis_pool.client = lambda: fake
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as http:
+        if not anon:
+            await http.post("/auth/register", json={"email": "rt@example.com", "username": "rtbench",
+                                                   "password": "BenchPass123!", "first_name": "R", "last_name": "T"})
+            (await http.post("/auth/login", json={"identifier": "rtbench", "password": "BenchPass123!"})).raise_for_status()
+        fake.calls.clear()
+        ok = 0
+        for i in range(n):
+            if anon:
+                # o sesiune anonimă nouă per cerere, ca limita gratuită să nu blocheze
+                http.cookies.set("anon_session_id", f"anon-bench{i}")
+            r = await http.post("/chat/recommend", json={"query": f"{QUERIES[i % len(QUERIES)]} #{i}"})
+            ok += r.status_code == 200 and r.json().get("status") == "success"
+    total = sum(fake.calls.values())
+    return {"requests": n, "success": ok, "round_trips_per_request": total / n,
+            "by_command": {k: v / n for k, v in sorted(fake.calls.items())}}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20)
+    ap.add_argument("--anon", action="store_true", help="cereri anonime (include contorul de quota)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        with stub_server(work, latency_ms=0) as stub_port:
+            env = app_env(work, stub_port, REDIS_URL="redis://127.0.0.1:6379/0")
+            seed(env, work)
+            os.environ.update(env)
+            sys.path.insert(0, env["PYTHONPATH"])
+            res = asyncio.run(_run(args.requests, args.anon))
+    print(json.dumps(res, indent=2))
+
+
+if __name__ == "__main__":
+    main()
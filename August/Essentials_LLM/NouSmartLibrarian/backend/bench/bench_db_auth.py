@@ -0,0 +1,123 @@
+# backend/bench/bench_db_auth.py
+# Login-uri concurente + /auth/me (cu cache-ul de auth dezactivat, ca fiecare cerere să ajungă în SQLite)
+# + scrieri de preferințe, pe codul curent și, opțional, pe un commit anterior (git worktree temporar),
+# ex. înainte de engine-ul async aiosqlite + WAL din app/db.py.
+#   cd backend && python -m bench.bench_db_auth --baseline-ref HEAD~1 --duration 10
+import argparse, asyncio, subprocess, tempfile, time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from ._servers import BACKEND, app_env, app_server, login_cookies, seed, stub_server
+from .load_mix import percentile
+
+PASSWORD = "BenchPass123!"
+
+
+@contextmanager
+def worktree(ref: Optional[str]):
+    """Directorul backend/ la `ref` (worktree git temporar) sau cel curent dacă ref e None."""
+    if not ref:
+        yield BACKEND
+        return
+    root = Path(subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=BACKEND, capture_output=True,
+                               text=True, check=True).stdout.strip())
+    rel = BACKEND.relative_to(root)
+    with tempfile.TemporaryDirectory() as d:
+        wt = Path(d) / "wt"
+        subprocess.run(["git", "worktree", "add", "--detach", str(wt), ref], cwd=root, check=True,
+                       capture_output=True)
+        try:
+            yield wt / rel
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(wt)], cwd=root, capture_output=True)
+
+
+async def _workload(base: str, users: int, me_clients: int, login_clients: int, prefs_clients: int,
+                    duration: float) -> dict:
+    cookies = [login_cookies(base, username=f"dbuser{i:03d}", password=PASSWORD) for i in range(users)]
+    lat = {"me": [], "login": [], "prefs": []}
+    errors = {"me": 0, "login": 0, "prefs": 0}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=me_clients + login_clients + prefs_clients)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as http:
+        async def me(i: int):
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                r = await http.get("/auth/me", cookies=cookies[i % users])
+                lat["me"].append(time.perf_counter() - t0)
+                errors["me"] += not (r.status_code == 200 and r.json().get("authenticated"))
+
+        async def login(i: int):
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                r = await http.post("/auth/login", json={"identifier": f"dbuser{i % users:03d}", "password": PASSWORD})
+                lat["login"].append(time.perf_counter() - t0)
+                errors["login"] += r.status_code != 200
+                if r.status_code == 503:
+                    await asyncio.sleep(1)
+
+        async def prefs(i: int):
+            n = 0
+            while time.perf_counter() < deadline:
+                n += 1
+                genres = ["fantasy", "istoric", "sf", "poezie", "thriller"][: 1 + n % 5]
+                t0 = time.perf_counter()
+                r = await http.post("/auth/preferences", json={"genres": genres}, cookies=cookies[i % users])
+                lat["prefs"].append(time.perf_counter() - t0)
+                errors["prefs"] += r.status_code != 200
+        t0 = time.perf_counter()
+        await asyncio.gather(*(me(i) for i in range(me_clients)), *(login(i) for i in range(login_clients)),
+                             *(prefs(i) for i in range(prefs_clients)))
+        wall = time.perf_counter() - t0
+    out = {}
+    for k, v in lat.items():
+        if not v:
+            continue
+        v.sort()
+        out[k] = {"requests": len(v), "errors": errors[k], "rps": len(v) / wall, "p50_ms": percentile(v, 50) * 1000,
+                  "p95_ms": percentile(v, 95) * 1000, "p99_ms": percentile(v, 99) * 1000}
+    return out
+
+
+def _run(backend: Path, args) -> dict:
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        with stub_server(work, latency_ms=50) as stub_port:
+            env = app_env(work, stub_port, PYTHONPATH=str(backend),
+                          AUTH_CACHE_TTL_SECONDS=0, AUTH_CACHE_LOCAL_TTL_SECONDS=0)
+            seed(env, work)
+            with app_server(work, env) as base:
+                return asyncio.run(_workload(base, args.users, args.me_clients, args.login_clients,
+                                             args.prefs_clients, args.duration))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--baseline-ref", default=None, help="ex. HEAD~1; rulează și pe acel commit pt comparație")
+    ap.add_argument("--users", type=int, default=8)
+    ap.add_argument("--me-clients", type=int, default=32)
+    ap.add_argument("--login-clients", type=int, default=8)
+    ap.add_argument("--prefs-clients", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=10)
+    args = ap.parse_args()
+
+    runs = []
+    if args.baseline_ref:
+        with worktree(args.baseline_ref) as wt:
+            runs.append((args.baseline_ref, _run(wt, args)))
+    runs.append(("current", _run(BACKEND, args)))
+
+    print(f"{args.me_clients} clienți /auth/me + {args.login_clients} /auth/login + {args.prefs_clients} "
+          f"/auth/preferences, {args.duration:.0f}s, cache auth dezactivat")
+    print(f"{'build':>10} {'route':>6} {'reqs':>6} {'err':>4} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, res in runs:
+        for route, r in res.items():
+            print(f"{name:>10} {route:>6} {r['requests']:>6} {r['errors']:>4} {r['rps']:>8.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
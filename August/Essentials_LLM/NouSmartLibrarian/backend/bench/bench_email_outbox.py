@@ -0,0 +1,129 @@
+# backend/bench/bench_email_outbox.py
+# /auth/reset/send-otp contra unui server SMTP local (aiosmtpd, STARTTLS cu certificat self-signed) care
+# răspunde lent la fiecare mesaj: latența handler-ului (cu outbox-ul din app/email_service.py nu mai
+# include SMTP-ul), câte sesiuni SMTP s-au deschis pt N mesaje și dacă toate au ajuns. Opțional și pe un
+# commit anterior (worktree git), ex. înainte de outbox, când fiecare cerere făcea connect+STARTTLS+send.
+#   pip install aiosmtpd
+#   cd backend && python -m bench.bench_email_outbox --smtp-delay-ms 200 --emails 40 --baseline-ref HEAD~1
+import argparse, asyncio, datetime, os, ssl, tempfile, threading, time
+from pathlib import Path
+
+import httpx
+from aiosmtpd.controller import Controller
+
+from ._servers import ADMIN_ENV, BACKEND, admin_cookies, app_env, app_server, free_port, stub_server
+from .bench_db_auth import worktree
+from .load_mix import percentile
+
+
+def _self_signed(work: Path) -> ssl.SSLContext:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+    (work / "smtp.crt").write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    (work / "smtp.key").write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                      serialization.NoEncryption()))
+    ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ctx.load_cert_chain(work / "smtp.crt", work / "smtp.key")
+    return ctx
+
+
+class SlowSink:
+    """Handler aiosmtpd: primește tot, cu o întârziere la DATA; numără sesiunile și mesajele."""
+
+    def __init__(self, delay_ms: float):
+        self.delay = delay_ms / 1000
+        self.sessions, self.messages = set(), []
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        with self.lock:
+            self.sessions.add(session)  # referința ține obiectul în viață (id-urile nu se refolosesc)
+            self.messages.append((time.perf_counter(), envelope.rcpt_tos[0]))
+        return "250 OK"
+
+
+async def _storm(base: str, emails: int, concurrency: int) -> dict:
+    lat, codes = [], {}
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=120) as http:
+        async def one(i: int):
+            async with sem:
+                t0 = time.perf_counter()
+                r = await http.post("/auth/reset/send-otp", params={"email": f"user{i:04d}@example.com"})
+                lat.append(time.perf_counter() - t0)
+                codes[r.status_code] = codes.get(r.status_code, 0) + 1
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(emails)))
+        wall = time.perf_counter() - t0
+    lat.sort()
+    return {"codes": codes, "wall_s": wall, "p50_ms": percentile(lat, 50) * 1000, "p95_ms": percentile(lat, 95) * 1000}
+
+
+def _run(backend: Path, args) -> dict:
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        # validate_email verifică domeniul prin DNS (MX); adresele de test nu au, iar bench-ul nu cere rețea
+        (work / "sitecustomize.py").write_text("import email_validator\nemail_validator.CHECK_DELIVERABILITY = False\n")
+        sink = SlowSink(args.smtp_delay_ms)
+        port = free_port()
+        ctrl = Controller(sink, hostname="127.0.0.1", port=port, tls_context=_self_signed(work))
+        ctrl.start()
+        try:
+            with stub_server(work, latency_ms=0) as stub_port:
+                env = app_env(work, stub_port, PYTHONPATH=f"{work}{os.pathsep}{backend}", SMTP_HOST="127.0.0.1", SMTP_PORT=port,
+                              SMTP_USER="", OTP_RATE_LIMIT_PER_HOUR=1000, **ADMIN_ENV)
+                with app_server(work, env) as base:
+                    t0 = time.perf_counter()
+                    res = asyncio.run(_storm(base, args.emails, args.concurrency))
+                    ok = res["codes"].get(200, 0)
+                    deadline = time.perf_counter() + args.emails * args.smtp_delay_ms / 1000 + 30
+                    while len(sink.messages) < ok and time.perf_counter() < deadline:
+                        time.sleep(0.05)
+                    try:
+                        res["outbox"] = httpx.get(f"{base}/admin/email-outbox", cookies=admin_cookies(base)).json()
+                    except Exception:
+                        res["outbox"] = None
+        finally:
+            ctrl.stop()
+        res["delivered"] = len(sink.messages)
+        res["smtp_sessions"] = len(sink.sessions)
+        res["delivered_after_s"] = (sink.messages[-1][0] - t0) if sink.messages else 0.0
+        return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--baseline-ref", default=None, help="ex. HEAD~1; rulează și pe acel commit pt comparație")
+    ap.add_argument("--smtp-delay-ms", type=float, default=200)
+    ap.add_argument("--emails", type=int, default=40)
+    ap.add_argument("--concurrency", type=int, default=8)
+    args = ap.parse_args()
+
+    runs = []
+    if args.baseline_ref:
+        with worktree(args.baseline_ref) as wt:
+            runs.append((args.baseline_ref, _run(wt, args)))
+    runs.append(("current", _run(BACKEND, args)))
+
+    print(f"{args.emails} × /auth/reset/send-otp, {args.concurrency} concurente, SMTP {args.smtp_delay_ms:.0f} ms/mesaj")
+    print(f"{'build':>10} {'codes':>14} {'p50 ms':>8} {'p95 ms':>8} {'wall s':>7} {'livrate':>8} {'sesiuni':>8} "
+          f"{'livrat la s':>11}")
+    for name, r in runs:
+        print(f"{name:>10} {str(r['codes']):>14} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['wall_s']:>7.2f} "
+              f"{r['delivered']:>8} {r['smtp_sessions']:>8} {r['delivered_after_s']:>11.2f}")
+        if r.get("outbox"):
+            print(f"{'':>10} outbox: {r['outbox']}")
+
+
+if __name__ == "__main__":
+    main()
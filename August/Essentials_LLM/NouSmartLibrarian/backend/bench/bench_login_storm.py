@@ -0,0 +1,93 @@
+# backend/bench/bench_login_storm.py
+# Latența /chat/recommend fără și cu o „furtună” de login-uri pe același worker. Cu bcrypt în executorul
+# dedicat (app/security.py) event loop-ul rămâne liber: chat-ul trebuie să rămână aproape constant, iar
+# login-urile peste capacitatea cozii primesc 503 în loc să se adune.
+#   cd backend && python -m bench.bench_login_storm --latency-ms 200 --storm 48 --duration 15
+import argparse, asyncio, statistics, tempfile, time
+from pathlib import Path
+
+import httpx
+
+from ._servers import ADMIN_ENV, admin_cookies, app_env, app_server, login_cookies, seed, stub_server
+from .load_chat import QUERIES
+from .load_mix import percentile
+
+
+async def _chat_loop(base: str, cookies: dict, concurrency: int, deadline: float) -> list:
+    lat = []
+    async with httpx.AsyncClient(base_url=base, timeout=120, cookies=cookies) as http:
+        async def one(w: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                i += 1
+                t0 = time.perf_counter()
+                r = await http.post("/chat/recommend", json={"query": f"{QUERIES[(w + i) % len(QUERIES)]} #{w}-{i}"})
+                if r.status_code == 200:
+                    lat.append(time.perf_counter() - t0)
+        await asyncio.gather(*(one(w) for w in range(concurrency)))
+    return sorted(lat)
+
+
+async def _login_storm(base: str, storm: int, deadline: float, username: str, password: str) -> dict:
+    codes, lat = {}, []
+    async with httpx.AsyncClient(base_url=base, timeout=120) as http:
+        async def one():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                r = await http.post("/auth/login", json={"identifier": username, "password": password})
+                codes[r.status_code] = codes.get(r.status_code, 0) + 1
+                if r.status_code == 200:
+                    lat.append(time.perf_counter() - t0)
+                elif r.status_code == 503:
+                    await asyncio.sleep(float(r.headers.get("retry-after", "1")))
+        await asyncio.gather(*(one() for _ in range(storm)))
+    lat.sort()
+    return {"codes": codes, "p50_ms": statistics.median(lat) * 1000 if lat else 0.0}
+
+
+async def _phase(base: str, cookies: dict, args, storm: int) -> dict:
+    deadline = time.perf_counter() + args.duration
+    tasks = [_chat_loop(base, cookies, args.chat_concurrency, deadline)]
+    if storm:
+        tasks.append(_login_storm(base, storm, deadline, "stormuser", "StormPass123!"))
+    res = await asyncio.gather(*tasks)
+    lat = res[0]
+    return {"storm": storm, "chat_requests": len(lat), "chat_p50_ms": percentile(lat, 50) * 1000,
+            "chat_p95_ms": percentile(lat, 95) * 1000, "chat_p99_ms": percentile(lat, 99) * 1000,
+            "logins": res[1] if storm else None}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=200)
+    ap.add_argument("--chat-concurrency", type=int, default=4)
+    ap.add_argument("--storm", type=int, default=48, help="clienți care fac login în buclă")
+    ap.add_argument("--duration", type=float, default=15)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        with stub_server(work, latency_ms=args.latency_ms) as stub_port:
+            env = app_env(work, stub_port, **ADMIN_ENV)
+            seed(env, work)
+            with app_server(work, env) as base:
+                cookies = login_cookies(base)
+                login_cookies(base, username="stormuser", password="StormPass123!")
+                asyncio.run(_phase(base, cookies, argparse.Namespace(**{**vars(args), "duration": 2}), 0))  # încălzire
+                rows = [asyncio.run(_phase(base, cookies, args, s)) for s in (0, args.storm)]
+                pool = httpx.get(f"{base}/admin/hash-pool", cookies=admin_cookies(base)).json()
+
+    print(f"stub latency={args.latency_ms:.0f} ms, {args.chat_concurrency} clienți chat, {args.duration:.0f}s per fază, "
+          f"executor bcrypt: {pool['workers']} thread(s) + coadă {pool['queue']}")
+    print(f"{'storm':>6} {'chat':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  logins")
+    for r in rows:
+        logins = r["logins"]
+        extra = (f"{logins['codes']} (p50 login ok {logins['p50_ms']:.0f} ms)" if logins else "-")
+        print(f"{r['storm']:>6} {r['chat_requests']:>6} {r['chat_p50_ms']:>8.0f} {r['chat_p95_ms']:>8.0f} "
+              f"{r['chat_p99_ms']:>8.0f}  {extra}")
+    base_row, storm_row = rows
+    print(f"chat p95 cu furtună / fără: x{storm_row['chat_p95_ms'] / max(base_row['chat_p95_ms'], 1e-9):.2f}")
+
+
+if __name__ == "__main__":
+    main()
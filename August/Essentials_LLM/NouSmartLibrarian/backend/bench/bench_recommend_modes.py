@@ -0,0 +1,59 @@
+# backend/bench/bench_recommend_modes.py
+# Compară RECOMMEND_MODE=two_step (tool call + al doilea apel) cu RECOMMEND_MODE=single (un apel cu
+# output structurat) contra stub-ului OpenAI: latență end-to-end, apeluri LLM și tokeni per cerere.
+#   cd backend && python -m bench.bench_recommend_modes --latency-ms 300 --requests 30
+import argparse, statistics, tempfile, time
+from pathlib import Path
+
+import httpx
+
+from ._servers import app_env, app_server, login_cookies, seed, stub_server
+from .load_chat import QUERIES
+
+
+def _run_mode(work: Path, stub_port: int, stub_base: str, mode: str, n: int) -> dict:
+    env = app_env(work, stub_port, RECOMMEND_MODE=mode)
+    with app_server(work, env) as base:
+        cookies = login_cookies(base, username=f"bench_{mode}")
+        before = httpx.get(f"{stub_base}/stats").json()
+        lat, errors = [], 0
+        with httpx.Client(base_url=base, timeout=60, cookies=cookies) as http:
+            for i in range(n):
+                t0 = time.perf_counter()
+                r = http.post("/chat/recommend", json={"query": f"{QUERIES[i % len(QUERIES)]} #{i}"})
+                lat.append((time.perf_counter() - t0) * 1000)
+                body = r.json() if r.status_code == 200 else {}
+                if body.get("status") != "success" or not body.get("summary"):
+                    errors += 1
+        after = httpx.get(f"{stub_base}/stats").json()
+    lat.sort()
+    per = lambda k: (after[k] - before[k]) / n
+    return {"mode": mode, "errors": errors, "p50_ms": statistics.median(lat), "p95_ms": lat[int(len(lat) * 0.95) - 1],
+            "calls": per("chat"), "prompt_tok": per("prompt_tokens"), "completion_tok": per("completion_tokens")}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--requests", type=int, default=30)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        with stub_server(work, latency_ms=args.latency_ms) as stub_port:
+            stub_base = f"http://127.0.0.1:{stub_port}"
+            seed(app_env(work, stub_port), work)
+            print(f"stub latency={args.latency_ms:.0f} ms/call, {args.requests} cereri secvențiale per mod")
+            print(f"{'mode':>9} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'calls':>6} {'prompt tok':>11} {'compl tok':>10}")
+            rows = [_run_mode(work, stub_port, stub_base, m, args.requests) for m in ("two_step", "single")]
+            for r in rows:
+                print(f"{r['mode']:>9} {r['errors']:>4} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['calls']:>6.1f} "
+                      f"{r['prompt_tok']:>11.0f} {r['completion_tok']:>10.0f}")
+            two, one = rows
+            tok = lambda r: r["prompt_tok"] + r["completion_tok"]
+            print(f"single vs two_step: latență p50 x{one['p50_ms'] / two['p50_ms']:.2f}, "
+                  f"tokeni x{tok(one) / tok(two):.2f}")
+
+
+if __name__ == "__main__":
+    main()
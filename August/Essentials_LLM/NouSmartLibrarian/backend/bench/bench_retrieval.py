@@ -0,0 +1,89 @@
+# backend/bench/bench_retrieval.py
+# Compară latența top-k: index NumPy (mmap) vs Chroma PersistentClient, pe vectori sintetici
+# (fără apeluri OpenAI – se măsoară doar căutarea, embedding-ul query-ului e dat direct).
+#   cd backend && python -m bench.bench_retrieval --sizes 20 10000 100000
+# Rulare locală (1 vCPU, OpenBLAS, dim 1536, k=5, 200 query-uri), p50 / p95 ms, build s:
+#       20  numpy  0.025 / 0.03     0.0 | chroma  1.8 / 5.3     0.1
+#   10 000  numpy  3.1   / 3.9      0.3 | chroma  4.6 / 12.0   48
+#  100 000  numpy 56     / 109      2.6 | chroma  6.0 / 7.4   610
+# Căutarea NumPy e exactă (un produs matrice-vector, O(n)), HNSW din Chroma e aproximativă (~log n): sub
+# ~10k cărți numpy e mai rapid și se construiește de ~100-200x mai repede; la 100k Chroma răspunde de ~9x
+# mai repede, deci acolo RETRIEVAL_BACKEND=chroma rămâne alegerea pt latență.
+import argparse, statistics, tempfile, time
+from pathlib import Path
+
+import numpy as np
+
+from app.vector_index import VectorIndex
+
+
+def _vectors(n: int, dim: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim), dtype=np.float32)
+
+
+def _timed(fn, queries) -> dict:
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+    lat.sort()
+    return {
+        "p50_ms": round(statistics.median(lat), 3),
+        "p95_ms": round(lat[int(len(lat) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(lat), 3),
+    }
+
+
+def bench_numpy(tmp: Path, vecs: np.ndarray, queries: np.ndarray, k: int) -> dict:
+    idx = VectorIndex(tmp / "numpy")
+    ids = [f"book_{i}" for i in range(len(vecs))]
+    t0 = time.perf_counter()
+    idx.upsert(ids, ids, [{"title": i} for i in ids], vecs)
+    build = time.perf_counter() - t0
+    idx = VectorIndex(tmp / "numpy")  # re-deschis: matricea vine din mmap, ca la pornirea aplicației
+    res = _timed(lambda q: idx.query(q, k=k), queries)
+    res["build_s"] = round(build, 2)
+    return res
+
+
+def bench_chroma(tmp: Path, vecs: np.ndarray, queries: np.ndarray, k: int) -> dict:
+    from chromadb import PersistentClient
+    client = PersistentClient(path=str(tmp / "chroma"))
+    coll = client.create_collection("bench", embedding_function=None, metadata={"hnsw:space": "cosine"})
+    ids = [f"book_{i}" for i in range(len(vecs))]
+    batch = client.get_max_batch_size()
+    t0 = time.perf_counter()
+    for i in range(0, len(ids), batch):
+        coll.add(ids=ids[i:i + batch], embeddings=vecs[i:i + batch].tolist(),
+                 documents=ids[i:i + batch], metadatas=[{"title": x} for x in ids[i:i + batch]])
+    build = time.perf_counter() - t0
+    res = _timed(lambda q: coll.query(query_embeddings=[q.tolist()], n_results=k,
+                                      include=["metadatas", "documents"]), queries)
+    res["build_s"] = round(build, 2)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 10_000, 100_000])
+    ap.add_argument("--dim", type=int, default=1536)  # text-embedding-3-small
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--skip-chroma", action="store_true")
+    args = ap.parse_args()
+
+    queries = _vectors(args.queries, args.dim, seed=1)
+    print(f"{'books':>8} {'engine':>7} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} {'build s':>8}")
+    for n in args.sizes:
+        vecs = _vectors(n, args.dim, seed=0)
+        with tempfile.TemporaryDirectory() as d:
+            engines = [("numpy", bench_numpy)] + ([] if args.skip_chroma else [("chroma", bench_chroma)])
+            for name, fn in engines:
+                r = fn(Path(d), vecs, queries, args.k)
+                print(f"{n:>8} {name:>7} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['mean_ms']:>9} {r['build_s']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# backend/bench/bench_title_match.py
+# match_title_key: scanare liniară (regex pe fiecare cheie, la fiecare apel) vs TitleIndex precalculat.
+# Verifică și că ambele variante dau exact același rezultat.
+#   cd backend && python -m bench.bench_title_match --titles 100000
+import argparse, random, statistics, time
+
+from app.patch.title_match import TitleIndex, _match_linear
+
+WORDS = ("umbra vântul dragonul orașul noaptea marea pădurea regina lupul cartea focul timpul visul "
+         "steaua tăcerea drumul grădina castelul iarna zorii secretul ultimul primul pierdut").split()
+
+
+def _titles(n: int, rng: random.Random):
+    seen, out = set(), []
+    while len(out) < n:
+        t = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+        t = f"{t} {len(out)}"  # unic
+        if rng.random() < 0.1:
+            t += f": Volumul {rng.randint(1, 9)}"
+        if t not in seen:
+            seen.add(t); out.append(t)
+    return out
+
+
+def _queries(titles, n: int, rng: random.Random):
+    qs = []
+    for _ in range(n):
+        t = rng.choice(titles)
+        r = rng.random()
+        if r < 0.4:
+            qs.append(t)                                   # exact
+        elif r < 0.6:
+            qs.append(f"„{t}” (ediția 2001)")              # curățat la exact
+        elif r < 0.8:
+            w = t.split()
+            qs.append(" ".join(w[1:3]))                    # subșir
+        else:
+            qs.append(f"Titlu inexistent {rng.randint(0, 10**9)}")  # miss
+    return qs
+
+
+def _time(fn, qs):
+    lat = []
+    for q in qs:
+        t0 = time.perf_counter(); fn(q); lat.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(lat), statistics.fmean(lat)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--titles", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--linear-queries", type=int, default=50)  # scanarea liniară e lentă la 100k
+    args = ap.parse_args()
+
+    rng = random.Random(42)
+    titles = _titles(args.titles, rng)
+    qs = _queries(titles, args.queries, rng)
+
+    t0 = time.perf_counter()
+    idx = TitleIndex(titles)
+    build = time.perf_counter() - t0
+
+    lin_qs = qs[:args.linear_queries]
+    mismatches = [q for q in lin_qs if idx.lookup(q) != _match_linear(q, titles)]
+    lin_p50, lin_mean = _time(lambda q: _match_linear(q, titles), lin_qs)
+    idx_p50, idx_mean = _time(idx.lookup, qs)
+
+    print(f"titles={args.titles} index build={build:.2f}s mismatches={len(mismatches)}/{len(lin_qs)}")
+    print(f"linear : p50={lin_p50:.3f} ms mean={lin_mean:.3f} ms ({len(lin_qs)} queries)")
+    print(f"index  : p50={idx_p50:.4f} ms mean={idx_mean:.4f} ms ({len(qs)} queries)")
+    for q in mismatches[:5]:
+        print("  mismatch:", q)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# backend/bench/load_chat.py
+# Load test pt /chat/recommend contra stub-ului OpenAI: throughput-ul trebuie să crească odată cu
+# numărul de cereri simultane (apelurile LLM nu mai blochează event loop-ul).
+#   cd backend && python -m bench.load_chat --latency-ms 300 --levels 1 4 16 64
+import argparse, asyncio, statistics, tempfile, time
+from pathlib import Path
+
+import httpx
+
+from ._servers import app_env, app_server, login_cookies, seed, stub_server
+
+QUERIES = [
+    "Vreau o carte despre prietenie și magie",
+    "Ce îmi recomanzi despre război și putere?",
+    "O poveste de dragoste emoționantă",
+    "Ceva despre supraviețuire în natură",
+    "Un roman despre identitate și maturizare",
+    "Recomandă-mi o carte cu aventuri pe mare",
+]
+
+
+async def _run_level(base: str, cookies: dict, concurrency: int, total: int) -> dict:
+    lat, errors, sample = [], 0, None
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits, cookies=cookies) as http:
+        async def one(i: int):
+            nonlocal errors, sample
+            async with sem:
+                t0 = time.perf_counter()
+                r = await http.post("/chat/recommend", json={"query": f"{QUERIES[i % len(QUERIES)]} #{i}"})
+                lat.append(time.perf_counter() - t0)
+                if r.status_code != 200 or r.json().get("status") != "success":
+                    errors += 1
+                    sample = sample or f"{r.status_code} {r.text[:200]}"
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        wall = time.perf_counter() - t0
+    lat.sort()
+    return {"concurrency": concurrency, "requests": total, "errors": errors, "error_sample": sample, "rps": total / wall,
+            "p50_ms": statistics.median(lat) * 1000, "p95_ms": lat[int(len(lat) * 0.95) - 1] * 1000}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    ap.add_argument("--per-level", type=int, default=4, help="cereri per nivel = per_level * concurrency (min 8)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        with stub_server(work, latency_ms=args.latency_ms) as stub_port:
+            env = app_env(work, stub_port)
+            seed(env, work)
+            with app_server(work, env) as base:
+                cookies = login_cookies(base)
+                print(f"stub latency={args.latency_ms:.0f} ms/call, 2 LLM calls per request")
+                print(f"{'conc':>5} {'reqs':>5} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9}")
+                for c in args.levels:
+                    r = asyncio.run(_run_level(base, cookies, c, max(8, c * args.per_level)))
+                    print(f"{r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} {r['rps']:>8.2f} "
+                          f"{r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f}")
+                    if r["error_sample"]:
+                        print(f"      e.g. {r['error_sample']}")
+
+
+if __name__ == "__main__":
+    main()
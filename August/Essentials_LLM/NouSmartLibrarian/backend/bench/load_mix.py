@@ -0,0 +1,197 @@
+# backend/bench/load_mix.py
+# Benchmark cu trafic mixt pt app.main:app contra stub-ului OpenAI (latență și tokeni configurabile),
+# cu index local seed-uit (numpy sau Chroma) și Redis indisponibil -> fallback-urile in-memory
+# (sau un Redis real cu --redis-url). Fiecare utilizator virtual rulează sesiuni realiste:
+#   autentificat: recomandare -> (uneori) follow-up despre carte -> (uneori) „a doua carte”
+#   anonim:       cookie nou -> recomandare -> (uneori) „a doua carte”
+# Raportează p50/p95/p99 și rps per tip de cerere și salvează rezultatul în JSON; cu --compare
+# afișează diferențele față de un rezultat anterior (ex. rulat pe commit-ul precedent).
+#   cd backend && python -m bench.load_mix --latency-ms 300 --concurrency 16 --duration 30
+#   cd backend && python -m bench.load_mix --compare bench/results/mix_<commit>.json
+import argparse, asyncio, json, platform, random, subprocess, tempfile, time, uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from ._servers import BACKEND, app_env, app_server, login_cookies, seed, stub_server
+from .load_chat import QUERIES
+
+KINDS = ("recommend", "followup", "ordinal", "anonymous")
+FOLLOWUPS = ["Câte pagini are?", "Cine a scris această carte?", "Când a fost publicată?", "Spune-mi mai multe despre ea"]
+ORDINALS = ["Vreau a doua carte sugerată", "Aleg prima", "Mă interesează a treia"]
+RESULTS_DIR = BACKEND / "bench" / "results"
+
+
+def percentile(sorted_vals: List[float], p: float) -> float:
+    # nearest-rank, suficient pt câteva sute / mii de eșantioane
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.lat: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.samples: Dict[str, str] = {}
+
+    def add(self, kind: str, seconds: float, ok: bool, sample: str = ""):
+        self.lat[kind].append(seconds)
+        if not ok:
+            self.errors[kind] += 1
+            self.samples.setdefault(kind, sample[:200])
+
+    def summary(self, wall: float) -> Dict[str, Dict]:
+        out = {}
+        for kind in [*KINDS, "all"]:
+            vals = sorted(v for k in KINDS for v in self.lat[k]) if kind == "all" else sorted(self.lat[kind])
+            if not vals:
+                continue
+            errors = sum(self.errors.values()) if kind == "all" else self.errors[kind]
+            out[kind] = {
+                "requests": len(vals), "errors": errors, "rps": len(vals) / wall,
+                "p50_ms": percentile(vals, 50) * 1000, "p95_ms": percentile(vals, 95) * 1000,
+                "p99_ms": percentile(vals, 99) * 1000, "mean_ms": sum(vals) / len(vals) * 1000,
+            }
+            if kind in self.samples:
+                out[kind]["error_sample"] = self.samples[kind]
+        return out
+
+
+async def _ask(http: httpx.AsyncClient, rec: Recorder, kind: str, query: str, cookies: Optional[dict] = None) -> dict:
+    t0 = time.perf_counter()
+    try:
+        r = await http.post("/chat/recommend", json={"query": query}, cookies=cookies)
+        body = r.json() if r.status_code == 200 else {}
+        ok = body.get("status") in ("success", "need_title")
+        rec.add(kind, time.perf_counter() - t0, ok, f"{r.status_code} {r.text}")
+        return body
+    except httpx.HTTPError as e:
+        rec.add(kind, time.perf_counter() - t0, False, repr(e))
+        return {}
+
+
+async def _virtual_user(base: str, cookies: dict, rng: random.Random, rec: Recorder, deadline: float, args):
+    async with httpx.AsyncClient(base_url=base, timeout=120) as http:
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            query = f"{rng.choice(QUERIES)} #{i}"
+            if rng.random() < args.anon_ratio:
+                anon = {"anon_session_id": "anon-" + uuid.uuid4().hex[:16]}  # sub limita gratuită per sesiune
+                await _ask(http, rec, "anonymous", query, anon)
+                if rng.random() < args.ordinal_ratio:
+                    await _ask(http, rec, "ordinal", rng.choice(ORDINALS), anon)
+                continue
+            await _ask(http, rec, "recommend", query, cookies)
+            if rng.random() < args.followup_ratio:
+                await _ask(http, rec, "followup", rng.choice(FOLLOWUPS), cookies)
+            if rng.random() < args.ordinal_ratio:
+                await _ask(http, rec, "ordinal", rng.choice(ORDINALS), cookies)
+            if args.think_ms:
+                await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+
+async def run_mix(base: str, users: List[dict], args) -> Dict:
+    rec = Recorder()
+    # încălzire: primul embedding / încărcarea indexului nu intră în măsurători
+    async with httpx.AsyncClient(base_url=base, timeout=120) as http:
+        await _ask(http, Recorder(), "recommend", QUERIES[0], users[0])
+    t0 = time.perf_counter()
+    deadline = t0 + args.duration
+    await asyncio.gather(*(_virtual_user(base, users[i % len(users)], random.Random(args.seed + i), rec, deadline, args)
+                           for i in range(args.concurrency)))
+    return rec.summary(time.perf_counter() - t0)
+
+
+def _git_commit() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "."], cwd=BACKEND,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def print_table(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None):
+    print(f"{'endpoint':>10} {'reqs':>6} {'err':>4} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind, r in results.items():
+        print(f"{kind:>10} {r['requests']:>6} {r['errors']:>4} {r['rps']:>8.2f} "
+              f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f}")
+        b = (baseline or {}).get(kind)
+        if b:
+            d = lambda k: f"{(r[k] - b[k]) / b[k] * 100:+.0f}%" if b[k] else "n/a"
+            print(f"{'vs base':>10} {'':>6} {'':>4} {d('rps'):>8} {d('p50_ms'):>8} {d('p95_ms'):>8} {d('p99_ms'):>8}")
+        if r.get("error_sample"):
+            print(f"{'':>10} e.g. {r['error_sample']}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=300, help="latența stub-ului per apel chat")
+    ap.add_argument("--embed-latency-ms", type=float, default=50)
+    ap.add_argument("--prompt-tokens", type=int, default=0, help="0 = estimat din lungimea cererii")
+    ap.add_argument("--completion-tokens", type=int, default=0)
+    ap.add_argument("--retrieval", choices=("numpy", "chroma"), default="numpy")
+    ap.add_argument("--redis-url", default=None, help="implicit: Redis indisponibil -> fallback in-memory")
+    ap.add_argument("--mode", choices=("two_step", "single"), default="two_step")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--concurrency", type=int, default=16, help="utilizatori virtuali simultani")
+    ap.add_argument("--users", type=int, default=8, help="conturi autentificate distincte")
+    ap.add_argument("--duration", type=float, default=30, help="secunde de trafic măsurat")
+    ap.add_argument("--anon-ratio", type=float, default=0.25)
+    ap.add_argument("--followup-ratio", type=float, default=0.5)
+    ap.add_argument("--ordinal-ratio", type=float, default=0.3)
+    ap.add_argument("--think-ms", type=float, default=0, help="pauză medie între sesiuni")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", type=Path, default=None, help=f"implicit: {RESULTS_DIR.relative_to(BACKEND)}/mix_<commit>.json")
+    ap.add_argument("--compare", type=Path, default=None, help="JSON-ul unei rulări anterioare")
+    args = ap.parse_args()
+
+    commit = _git_commit()
+    overrides = {"RETRIEVAL_BACKEND": args.retrieval, "RECOMMEND_MODE": args.mode}
+    if args.redis_url:
+        overrides["REDIS_URL"] = args.redis_url
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        with stub_server(work, latency_ms=args.latency_ms, STUB_EMBED_LATENCY_MS=args.embed_latency_ms,
+                         STUB_PROMPT_TOKENS=args.prompt_tokens, STUB_COMPLETION_TOKENS=args.completion_tokens) as sp:
+            env = app_env(work, sp, **overrides)
+            seed(env, work)
+            with app_server(work, env, workers=args.workers) as base:
+                users = [login_cookies(base, username=f"mix{i:03d}") for i in range(max(1, args.users))]
+                before = httpx.get(f"http://127.0.0.1:{sp}/stats").json()
+                results = asyncio.run(run_mix(base, users, args))
+                after = httpx.get(f"http://127.0.0.1:{sp}/stats").json()
+
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "stub": {k: after[k] - before.get(k, 0) for k in after},
+        "results": results,
+    }
+    out = args.out or RESULTS_DIR / f"mix_{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    baseline = None
+    if args.compare:
+        base_report = json.loads(args.compare.read_text(encoding="utf-8"))
+        baseline = base_report.get("results")
+        print(f"comparat cu {base_report.get('commit')} ({args.compare})")
+    print(f"commit {commit}, stub latency={args.latency_ms:.0f} ms, {args.concurrency} utilizatori virtuali, "
+          f"{args.duration:.0f}s, retrieval={args.retrieval}, mode={args.mode}")
+    print_table(results, baseline)
+    print(f"apeluri stub: {report['stub'].get('chat', 0)} chat, {report['stub'].get('embeddings', 0)} embeddings")
+    print(f"rezultate salvate în {out}")
+
+
+if __name__ == "__main__":
+    main()
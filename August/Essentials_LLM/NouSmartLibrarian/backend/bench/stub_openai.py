@@ -0,0 +1,121 @@
+# backend/bench/stub_openai.py
+# Server OpenAI local (fals) pt benchmark-uri: /v1/chat/completions și /v1/embeddings,
+# cu latență și consum de tokeni configurabile. Nu face niciun apel extern.
+#   STUB_LATENCY_MS=300 uvicorn bench.stub_openai:app --port 9100
+import asyncio, hashlib, json, math, os, re, time, uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "300"))
+EMBED_LATENCY_MS = float(os.getenv("STUB_EMBED_LATENCY_MS", "50"))
+# 0 = estimat din lungimea cererii / răspunsului (~4 caractere / token)
+PROMPT_TOKENS = int(os.getenv("STUB_PROMPT_TOKENS", "0"))
+COMPLETION_TOKENS = int(os.getenv("STUB_COMPLETION_TOKENS", "0"))
+EMBED_DIM = int(os.getenv("STUB_EMBED_DIM", "256"))
+
+app = FastAPI(title="stub-openai")
+_stats = {"chat": 0, "embeddings": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+
+def _embed(text: str):
+    # vector determinist din hash-urile cuvintelor -> texte similare dau vectori similari
+    v = [0.0] * EMBED_DIM
+    for w in re.findall(r"\w+", text.lower()):
+        h = int(hashlib.md5(w.encode("utf-8")).hexdigest(), 16)
+        v[h % EMBED_DIM] += 1.0 if (h >> 64) & 1 else -1.0
+    n = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / n for x in v]
+
+
+def _usage(prompt: int, completion: int):
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _chat_usage(body: dict, message: dict):
+    prompt = PROMPT_TOKENS or math.ceil(len(json.dumps(
+        [body.get("messages"), body.get("tools"), body.get("response_format")], ensure_ascii=False)) / 4)
+    out = message.get("content") or json.dumps(message.get("tool_calls") or [], ensure_ascii=False)
+    completion = COMPLETION_TOKENS or math.ceil(len(out) / 4)
+    _stats["prompt_tokens"] += prompt
+    _stats["completion_tokens"] += completion
+    return _usage(prompt, completion)
+
+
+def _first_candidate(body: dict):
+    for m in body.get("messages", []):
+        c = m.get("content") or ""
+        if "Candidați disponibili:" in c:
+            return c.split("Candidați disponibili:", 1)[1].split("\n", 1)[0].split(",")[0].strip()
+    return None
+
+
+def _answer_text(title):
+    return (f"Îți recomand „{title}”. Este o alegere potrivită pentru ce cauți: personaje memorabile, "
+            f"teme puternice și o poveste care te ține aproape de pagini până la final.")
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input")
+    inputs = [inputs] if isinstance(inputs, str) else list(inputs or [])
+    _stats["embeddings"] += 1
+    await asyncio.sleep(EMBED_LATENCY_MS / 1000)
+    tokens = sum(len(str(t).split()) for t in inputs)
+    return {
+        "object": "list",
+        "model": body.get("model"),
+        "data": [{"object": "embedding", "index": i, "embedding": _embed(str(t))} for i, t in enumerate(inputs)],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat(request: Request):
+    body = await request.json()
+    _stats["chat"] += 1
+    title = _first_candidate(body)
+    base = {"id": "chatcmpl-" + uuid.uuid4().hex[:12], "object": "chat.completion",
+            "created": int(time.time()), "model": body.get("model")}
+    message = {"role": "assistant", "content": _answer_text(title)}
+
+    tools = body.get("tools") or []
+    has_tool_result = any(m.get("role") == "tool" for m in body.get("messages", []))
+    fmt = body.get("response_format") or {}
+    if tools and not has_tool_result and title:
+        message = {"role": "assistant", "content": None, "tool_calls": [{
+            "id": "call_" + uuid.uuid4().hex[:8], "type": "function",
+            "function": {"name": tools[0]["function"]["name"], "arguments": json.dumps({"title": title})},
+        }]}
+    elif fmt.get("type") == "json_schema":
+        message = {"role": "assistant", "content": json.dumps({"title": title, "message": _answer_text(title)},
+                                                               ensure_ascii=False)}
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(base, message, _chat_usage(body, message)), media_type="text/event-stream")
+
+    await asyncio.sleep(LATENCY_MS / 1000)
+    return JSONResponse({**base, "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                         "usage": _chat_usage(body, message)})
+
+
+async def _stream(base: dict, message: dict, usage: dict):
+    # primul token după ~jumătate din latență, restul distribuit pe cuvinte
+    words = (message.get("content") or "").split(" ")
+    await asyncio.sleep(LATENCY_MS / 2000)
+    step = (LATENCY_MS / 2000) / max(1, len(words))
+    for i, w in enumerate(words):
+        chunk = {**base, "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": {"content": (w if i == 0 else " " + w)}, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        await asyncio.sleep(step)
+    last = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": usage}
+    yield f"data: {json.dumps(last)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.get("/stats")
+async def stats():
+    return _stats
@@ -0,0 +1,47 @@
+# Mediu izolat pt teste (ca bench/_servers.app_env): fără OpenAI / Redis reale, store-uri într-un director
+# temporar. Setat înainte de primul import din app – config.Settings citește mediul la import.
+import os, tempfile
+
+_TMP = tempfile.mkdtemp(prefix="librarian-tests-")
+for k, v in {
+    "OPENAI_API_KEY": "sk-test",
+    "RETRIEVAL_BACKEND": "numpy",
+    "VECTOR_INDEX_PATH": os.path.join(_TMP, "vector_index"),
+    "CHROMA_PATH": os.path.join(_TMP, "chroma"),
+    "EMBEDDING_CACHE_PATH": os.path.join(_TMP, "embeddings.sqlite3"),
+    "SQLITE_URL": f"sqlite:///{os.path.join(_TMP, 'app.db')}",
+    "USAGE_DB_PATH": os.path.join(_TMP, "usage.sqlite3"),
+    "REDIS_URL": "redis://127.0.0.1:1/0",
+    "RATE_LIMIT_ENABLED": "false",
+}.items():
+    os.environ.setdefault(k, v)
+
+
+import pytest
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """redis_pool.run pe un fakeredis (cu Lua) și un circuit nou, închis."""
+    import fakeredis
+    from app import redis_pool
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_pool, "breaker", redis_pool.CircuitBreaker(threshold=1, reset_after=3600))
+    # clientul se creează per apel: fiecare asyncio.run are propriul event loop
+    monkeypatch.setattr(redis_pool, "client",
+                        lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    return server
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    """Circuit deschis: toate apelurile trec pe fallback-ul din mem_store."""
+    from app import mem_store, redis_pool
+
+    b = redis_pool.CircuitBreaker(threshold=1, reset_after=3600)
+    b.trip()
+    monkeypatch.setattr(redis_pool, "breaker", b)
+    mem_store.clear()
+    yield
+    mem_store.clear()
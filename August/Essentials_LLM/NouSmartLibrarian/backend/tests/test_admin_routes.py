@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+
+ADMIN_ONLY = ["/admin/embedding-cache", "/admin/response-cache", "/admin/catalog", "/admin/redis", "/admin/mem-store",
+              "/admin/auth-cache", "/admin/hash-pool", "/admin/email-outbox"]
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app.main import app
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def sessions(client):
+    return {"user": _login(client, "plainuser"), "admin": _login(client, "adminuser", role="admin")}
+
+
+def _login(client, username, role="user"):
+    from app.db import SessionLocal
+    from app.models import User
+
+    password = "TestPass123!"
+    client.post("/auth/register", json={"email": f"{username}@example.com", "username": username,
+                                        "password": password, "first_name": "Test", "last_name": "User"})
+    if role != "user":
+        with SessionLocal() as db:
+            db.query(User).filter(User.username == username).update({"role": role})
+            db.commit()
+    r = client.post("/auth/login", json={"identifier": username, "password": password})
+    assert r.status_code == 200, r.text
+    client.cookies.clear()
+    return dict(r.cookies)
+
+
+def _get(client, path, cookies):
+    # TestClient păstrează cookie-urile între cereri: fiecare cerere pornește de la zero
+    client.cookies.clear()
+    client.cookies.update(cookies)
+    return client.get(path)
+
+
+@pytest.mark.parametrize("path", ADMIN_ONLY)
+def test_admin_stats_require_admin_role(client, sessions, path):
+    assert _get(client, path, {}).status_code == 403
+    assert _get(client, path, sessions["user"]).status_code == 403
+    assert _get(client, path, sessions["admin"]).status_code == 200
+
+
+
+def test_catalog_info_does_not_expose_source_path(client, sessions):
+    info = _get(client, "/admin/catalog", sessions["admin"]).json()
+    assert "source" not in info
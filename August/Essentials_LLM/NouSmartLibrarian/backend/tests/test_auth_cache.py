@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app import auth_cache, mem_store
+
+
+def _loader(monkeypatch, invalidate_during=None):
+    """_load_user fals: întoarce versiunea curentă; la primul apel rulează invalidate_during() înainte
+    de a răspunde (ca un invalidate concurent cu citirea din DB)."""
+    state = {"version": 1, "loads": 0}
+
+    async def load(uid):
+        snapshot = state["version"]
+        state["loads"] += 1
+        if invalidate_during and state["loads"] == 1:
+            state["version"] += 1
+            await invalidate_during(uid)
+        return {"id": uid, "role": f"v{snapshot}", "preferences": []}
+
+    monkeypatch.setattr(auth_cache, "_load_user", load)
+    return state
+
+
+@pytest.mark.parametrize("invalidate", [auth_cache.invalidate, lambda uid: auth_cache.invalidate_all()])
+def test_miss_does_not_overwrite_concurrent_invalidate_redis(fake_redis, monkeypatch, invalidate):
+    state = _loader(monkeypatch, invalidate_during=invalidate)
+
+    async def scenario():
+        first = await auth_cache.get_user("u1")
+        second = await auth_cache.get_user("u1")
+        third = await auth_cache.get_user("u1")
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first["role"] == "v1"  # cererea în curs vede ce a citit, dar nu pune în cache
+    assert second["role"] == third["role"] == "v2"
+    assert state["loads"] == 2  # al treilea apel e hit pe proiecția nouă
+
+
+@pytest.mark.parametrize("invalidate", [auth_cache.invalidate, lambda uid: auth_cache.invalidate_all()])
+def test_miss_does_not_overwrite_concurrent_invalidate_mem(no_redis, monkeypatch, invalidate):
+    state = _loader(monkeypatch, invalidate_during=invalidate)
+
+    async def scenario():
+        return [await auth_cache.get_user("u1") for _ in range(3)]
+
+    roles = [u["role"] for u in asyncio.run(scenario())]
+    assert roles == ["v1", "v2", "v2"]
+    assert state["loads"] == 2
+    assert mem_store.get(auth_cache.USER_NS, "u1")["role"] == "v2"
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+from app import metrics
+from app.conversation_state import ConversationContext
+from app.patch.catalog import load_catalog
+from app.patch.rate_limit import anon_used_count
+from app.routers import chat_routes
+
+SID = "anon-test"
+
+
+def _plan(monkeypatch):
+    async def stream(**kw):
+        for part in ("Îți ", "recomand ", "„A”."):
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+
+    monkeypatch.setattr(chat_routes, "chat_completion_stream", stream)
+    monkeypatch.setattr(chat_routes, "log_response", lambda *a, **kw: None)
+    ctx = ConversationContext(SID)
+    return chat_routes._Plan(ctx, None, SID, ["A", "B"], [], "A", "Rezumat A.", None, load_catalog(None))
+
+
+def _events(plan):
+    request = SimpleNamespace(cookies={"anon_session_id": SID})
+    return chat_routes._stream_events(plan, request, metrics.start_timer())
+
+
+def test_disconnect_after_title_still_counts_anon_quota(no_redis, monkeypatch):
+    plan = _plan(monkeypatch)
+
+    async def scenario():
+        before = await anon_used_count(SID)
+        gen = _events(plan)
+        async for ev in gen:
+            if ev.startswith("event: title"):
+                break
+        await gen.aclose()  # clientul s-a deconectat după `title`
+        return before, await anon_used_count(SID)
+
+    before, after = asyncio.run(scenario())
+    assert after == before + 1
+
+
+def test_full_stream_counts_anon_quota_once(no_redis, monkeypatch):
+    plan = _plan(monkeypatch)
+
+    async def scenario():
+        events = [ev async for ev in _events(plan)]
+        return events, await anon_used_count(SID)
+
+    events, used = asyncio.run(scenario())
+    assert events[-1].startswith("event: done")
+    assert used == 1
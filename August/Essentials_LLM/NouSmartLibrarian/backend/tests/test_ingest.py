@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pytest
+
+from app import ingest, vector_index
+from app.config import settings
+from app.vector_index import VectorIndex
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    idx = VectorIndex(tmp_path / "vi")
+    saves = []
+    real_save = idx._save
+    monkeypatch.setattr(idx, "_save", lambda m, items: (saves.append(len(items)), real_save(m, items)))
+    monkeypatch.setattr(vector_index, "_index", idx)
+    monkeypatch.setattr(ingest, "_use_numpy", lambda: True)
+    monkeypatch.setattr(ingest, "log_embedding", lambda **kw: None)
+    monkeypatch.setattr(settings, "ingest_flush_batches", 4)
+    idx.saves = saves
+    return idx
+
+
+def _fake_embed(fail_at=None):
+    def embed(idx, books):
+        if idx == fail_at:
+            raise RuntimeError("rate limit")
+        ids = [f"book_{t}" for t, _, _ in books]
+        vecs = np.random.default_rng(idx).normal(size=(len(books), 4)).tolist()
+        return {"idx": idx, "ids": ids, "docs": ids, "metas": [{"title": t} for t, _, _ in books],
+                "vectors": vecs, "tokens": len(books)}
+    return embed
+
+
+def _books(n):
+    return [(f"T{i}", "", []) for i in range(n)]
+
+
+def test_numpy_ingest_saves_once_per_flush_interval(index, monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest, "_embed_batch", _fake_embed())
+    stats = ingest.ingest_books(_books(20), batch_size=2, concurrency=1, checkpoint=tmp_path / "cp.json")
+    assert stats["batches"] == 10 and index.count() == 20
+    assert index.saves == [8, 16, 20]  # 10 batch-uri, flush la 4 -> 3 scrieri, nu 10
+    assert VectorIndex(tmp_path / "vi").count() == 20
+
+
+def test_checkpoint_only_lists_persisted_batches(index, monkeypatch, tmp_path):
+    cp = tmp_path / "cp.json"
+    monkeypatch.setattr(ingest, "_embed_batch", _fake_embed(fail_at=6))
+    with pytest.raises(RuntimeError):
+        ingest.ingest_books(_books(20), batch_size=2, concurrency=1, checkpoint=cp)
+    done = set(json.loads(cp.read_text())["done"])
+    on_disk = {it["id"] for it in VectorIndex(tmp_path / "vi").get()}
+    assert done == {0, 1, 2, 3, 4, 5}
+    assert on_disk == {f"book_T{i}" for i in range(12)}
@@ -0,0 +1,14 @@
+from app.patch.catalog import current
+from app.patch.lexical_index import decisive_title
+
+
+def test_single_rare_term_is_not_decisive():
+    idx = current().lexical
+    # doar „război” se potrivește (un singur document): nu sare peste căutarea vectorială
+    assert decisive_title("vreau ceva despre dragoste și război", index=idx) is None
+
+
+def test_several_rare_terms_and_exact_titles_stay_decisive():
+    idx = current().lexical
+    assert decisive_title("o carte cu un ou de dragon și un fermier", index=idx) == "Eragon"
+    assert decisive_title("Dune", index=idx) == "Dune"
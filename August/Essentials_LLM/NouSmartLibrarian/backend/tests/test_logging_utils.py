@@ -0,0 +1,11 @@
+from app import logging_utils
+
+
+def test_app_logger_adds_one_sink_per_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logging_utils, "_app_sinks", set())
+    added = []
+    monkeypatch.setattr(logging_utils.logger, "add", lambda *a, **kw: added.append(a[0]))
+    for _ in range(3):
+        logging_utils.app_logger()
+    assert len(added) == 1
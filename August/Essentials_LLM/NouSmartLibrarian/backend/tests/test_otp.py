@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app import otp
+from app.config import settings
+
+
+@pytest.fixture(params=["fake_redis", "no_redis"])
+def store(request):
+    """Aceleași scenarii pe scripturile Lua (fakeredis) și pe fallback-ul din mem_store."""
+    request.getfixturevalue(request.param)
+    return request.param
+
+
+def test_concurrent_issue_yields_one_code(store):
+    async def scenario():
+        return await asyncio.gather(*(otp.SIGNUP.issue("a@example.com") for _ in range(20)))
+
+    codes = [c for c in asyncio.run(scenario()) if c]
+    assert len(codes) == 1
+
+
+def test_lockout_after_max_wrong_guesses(store):
+    async def scenario():
+        code = await otp.RESET.issue("b@example.com")
+        wrong = str((int(code) + 1 - 100000) % 900000 + 100000)
+        results = [await otp.RESET.verify("b@example.com", wrong) for _ in range(settings.otp_max_attempts)]
+        return results, await otp.RESET.verify("b@example.com", code)
+
+    wrong_results, after = asyncio.run(scenario())
+    assert not any(wrong_results)
+    assert after is False  # codul s-a anulat după otp_max_attempts încercări greșite
+
+
+def test_correct_code_verifies(store):
+    async def scenario():
+        code = await otp.SIGNUP.issue("c@example.com")
+        return await otp.SIGNUP.verify("c@example.com", code)
+
+    assert asyncio.run(scenario()) is True
+
+
+@pytest.mark.parametrize("code", ["１２３４５６", "12345٦", "12345x", ""])
+def test_non_ascii_digit_code_is_rejected(store, code):
+    async def scenario():
+        real = await otp.SIGNUP.issue("d@example.com")
+        rejected = await otp.SIGNUP.verify("d@example.com", code)
+        return rejected, await otp.SIGNUP.verify("d@example.com", real)
+
+    rejected, ok = asyncio.run(scenario())
+    assert rejected is False
+    assert ok is True
+
+
+def test_verify_mem_compares_non_ascii_without_error(no_redis):
+    from app import mem_store
+
+    mem_store.set("otp", "e@example.com", "123456", 60)
+    assert mem_store.atomic(lambda tx: otp.SIGNUP._verify_mem(tx, "e@example.com", "１２３４５６")) is False
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+
+from app import redis_pool
+from app.redis_pool import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RedisUnavailable
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    b = CircuitBreaker(threshold=1, reset_after=0)
+    monkeypatch.setattr(redis_pool, "breaker", b)
+    monkeypatch.setattr(redis_pool, "client", lambda: None)
+    return b
+
+
+def test_cancelled_probe_does_not_block_the_circuit(breaker):
+    breaker.trip()
+
+    async def scenario():
+        async def slow(_):
+            await asyncio.sleep(10)
+        task = asyncio.create_task(redis_pool.run(slow))
+        await asyncio.sleep(0)
+        assert breaker.state == HALF_OPEN and breaker._probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        async def ok(_):
+            return "PONG"
+        return await redis_pool.run(ok)
+
+    assert asyncio.run(scenario()) == "PONG"
+    assert breaker.state == CLOSED
+
+
+def test_only_connection_errors_trip_the_breaker(breaker):
+    async def raising(exc):
+        async def op(_):
+            raise exc
+        return await redis_pool.run(op)
+
+    with pytest.raises(ResponseError):
+        asyncio.run(raising(ResponseError("script")))
+    with pytest.raises(TypeError):
+        asyncio.run(raising(TypeError("bug")))
+    assert breaker.state == CLOSED
+    with pytest.raises(RedisUnavailable):
+        asyncio.run(raising(RedisConnectionError("down")))
+    assert breaker.state == OPEN
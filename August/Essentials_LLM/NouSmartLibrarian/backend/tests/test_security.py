@@ -0,0 +1,60 @@
+import asyncio, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import security
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    p = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(security, "_hash_pool", p)
+    monkeypatch.setattr(security, "_pending", 0)
+    yield p
+    p.shutdown(wait=True)
+
+
+def _wait_pending(value, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while security._pending != value and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return security._pending
+
+
+def test_cancelled_caller_keeps_slot_until_job_finishes(pool):
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def scenario():
+        running = asyncio.create_task(security._run_hash("verify", slow))
+        queued = asyncio.create_task(security._run_hash("verify", slow))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        assert security._pending == 2
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        # job-ul din coadă s-a anulat; cel pornit ocupă încă thread-ul, deci încă se numără
+        return security._pending
+
+    assert asyncio.run(scenario()) == 1
+    release.set()
+    assert _wait_pending(0) == 0
+
+
+def test_result_and_errors_release_the_slot(pool):
+    def boom():
+        raise ValueError("bad hash")
+
+    async def scenario():
+        ok = await security._run_hash("hash", lambda: "h")
+        with pytest.raises(ValueError):
+            await security._run_hash("verify", boom)
+        return ok
+
+    assert asyncio.run(scenario()) == "h"
+    assert _wait_pending(0) == 0
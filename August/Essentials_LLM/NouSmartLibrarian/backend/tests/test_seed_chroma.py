@@ -0,0 +1,43 @@
+from app import seed_chroma
+from app.rag import book_document, book_id, content_hash
+
+MD = """## Title: Carte A
+Rezumat A.
+Teme: a
+
+## Title: Carte B
+Rezumat B.
+Teme: b
+"""
+
+
+def _setup(monkeypatch, tmp_path, existing):
+    (tmp_path / "book_summaries.md").write_text(MD, encoding="utf-8")
+    monkeypatch.setattr(seed_chroma, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(seed_chroma, "get_book_hashes", lambda: dict(existing))
+    calls = {"add": [], "delete": []}
+    monkeypatch.setattr(seed_chroma, "add_books", lambda items: calls["add"].extend(t for t, _, _ in items))
+    monkeypatch.setattr(seed_chroma, "delete_books", lambda ids: calls["delete"].extend(ids))
+    return calls
+
+
+def _hash(title, summary, themes):
+    return content_hash(book_document(title, summary, themes))
+
+
+def test_incremental_skips_unchanged_and_deletes_removed(monkeypatch, tmp_path):
+    existing = {book_id("Carte A"): _hash("Carte A", "Rezumat A.", ["a"]), book_id("Veche"): "x"}
+    calls = _setup(monkeypatch, tmp_path, existing)
+    res = seed_chroma.run()
+    assert calls["add"] == ["Carte B"]
+    assert calls["delete"] == [book_id("Veche")]
+    assert res == {"added": 1, "updated": 0, "unchanged": 1, "deleted": 1}
+
+
+def test_full_rebuild_reembeds_all_and_still_deletes_removed(monkeypatch, tmp_path):
+    existing = {book_id("Carte A"): _hash("Carte A", "Rezumat A.", ["a"]), book_id("Veche"): "x"}
+    calls = _setup(monkeypatch, tmp_path, existing)
+    res = seed_chroma.run(full=True)
+    assert sorted(calls["add"]) == ["Carte A", "Carte B"]
+    assert calls["delete"] == [book_id("Veche")]
+    assert res == {"added": 1, "updated": 1, "unchanged": 0, "deleted": 1}
@@ -0,0 +1,106 @@
+import json, os
+
+import pytest
+
+from app import usage_rollups
+from app.config import settings
+
+
+def _line(i: int) -> str:
+    return json.dumps({"ts": "2026-10-18T10:00:00", "direction": "chat", "user": "u1", "model": "m",
+                       "input_tokens": 10, "output_tokens": 5, "usd_cost": 0.001, "i": i}) + "\n"
+
+
+def _append(path, start: int, n: int):
+    with path.open("a", encoding="utf-8") as f:
+        f.writelines(_line(i) for i in range(start, start + n))
+
+
+def _calls() -> int:
+    rows = usage_rollups.query(["user"])
+    return rows[0]["calls"] if rows else 0
+
+
+@pytest.fixture
+def logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "usage_db_path", str(tmp_path / "usage.sqlite3"))
+    monkeypatch.setattr(usage_rollups, "_db", None)
+    day = tmp_path / "logs" / "18-10-2026"
+    day.mkdir(parents=True)
+    yield day / "tokens.log"
+    if usage_rollups._db is not None:
+        usage_rollups._db.close()
+
+
+def test_append_during_refresh_is_counted_once(logs, monkeypatch):
+    _append(logs, 0, 10)
+    monkeypatch.setattr(usage_rollups, "READ_CHUNK", 300)  # mai multe pași de tail pt același fișier
+    real_tail, appended = usage_rollups._tail, []
+
+    def tail_and_write(path, offset, size):
+        if not appended:  # writer-ul de tokeni adaugă linii în timp ce refresh-ul citește
+            _append(path, 10, 5)
+            appended.append(True)
+        return real_tail(path, offset, size)
+
+    monkeypatch.setattr(usage_rollups, "_tail", tail_and_write)
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 10
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 15
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 15
+
+
+def test_replaced_and_truncated_files_are_read_from_start(logs):
+    _append(logs, 0, 10)
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 10
+
+    # înlocuit (alt inode) cu un fișier mai mare: offset-ul vechi nu mai e valid
+    tmp = logs.with_suffix(".new")
+    _append(tmp, 100, 12)
+    os.replace(tmp, logs)
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 22
+
+    # trunchiat pe loc (același inode)
+    logs.write_text("")
+    _append(logs, 200, 3)
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 25
+
+
+def test_cost_is_priced_from_tokens_not_logged_cost(logs, monkeypatch):
+    monkeypatch.setattr(settings, "price_chat_input", 0.5)
+    monkeypatch.setattr(settings, "price_chat_output", 2.0)
+    monkeypatch.setattr(settings, "price_embedding", 0.1)
+    patch_log = logs.parent / "tokens" / "tokens.log"
+    patch_log.parent.mkdir()
+    # patch/tokens_logger nu are preț pt gpt-4o-mini -> cost logat 0
+    patch_log.write_text(json.dumps({"type": "response", "data": ["u1", "text", "0.000000", "2026-10-18T10:00:00"],
+                                     "model": "gpt-4o-mini", "input_tokens": 1000, "output_tokens": 500}) + "\n")
+    logs.write_text(json.dumps({"ts": "2026-10-18T10:00:01", "direction": "embedding", "user": "u1",
+                                "model": "text-embedding-3-small", "input_tokens": 2000, "output_tokens": 0,
+                                "usd_cost": "0.000000"}) + "\n")
+    usage_rollups.refresh(logs.parent.parent)
+    rows = {r["direction"]: r for r in usage_rollups.query(["direction"])}
+    assert rows["response"]["cost"] == pytest.approx(0.5 + 1.0)
+    assert rows["embedding"]["cost"] == pytest.approx(0.2)
+    assert usage_rollups.query(["user"])[0]["cost"] == pytest.approx(1.7)
+
+
+def test_rollups_with_logged_cost_are_rebuilt(logs):
+    import sqlite3
+
+    db = sqlite3.connect(settings.usage_db_path)
+    db.execute("CREATE TABLE offsets (path TEXT PRIMARY KEY, offset INTEGER NOT NULL, ino INTEGER)")
+    db.execute("CREATE TABLE rollups (day TEXT NOT NULL, user TEXT NOT NULL, model TEXT NOT NULL, "
+               "direction TEXT NOT NULL, calls INTEGER NOT NULL, input_tokens INTEGER NOT NULL, "
+               "output_tokens INTEGER NOT NULL, cost REAL NOT NULL, PRIMARY KEY (day, user, model, direction))")
+    _append(logs, 0, 4)
+    db.execute("INSERT INTO offsets VALUES (?, ?, NULL)", (str(logs.resolve()), logs.stat().st_size))
+    db.commit()
+    db.close()
+    usage_rollups.refresh(logs.parent.parent)
+    assert _calls() == 4  # offset-urile vechi s-au șters cu tot cu rollup-urile, logul s-a recitit
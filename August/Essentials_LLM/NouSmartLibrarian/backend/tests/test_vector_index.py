@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+
+from app.vector_index import VectorIndex
+
+
+def _books(n: int, start: int = 0):
+    ids = [f"book_{i}" for i in range(start, start + n)]
+    metas = [{"title": f"T{i}", "themes": "magie, dragoni" if i % 2 else "istorie"} for i in range(start, start + n)]
+    vecs = np.random.default_rng(start).normal(size=(n, 8)).tolist()
+    return ids, [f"doc {i}" for i in ids], metas, vecs
+
+
+def test_saved_version_is_reloaded_and_old_versions_removed(tmp_path):
+    idx = VectorIndex(tmp_path)
+    idx.upsert(*_books(3))
+    idx.upsert(*_books(2, start=3))
+    assert len(list(tmp_path.glob("v-*"))) == 1
+    again = VectorIndex(tmp_path)
+    assert again.count() == 5
+    assert [h["id"] for h in again.query(_books(2, start=3)[3][1], k=1)] == ["book_4"]
+
+
+def test_unfinished_version_is_ignored(tmp_path):
+    idx = VectorIndex(tmp_path)
+    idx.upsert(*_books(3))
+    # crash în timpul unei salvări: versiunea nouă e scrisă pe jumătate, CURRENT încă indică vechea versiune
+    partial = tmp_path / "v-partial"
+    partial.mkdir()
+    np.save(partial / "embeddings.npy", np.zeros((4, 8), np.float32))
+    assert VectorIndex(tmp_path).count() == 3
+
+
+def test_row_count_mismatch_loads_empty(tmp_path):
+    bad = tmp_path / "v-bad"
+    bad.mkdir()
+    np.save(bad / "embeddings.npy", np.zeros((4, 8), np.float32))
+    (bad / "items.json").write_text(json.dumps([{"id": "a", "document": "", "metadata": {}}]))
+    (tmp_path / "CURRENT").write_text("v-bad")
+    idx = VectorIndex(tmp_path)
+    assert idx.count() == 0 and idx.query([0.0] * 8) == []
+
+
+def test_legacy_layout_is_read_and_migrated_on_save(tmp_path):
+    ids, docs, metas, vecs = _books(2)
+    np.save(tmp_path / "embeddings.npy", np.asarray(vecs, np.float32))
+    (tmp_path / "items.json").write_text(json.dumps(
+        [{"id": i, "document": d, "metadata": m} for i, d, m in zip(ids, docs, metas)]))
+    idx = VectorIndex(tmp_path)
+    assert idx.count() == 2
+    idx.upsert(*_books(1, start=2))
+    assert not (tmp_path / "embeddings.npy").exists()
+    assert VectorIndex(tmp_path).count() == 3
+
+
+def test_delete_drops_staged_rows(tmp_path):
+    idx = VectorIndex(tmp_path)
+    idx.upsert(*_books(3))
+    idx.upsert(*_books(2, start=3), persist=False)
+    idx.delete(["book_1", "book_4"])
+    assert idx.pending() == 1
+    idx.flush()
+    assert sorted(it["id"] for it in VectorIndex(tmp_path).get()) == ["book_0", "book_2", "book_3"]
+
+
+def test_reset_drops_staged_rows(tmp_path):
+    idx = VectorIndex(tmp_path)
+    idx.upsert(*_books(2), persist=False)
+    idx.reset()
+    idx.flush()
+    assert idx.count() == 0